@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import json
+import os
+
+import pytest
+from ipywidgets.widgets.widget import _remove_buffers
+
+from ipyscales.tests.conftest import MockComm, mock_comm
+
+
+_baseline_path = os.path.join(os.path.dirname(__file__), "message_sizes.json")
+
+
+def message_size(widget):
+    """Get the size in bytes of the full state message of a widget."""
+    state, _, buffers = _remove_buffers(widget.get_state())
+    return len(json.dumps(state).encode("utf-8")) + sum(
+        memoryview(b).nbytes for b in buffers
+    )
+
+
+@pytest.fixture(scope="session")
+def size_baselines():
+    with open(_baseline_path) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def check_message_size(request, size_baselines, benchmark):
+    """Record the state message size of a widget, and compare to the baseline.
+
+    The sizes are deterministic, so any growth beyond the stored baseline
+    fails the benchmark. Update `message_sizes.json` when a change in size
+    is intended.
+    """
+
+    def check(widget):
+        size = message_size(widget)
+        benchmark.extra_info["message_bytes"] = size
+        baseline = size_baselines[request.node.name]
+        assert size <= baseline, "Message size grew from %d to %d bytes" % (
+            baseline,
+            size,
+        )
+        return size
+
+    return check
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+from ipyscales import LinearScale, LinearColorScale, QuantileScale, OrdinalScale
+
+
+N_WIDGETS = 1000
+
+
+def _construct(cls, **kwargs):
+    widgets = [cls(**kwargs) for _ in range(N_WIDGETS)]
+    for w in widgets:
+        w.close()
+
+
+def test_construct_linear_scales(benchmark, mock_comm):
+    benchmark(_construct, LinearScale, domain=(0, 10), range=(-1, 1))
+
+
+def test_construct_color_scales(benchmark, mock_comm):
+    benchmark(_construct, LinearColorScale, range=("red", "#00ff0080", "blue"))
+
+
+def test_construct_quantile_scales(benchmark, mock_comm):
+    benchmark(_construct, QuantileScale, domain=tuple(range(100)), range=(0, 1, 2))
+
+
+def test_construct_ordinal_scales(benchmark, mock_comm):
+    benchmark(_construct, OrdinalScale, domain=("a", "b", "c"), range=(1, 2, 3))
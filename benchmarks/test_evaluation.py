@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import numpy as np
+import pytest
+
+from ipyscales import (
+    LinearScale,
+    LogScale,
+    LinearColorScale,
+    NamedSequentialColorMap,
+    QuantileScale,
+    OrdinalScale,
+)
+
+
+N_VALUES = 1000000
+
+
+@pytest.fixture(scope="module")
+def values():
+    return np.random.RandomState(0).rand(N_VALUES)
+
+
+def test_linearscale_call(benchmark, values):
+    w = LinearScale(domain=(0, 0.5, 1), range=(0, 10, 12))
+    out = np.empty_like(values)
+    benchmark(w, values, out=out)
+
+
+def test_logscale_call(benchmark, values):
+    w = LogScale(domain=(1e-3, 1), range=(0, 1), clamp=True)
+    out = np.empty_like(values)
+    benchmark(w, values, out=out)
+
+
+def test_quantilescale_call(benchmark, values):
+    w = QuantileScale(domain=values[:10000], range=tuple(range(10)))
+    benchmark(w, values)
+
+
+def test_ordinalscale_call(benchmark, values):
+    codes = (values * 100).astype(np.int64)
+    w = OrdinalScale(domain=tuple(range(100)), range=("a", "b", "c"))
+    benchmark(w, codes)
+
+
+def test_named_colormap_map(benchmark, values):
+    w = NamedSequentialColorMap("Viridis")
+    out = np.empty(values.shape + (4,), dtype=np.uint8)
+    benchmark(w.map, values, out=out)
+
+
+def test_linearcolorscale_map(benchmark, values):
+    w = LinearColorScale(range=("red", "#00ff0080", "blue"), domain=(0, 0.5, 1))
+    out = np.empty(values.shape + (4,), dtype=np.uint8)
+    benchmark(w.map, values, out=out)
+
+
+def test_scaledarray_compute(benchmark, values):
+    pytest.importorskip("ipydatawidgets")
+    from ipyscales.datawidgets import ScaledArray
+
+    w = ScaledArray(values.reshape(1000, 1000), NamedSequentialColorMap("Viridis"))
+
+    def compute():
+        # Bypass the result cache, to measure the evaluation itself:
+        w._compute_cache = None
+        return w.compute()
+
+    benchmark(compute)
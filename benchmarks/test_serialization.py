@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import numpy as np
+import pytest
+
+from ipyscales import LinearScale, LinearColorScale, QuantileScale
+
+from .conftest import message_size
+
+
+def test_quantilescale_state(benchmark, check_message_size):
+    w = QuantileScale(domain=np.linspace(0, 1, 10000), range=tuple(range(10)))
+    benchmark(message_size, w)
+    check_message_size(w)
+
+
+def test_linearscale_polylinear_state(benchmark, check_message_size):
+    w = LinearScale(domain=np.linspace(0, 1, 1000), range=np.linspace(-1, 1, 1000))
+    benchmark(message_size, w)
+    check_message_size(w)
+
+
+def test_linearcolorscale_state(benchmark, check_message_size):
+    colors = ["#%02x%02x%02x" % (i, 255 - i, i // 2) for i in range(256)]
+    w = LinearColorScale(domain=np.linspace(0, 1, 256), range=colors)
+    benchmark(message_size, w)
+    check_message_size(w)
+
+
+def test_arraycolorscale_state(benchmark, check_message_size):
+    pytest.importorskip("ipydatawidgets")
+    from ipyscales.colorarray import ArrayColorScale
+
+    w = ArrayColorScale(colors=np.random.RandomState(0).rand(256, 4))
+    benchmark(message_size, w)
+    check_message_size(w)
+
+
+def test_scaledarray_state(benchmark, check_message_size):
+    pytest.importorskip("ipydatawidgets")
+    from ipyscales.datawidgets import ScaledArray
+
+    data = np.random.RandomState(0).rand(1000, 1000).astype(np.float32)
+    w = ScaledArray(data, LinearScale())
+    benchmark(message_size, w)
+    check_message_size(w)
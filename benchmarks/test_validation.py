@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import numpy as np
+
+from ipyscales import LinearScale, LinearColorScale, QuantileScale, OrdinalScale
+
+
+def test_assign_array_domain(benchmark):
+    w = QuantileScale()
+    domain = np.random.RandomState(0).rand(1000000)
+
+    def assign():
+        w.domain = domain
+
+    benchmark(assign)
+
+
+def test_assign_list_domain(benchmark):
+    w = QuantileScale()
+    domain = np.random.RandomState(0).rand(100000).tolist()
+
+    def assign():
+        w.domain = domain
+
+    benchmark(assign)
+
+
+def test_assign_polylinear_range(benchmark):
+    w = LinearScale(domain=np.linspace(0, 1, 100000))
+    range = np.linspace(-1, 1, 100000)
+
+    def assign():
+        w.range = range
+
+    benchmark(assign)
+
+
+def test_assign_color_range(benchmark):
+    # As color map editors do, reassign a 256 stop range:
+    w = LinearColorScale(domain=np.linspace(0, 1, 256))
+    colors = [
+        "rgba(%d, %d, %d, 0.5)" % (i, 255 - i, i // 2) for i in range(256)
+    ]
+
+    def assign():
+        w.range = ("black",) * 256
+        w.range = colors
+
+    benchmark(assign)
+
+
+def test_assign_ordinal_domain(benchmark):
+    w = OrdinalScale()
+    domain = ["category %d" % i for i in range(10000)]
+
+    def assign():
+        w.domain = domain
+
+    benchmark(assign)
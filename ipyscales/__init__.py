@@ -4,35 +4,78 @@
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+"""
+Scale widgets for Jupyter.
 
-from ._version import __version__, version_info
+The widget classes are imported lazily on first access, so that a bare
+`import ipyscales` does not import ipywidgets or NumPy.
+"""
+
+from importlib import import_module
 
-from .scale import (
-    Scale,
-    SequentialScale,
-    DivergingScale,
-    QuantizeScale,
-    QuantileScale,
-    TresholdScale,
-    OrdinalScale,
-)
-from .continuous import ContinuousScale, LinearScale, LogScale, PowScale
-from .color import (
-    ColorScale,
-    LinearColorScale,
-    LogColorScale,
-    NamedSequentialColorMap,
-    NamedDivergingColorMap,
-    NamedOrdinalColorMap,
-)
-from .colorbar import ColorBar, ColorMapEditor
-from .value import ScaledValue
-
-# do not import data widgets, to ensure optional dep. on ipydatawidget
+from ._version import __version__, version_info
 
 from .nbextension import _jupyter_nbextension_paths
 
 
+# Maps the public names to the submodules that define them:
+_lazy_names = {
+    "scale": (
+        "Scale",
+        "SequentialScale",
+        "DivergingScale",
+        "DiscretizingScale",
+        "QuantizeScale",
+        "QuantileScale",
+        "TresholdScale",
+        "OrdinalScale",
+        "ComposedScale",
+        "batch_update",
+    ),
+    "continuous": ("ContinuousScale", "LinearScale", "LogScale", "PowScale"),
+    "color": (
+        "ColorScale",
+        "LinearColorScale",
+        "LogColorScale",
+        "NamedSequentialColorMap",
+        "NamedDivergingColorMap",
+        "NamedOrdinalColorMap",
+    ),
+    "colorbar": ("ColorBar", "ColorMapEditor"),
+    "value": ("ScaledValue",),
+    "sketch": ("QuantileSketch",),
+    "instrumentation": (
+        "enable_comm_stats",
+        "disable_comm_stats",
+        "reset_comm_stats",
+        "record_comm_stats",
+        "comm_stats",
+    ),
+    # do not import data widgets, to ensure optional dep. on ipydatawidget
+}
+
+_lazy_modules = {
+    name: module for module, names in _lazy_names.items() for name in names
+}
+
 # deprecated:
-LinearScaleWidget = LinearScale
-ScaleWidget = Scale
+_aliases = {"LinearScaleWidget": "LinearScale", "ScaleWidget": "Scale"}
+
+# The names exported by `from ipyscales import *`, which imports them all:
+__all__ = ["version_info"] + list(_lazy_modules) + list(_aliases)
+
+
+def __getattr__(name):
+    target = _aliases.get(name, name)
+    try:
+        module = _lazy_modules[target]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(import_module("." + module, __name__), target)
+    # Cache it, so that later lookups do not go through __getattr__:
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_modules) | set(_aliases))
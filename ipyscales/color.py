@@ -8,6 +8,11 @@
 Defines color scale widget, and any supporting functions
 """
 
+from functools import lru_cache
+import os
+import re
+
+import numpy as np
 from traitlets import (
     Float,
     Unicode,
@@ -21,20 +26,321 @@ from traitlets import (
 )
 from ipywidgets import register, jslink, VBox
 
-from .scale import Scale, SequentialScale, DivergingScale, OrdinalScale
+from .scale import (
+    Scale,
+    SequentialScale,
+    DivergingScale,
+    OrdinalScale,
+    binary_tuple_min_length,
+    deserialize_tuple,
+)
 from .continuous import LinearScale, LogScale
 from .selectors import StringDropdown
-from .traittypes import FullColor, VarlenTuple
+from .traittypes import FullColor, VarlenTuple, color_cache_size
+
+
+# The CSS named colors, as 0xRRGGBB:
+_css_named_colors = {
+    "aliceblue": 0xF0F8FF, "antiquewhite": 0xFAEBD7, "aqua": 0x00FFFF,
+    "aquamarine": 0x7FFFD4, "azure": 0xF0FFFF, "beige": 0xF5F5DC,
+    "bisque": 0xFFE4C4, "black": 0x000000, "blanchedalmond": 0xFFEBCD,
+    "blue": 0x0000FF, "blueviolet": 0x8A2BE2, "brown": 0xA52A2A,
+    "burlywood": 0xDEB887, "cadetblue": 0x5F9EA0, "chartreuse": 0x7FFF00,
+    "chocolate": 0xD2691E, "coral": 0xFF7F50, "cornflowerblue": 0x6495ED,
+    "cornsilk": 0xFFF8DC, "crimson": 0xDC143C, "cyan": 0x00FFFF,
+    "darkblue": 0x00008B, "darkcyan": 0x008B8B, "darkgoldenrod": 0xB8860B,
+    "darkgray": 0xA9A9A9, "darkgreen": 0x006400, "darkgrey": 0xA9A9A9,
+    "darkkhaki": 0xBDB76B, "darkmagenta": 0x8B008B, "darkolivegreen": 0x556B2F,
+    "darkorange": 0xFF8C00, "darkorchid": 0x9932CC, "darkred": 0x8B0000,
+    "darksalmon": 0xE9967A, "darkseagreen": 0x8FBC8F, "darkslateblue": 0x483D8B,
+    "darkslategray": 0x2F4F4F, "darkslategrey": 0x2F4F4F,
+    "darkturquoise": 0x00CED1, "darkviolet": 0x9400D3, "deeppink": 0xFF1493,
+    "deepskyblue": 0x00BFFF, "dimgray": 0x696969, "dimgrey": 0x696969,
+    "dodgerblue": 0x1E90FF, "firebrick": 0xB22222, "floralwhite": 0xFFFAF0,
+    "forestgreen": 0x228B22, "fuchsia": 0xFF00FF, "gainsboro": 0xDCDCDC,
+    "ghostwhite": 0xF8F8FF, "gold": 0xFFD700, "goldenrod": 0xDAA520,
+    "gray": 0x808080, "green": 0x008000, "greenyellow": 0xADFF2F,
+    "grey": 0x808080, "honeydew": 0xF0FFF0, "hotpink": 0xFF69B4,
+    "indianred": 0xCD5C5C, "indigo": 0x4B0082, "ivory": 0xFFFFF0,
+    "khaki": 0xF0E68C, "lavender": 0xE6E6FA, "lavenderblush": 0xFFF0F5,
+    "lawngreen": 0x7CFC00, "lemonchiffon": 0xFFFACD, "lightblue": 0xADD8E6,
+    "lightcoral": 0xF08080, "lightcyan": 0xE0FFFF,
+    "lightgoldenrodyellow": 0xFAFAD2, "lightgray": 0xD3D3D3,
+    "lightgreen": 0x90EE90, "lightgrey": 0xD3D3D3, "lightpink": 0xFFB6C1,
+    "lightsalmon": 0xFFA07A, "lightseagreen": 0x20B2AA, "lightskyblue": 0x87CEFA,
+    "lightslategray": 0x778899, "lightslategrey": 0x778899,
+    "lightsteelblue": 0xB0C4DE, "lightyellow": 0xFFFFE0, "lime": 0x00FF00,
+    "limegreen": 0x32CD32, "linen": 0xFAF0E6, "magenta": 0xFF00FF,
+    "maroon": 0x800000, "mediumaquamarine": 0x66CDAA, "mediumblue": 0x0000CD,
+    "mediumorchid": 0xBA55D3, "mediumpurple": 0x9370DB,
+    "mediumseagreen": 0x3CB371, "mediumslateblue": 0x7B68EE,
+    "mediumspringgreen": 0x00FA9A, "mediumturquoise": 0x48D1CC,
+    "mediumvioletred": 0xC71585, "midnightblue": 0x191970, "mintcream": 0xF5FFFA,
+    "mistyrose": 0xFFE4E1, "moccasin": 0xFFE4B5, "navajowhite": 0xFFDEAD,
+    "navy": 0x000080, "oldlace": 0xFDF5E6, "olive": 0x808000,
+    "olivedrab": 0x6B8E23, "orange": 0xFFA500, "orangered": 0xFF4500,
+    "orchid": 0xDA70D6, "palegoldenrod": 0xEEE8AA, "palegreen": 0x98FB98,
+    "paleturquoise": 0xAFEEEE, "palevioletred": 0xDB7093,
+    "papayawhip": 0xFFEFD5, "peachpuff": 0xFFDAB9, "peru": 0xCD853F,
+    "pink": 0xFFC0CB, "plum": 0xDDA0DD, "powderblue": 0xB0E0E6,
+    "purple": 0x800080, "rebeccapurple": 0x663399, "red": 0xFF0000,
+    "rosybrown": 0xBC8F8F, "royalblue": 0x4169E1, "saddlebrown": 0x8B4513,
+    "salmon": 0xFA8072, "sandybrown": 0xF4A460, "seagreen": 0x2E8B57,
+    "seashell": 0xFFF5EE, "sienna": 0xA0522D, "silver": 0xC0C0C0,
+    "skyblue": 0x87CEEB, "slateblue": 0x6A5ACD, "slategray": 0x708090,
+    "slategrey": 0x708090, "snow": 0xFFFAFA, "springgreen": 0x00FF7F,
+    "steelblue": 0x4682B4, "tan": 0xD2B48C, "teal": 0x008080,
+    "thistle": 0xD8BFD8, "tomato": 0xFF6347, "turquoise": 0x40E0D0,
+    "violet": 0xEE82EE, "wheat": 0xF5DEB3, "white": 0xFFFFFF,
+    "whitesmoke": 0xF5F5F5, "yellow": 0xFFFF00, "yellowgreen": 0x9ACD32,
+}
+
+_color_func_re = re.compile(r"^(rgba?|hsla?)\((.*)\)$")
+
+
+def _parse_channel(text, scale):
+    """Parse a number or percentage, where 100% equals `scale`."""
+    text = text.strip()
+    if text.endswith("%"):
+        return float(text[:-1]) * scale / 100
+    return float(text)
+
+
+def _css_hsl_to_rgb(h, s, l):
+    # As in the CSS specification
+    h = (h % 360) / 360
+    m2 = l * (1 + s) if l <= 0.5 else l + s - l * s
+    m1 = 2 * l - m2
+
+    def hue(t):
+        t %= 1
+        if t < 1 / 6:
+            return m1 + (m2 - m1) * 6 * t
+        if t < 1 / 2:
+            return m2
+        if t < 2 / 3:
+            return m1 + (m2 - m1) * (2 / 3 - t) * 6
+        return m1
+
+    return hue(h + 1 / 3), hue(h), hue(h - 1 / 3)
+
+
+@lru_cache(maxsize=color_cache_size)
+def parse_color(value):
+    """Parse a CSS color string into an RGBA tuple.
+
+    Supports named colors, hex colors (with or without alpha) and the
+    rgb(a)/hsl(a) functional notations. The results are cached, so that
+    each distinct string is only parsed once.
+
+    Returns
+    -------
+    tuple of float
+        The red, green, blue and alpha components, between 0 and 1.
+
+    Raises
+    ------
+    ValueError
+        If the string is not a valid color.
+    """
+    text = value.strip().lower()
+    if text == "transparent":
+        return (0.0, 0.0, 0.0, 0.0)
+    if text in _css_named_colors:
+        rgb = _css_named_colors[text]
+        return ((rgb >> 16) / 255, ((rgb >> 8) & 0xFF) / 255, (rgb & 0xFF) / 255, 1.0)
+    if text.startswith("#") and len(text) in (4, 5, 7, 9):
+        digits = text[1:]
+        if len(digits) <= 4:
+            digits = "".join(2 * c for c in digits)
+        try:
+            channels = [int(digits[i : i + 2], 16) / 255 for i in range(0, len(digits), 2)]
+        except ValueError:
+            raise ValueError("Invalid color: %r" % value)
+        if len(channels) == 3:
+            channels.append(1.0)
+        return tuple(channels)
+    m = _color_func_re.match(text)
+    if m:
+        name, args = m.groups()
+        args = args.split(",")
+        if len(args) == len(name):
+            try:
+                if name.startswith("rgb"):
+                    channels = [_parse_channel(a, 255) / 255 for a in args[:3]]
+                else:
+                    h = float(args[0])
+                    s, l = (_parse_channel(a, 1) for a in args[1:3])
+                    channels = list(_css_hsl_to_rgb(h, min(max(s, 0), 1), min(max(l, 0), 1)))
+                alpha = _parse_channel(args[3], 1) if len(args) > 3 else 1.0
+            except ValueError:
+                raise ValueError("Invalid color: %r" % value)
+            channels.append(alpha)
+            return tuple(min(max(c, 0.0), 1.0) for c in channels)
+    raise ValueError("Invalid color: %r" % value)
+
+
+def serialize_color_tuple(value, widget):
+    # Long color tuples are packed as float32 RGBA, if all colors can be parsed:
+    if value is None or len(value) < binary_tuple_min_length:
+        return value
+    try:
+        rgba = np.array([parse_color(c) for c in value], dtype=np.float32)
+    except (ValueError, AttributeError, TypeError):
+        return value
+    return {
+        "dtype": "float32",
+        "shape": [len(value), 4],
+        "format": "rgba",
+        "buffer": memoryview(rgba),
+    }
+
+
+def deserialize_color_tuple(value, widget):
+    if isinstance(value, dict) and value.get("format") == "rgba":
+        rgba = np.frombuffer(value["buffer"], dtype=value["dtype"]).reshape(-1, 4)
+        return tuple(
+            "rgba(%d, %d, %d, %g)" % (round(r * 255), round(g * 255), round(b * 255), a)
+            for r, g, b, a in rgba.tolist()
+        )
+    return deserialize_tuple(value, widget)
+
+
+color_tuple_serializers = {
+    "to_json": serialize_color_tuple,
+    "from_json": deserialize_color_tuple,
+}
 
 
 class ColorScale(Scale):
     """A common base class for color scales"""
 
-    pass
+    _color_output = True
+
+    def _evaluate(self, values, lut_size):
+        if not hasattr(self, "map"):
+            raise TypeError(
+                "%s cannot be evaluated in the kernel" % type(self).__name__
+            )
+        return self.map(values, lut_size=lut_size)
+
+
+class _ContinuousColorScale(ColorScale):
+    """Kernel-side evaluation of continuous scales with a color range.
+
+    The range colors are parsed once into `range_rgba`, and mapping
+    values goes through a lookup table of the interpolated colors.
+    """
+
+    _range_rgba = None
+    _luts = None
+
+    @observe("range")
+    def _invalidate_range_rgba(self, change):
+        self._range_rgba = None
+        self._luts = None
+
+    @observe("interpolator")
+    def _invalidate_luts(self, change):
+        self._luts = None
+
+    @property
+    def range_rgba(self):
+        """The range colors, as a read-only (N, 4) array of RGBA floats.
+
+        Raises a ValueError if any of the colors cannot be parsed (e.g.
+        CSS variables).
+        """
+        if self._range_rgba is None:
+            rgba = np.array([parse_color(c) for c in self.range], dtype=np.float64)
+            rgba.flags.writeable = False
+            self._range_rgba = rgba
+        return self._range_rgba
+
+    def _stop_colors(self):
+        if self.interpolator not in ("interpolate", "interpolateRgb"):
+            raise ValueError(
+                "Only RGB interpolation can be evaluated in the kernel, not %r"
+                % self.interpolator
+            )
+        # As in d3, the range is truncated to the length of the domain:
+        return self.range_rgba[: len(self.domain)]
+
+    def lut(self, size=4096):
+        """Get the interpolated range colors baked into a lookup table.
+
+        Entry `i` holds the color at `(i + 0.5) / size` along the range
+        stops. The table is cached until the range or the interpolator
+        changes, and changes to the domain values do not invalidate it.
+
+        Returns
+        -------
+        numpy.ndarray
+            A read-only (size, 4) array of uint8 RGBA colors.
+        """
+        colors = self._stop_colors()
+        if self._luts is None:
+            self._luts = {}
+        key = (size, len(colors))
+        try:
+            return self._luts[key]
+        except KeyError:
+            pass
+        t = (np.arange(size) + 0.5) / size
+        lut = interpolate_colors(colors, t)
+        lut.flags.writeable = False
+        self._luts[key] = lut
+        return lut
+
+    def map(self, values, out=None, lut_size=4096):
+        """Map values to RGBA colors.
+
+        Parameters
+        ----------
+        values : array_like
+            The values to map.
+        out : numpy.ndarray, optional
+            A uint8 array of shape `values.shape + (4,)` to write into.
+        lut_size : int or None
+            The size of the lookup table to use, see `lut`. If None, the
+            interpolation is evaluated for every value.
+
+        As on the frontend, values outside of the domain of a scale that
+        is not clamped are extrapolated by evaluating the interpolation,
+        and NaN values (unknown) are mapped to transparent black.
+
+        Returns
+        -------
+        numpy.ndarray
+            The RGBA colors as uint8, with shape `values.shape + (4,)`.
+        """
+        colors = self._stop_colors()
+        n = min(len(self.domain), len(colors))
+        values = np.asanyarray(values)
+        t = self._map_to(values, np.linspace(0, 1, n))
+        unknown = np.isnan(values) if values.dtype.kind in "fc" else None
+        if lut_size is None:
+            result = interpolate_colors(colors, t)
+            if out is not None:
+                out[...] = result
+                result = out
+        else:
+            # Values that fall outside of the table are evaluated exactly:
+            with np.errstate(invalid="ignore"):
+                outside = ~((t >= 0) & (t <= 1))
+            if unknown is not None:
+                outside &= ~unknown
+            exact = interpolate_colors(colors, t[outside]) if outside.any() else None
+            result = _lut_lookup(self.lut(lut_size), t, False, out)
+            if exact is not None:
+                result[outside] = exact
+        if unknown is not None:
+            result[unknown] = 0
+        return result
 
 
 @register
-class LinearColorScale(LinearScale, ColorScale):
+class LinearColorScale(LinearScale, _ContinuousColorScale):
     """A color scale widget.
 
     The same as a LinearScale, but validates range as color.
@@ -47,7 +353,7 @@ class LinearColorScale(LinearScale, ColorScale):
 
     range = VarlenTuple(
         trait=FullColor(), default_value=("black", "white"), minlen=2
-    ).tag(sync=True)
+    ).tag(sync=True, **color_tuple_serializers)
 
     def edit(self):
         from .colorbar import ColorMapEditor
@@ -56,7 +362,7 @@ class LinearColorScale(LinearScale, ColorScale):
 
 
 @register
-class LogColorScale(LogScale, ColorScale):
+class LogColorScale(LogScale, _ContinuousColorScale):
     """A logarithmic color scale widget.
 
     The same as a LogScale, but validates range as color.
@@ -69,7 +375,7 @@ class LogColorScale(LogScale, ColorScale):
 
     range = VarlenTuple(
         trait=FullColor(), default_value=("black", "white"), minlen=2
-    ).tag(sync=True)
+    ).tag(sync=True, **color_tuple_serializers)
 
     def edit(self):
         from .colorbar import ColorMapEditor
@@ -148,6 +454,228 @@ non_scheme_sequential = (
 )
 
 
+# These color maps are periodic, and wrap around outside of [0, 1]:
+cyclic_colormaps = ("Rainbow", "Sinebow")
+
+# These color maps are cubehelix interpolations between (h, s, l) colors,
+# which extrapolate outside of [0, 1]. The others are clamped:
+cubehelix_colormaps = {
+    "CubehelixDefault": ((300, 0.5, 0.0), (-240, 0.5, 1.0)),
+    "Warm": ((-100, 0.75, 0.35), (80, 1.5, 0.8)),
+    "Cool": ((260, 0.75, 0.35), (80, 1.5, 0.8)),
+}
+
+# The sizes of the bundled colormap lookup tables:
+colormap_lut_sizes = (256, 4096)
+
+_colormap_lut_path = os.path.join(os.path.dirname(__file__), "data", "colormaps.npz")
+_colormap_lut_file = None
+
+
+@lru_cache(maxsize=None)
+def colormap_lut(name, size=4096):
+    """Get the lookup table for a named sequential or diverging color map.
+
+    The tables are generated from the d3 interpolators used by the frontend,
+    and are loaded lazily from the package data on first use.
+
+    Parameters
+    ----------
+    name : str
+        The (case insensitive) name of the color map.
+    size : int
+        The number of entries in the table. One of `colormap_lut_sizes`.
+
+    Returns
+    -------
+    numpy.ndarray
+        A read-only (size, 4) array of uint8 RGBA colors, where entry
+        `i` is the color at `(i + 0.5) / size` along the color map.
+    """
+    global _colormap_lut_file
+    if size not in colormap_lut_sizes:
+        raise ValueError(
+            "Invalid lookup table size %r, must be one of %r"
+            % (size, colormap_lut_sizes)
+        )
+    if _colormap_lut_file is None:
+        _colormap_lut_file = np.load(_colormap_lut_path)
+    try:
+        rgb = _colormap_lut_file["%s_%d" % (name.lower(), size)]
+    except KeyError:
+        raise ValueError("Unknown color map name: %r" % name)
+    lut = np.empty((size, 4), dtype=np.uint8)
+    lut[:, :3] = rgb
+    lut[:, 3] = 255
+    lut.flags.writeable = False
+    return lut
+
+
+def _js_round(x):
+    # Math.round() rounds half-way cases towards positive infinity
+    return np.floor(x + 0.5)
+
+
+def _hue_delta(a, b):
+    """The shortest hue difference, as in d3's hsl interpolation."""
+    d = b - a
+    wrap = (d > 180) | (d < -180)
+    return np.where(wrap, d - 360 * _js_round(d / 360), d)
+
+
+def _hsl_to_rgb(h, s, l):
+    """Port of d3-color's `hsl().rgb()`, returning channels in [0, 255]."""
+    h = np.fmod(h, 360) + (h < 0) * 360
+    m2 = l + np.where(l < 0.5, l, 1 - l) * s
+    m1 = 2 * l - m2
+
+    def channel(h):
+        return 255 * np.select(
+            [h < 60, h < 180, h < 240],
+            [m1 + (m2 - m1) * h / 60, m2, m1 + (m2 - m1) * (240 - h) / 60],
+            m1,
+        )
+
+    return (
+        channel(np.where(h >= 240, h - 240, h + 120)),
+        channel(h),
+        channel(np.where(h < 120, h + 240, h - 120)),
+    )
+
+
+def _interpolate_cubehelix_long(start, end, t):
+    """Port of d3's `interpolateCubehelixLong`, giving uint8 RGBA colors."""
+    h, s, l = (a + t * (b - a) for a, b in zip(start, end))
+    h = np.radians(h + 120)
+    a = s * l * (1 - l)
+    cosh, sinh = np.cos(h), np.sin(h)
+    rgb = (
+        l + a * (-0.14861 * cosh + 1.78277 * sinh),
+        l + a * (-0.29227 * cosh - 0.90649 * sinh),
+        l + a * (1.97294 * cosh),
+    )
+    result = np.empty(t.shape + (4,), dtype=np.uint8)
+    for c, channel in enumerate(rgb):
+        result[..., c] = np.clip(_js_round(255 * channel), 0, 255)
+    result[..., 3] = 255
+    return result
+
+
+def interpolate_colors(colors, t, space="rgb", gamma=1.0):
+    """Evaluate a piecewise color interpolation at normalized positions.
+
+    This reproduces the interpolator that the frontend builds for an
+    `ArrayColorScale` (d3's `piecewise` with `interpolateRgb.gamma` or
+    `interpolateHsl`), including extrapolation outside of [0, 1].
+
+    Parameters
+    ----------
+    colors : array_like
+        An (N, 3) or (N, 4) array of RGB(A) or HSL(A) colors,
+        normalized between 0 and 1.
+    t : array_like
+        The positions to evaluate the interpolator at.
+    space : {"rgb", "hsl"}
+        The color space of `colors`, and to interpolate in.
+    gamma : float
+        The gamma to use when interpolating in RGB space.
+
+    Returns
+    -------
+    numpy.ndarray
+        An array of shape `t.shape + (4,)` and dtype uint8, with the
+        RGBA colors as they would be parsed from the frontend output.
+    """
+    colors = np.asarray(colors, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    n = len(colors) - 1
+    scaled = t * n
+    i = np.clip(np.floor(np.nan_to_num(scaled)), 0, n - 1).astype(np.intp)
+    u = scaled - i
+    start = colors[i]
+    end = colors[i + 1]
+
+    def lerp(c):
+        return start[..., c] + u * (end[..., c] - start[..., c])
+
+    if colors.shape[-1] > 3:
+        alpha = lerp(3)
+    else:
+        alpha = np.ones_like(u)
+
+    with np.errstate(invalid="ignore"):
+        if space == "hsl":
+            h0 = 360 * start[..., 0]
+            h = h0 + u * _hue_delta(h0, 360 * end[..., 0])
+            rgb = _hsl_to_rgb(h, lerp(1), lerp(2))
+        elif gamma == 1:
+            rgb = [255 * lerp(c) for c in range(3)]
+        else:
+            rgb = []
+            for c in range(3):
+                a = (255 * start[..., c]) ** gamma
+                b = (255 * end[..., c]) ** gamma - a
+                rgb.append((a + u * b) ** (1 / gamma))
+
+    result = np.empty(t.shape + (4,), dtype=np.uint8)
+    for c, channel in enumerate(rgb):
+        # d3 formats non-numeric channels as 0
+        result[..., c] = np.clip(np.nan_to_num(_js_round(channel)), 0, 255)
+    alpha = np.clip(np.nan_to_num(alpha, nan=1.0), 0, 1)
+    result[..., 3] = _js_round(255 * alpha)
+    return result
+
+
+def _lut_lookup(lut, t, cyclic, out):
+    """Look up the colors for normalized values `t`.
+
+    Note that `t` is used as a scratch buffer. NaN values are mapped
+    to transparent black.
+    """
+    n = len(lut)
+    if out is None:
+        out = np.empty(t.shape + (4,), dtype=np.uint8)
+    elif out.shape != t.shape + (4,) or out.dtype != np.uint8:
+        raise ValueError(
+            "out should be a uint8 array of shape %s" % (t.shape + (4,),)
+        )
+    invalid = np.isnan(t)
+    has_invalid = invalid.any()
+    if has_invalid:
+        t[invalid] = 0
+    if cyclic:
+        t -= np.floor(t)
+    t *= n
+    # After clipping, truncation when casting is equivalent to floor:
+    np.clip(t, 0, n - 1, out=t)
+    idx = t.astype(np.intp)
+    if out.flags.c_contiguous:
+        # Gather whole RGBA pixels at a time:
+        packed = lut.view(np.uint32).reshape(n)
+        np.take(packed, idx, out=out.view(np.uint32).reshape(t.shape))
+    else:
+        np.take(lut, idx, axis=0, out=out)
+    if has_invalid:
+        out[invalid] = 0
+    return out
+
+
+def _lut_lookup_exact(lut, t, evaluate, out):
+    """Look up colors as `_lut_lookup`, evaluating values outside of the table.
+
+    Values of `t` outside of [0, 1] are mapped by `evaluate`, as the
+    frontend does for scales that extrapolate. NaN values are mapped
+    to transparent black.
+    """
+    with np.errstate(invalid="ignore"):
+        outside = (t < 0) | (t > 1)
+    exact = evaluate(t[outside]) if outside.any() else None
+    out = _lut_lookup(lut, t, False, out)
+    if exact is not None:
+        out[outside] = exact
+    return out
+
+
 @register
 class NamedSequentialColorMap(SequentialScale, ColorScale):
     """A linear scale widget for colors, initialized from a named color map.
@@ -160,6 +688,38 @@ class NamedSequentialColorMap(SequentialScale, ColorScale):
     def __init__(self, name="Viridis", **kwargs):
         super(NamedSequentialColorMap, self).__init__(name=name, **kwargs)
 
+    def map(self, values, out=None, lut_size=4096):
+        """Map values to RGBA colors using a lookup table.
+
+        Values outside of the domain are mapped to the end colors of
+        the color map, except for scales that are not clamped with
+        cyclic color maps, which wrap around, and cubehelix color maps,
+        which are extrapolated (as in d3).
+
+        Parameters
+        ----------
+        values : array_like
+            The values to map.
+        out : numpy.ndarray, optional
+            A uint8 array of shape `values.shape + (4,)` to write into.
+        lut_size : int
+            The size of the lookup table to use, see `colormap_lut`.
+
+        Returns
+        -------
+        numpy.ndarray
+            The RGBA colors as uint8, with shape `values.shape + (4,)`.
+        """
+        t = self._normalize(values)
+        lut = colormap_lut(self.name, lut_size)
+        if self.name in cubehelix_colormaps and not self.clamp:
+            start, end = cubehelix_colormaps[self.name]
+            return _lut_lookup_exact(
+                lut, t, lambda t: _interpolate_cubehelix_long(start, end, t), out
+            )
+        cyclic = self.name in cyclic_colormaps and not self.clamp
+        return _lut_lookup(lut, t, cyclic, out)
+
     def edit(self):
         "Create linked widgets for this data."
         children = []
@@ -185,6 +745,29 @@ class NamedDivergingColorMap(DivergingScale, ColorScale):
     def __init__(self, name="BrBG", **kwargs):
         super(NamedDivergingColorMap, self).__init__(name=name, **kwargs)
 
+    def map(self, values, out=None, lut_size=4096):
+        """Map values to RGBA colors using a lookup table.
+
+        Values outside of the domain are mapped to the end colors
+        of the color map.
+
+        Parameters
+        ----------
+        values : array_like
+            The values to map.
+        out : numpy.ndarray, optional
+            A uint8 array of shape `values.shape + (4,)` to write into.
+        lut_size : int
+            The size of the lookup table to use, see `colormap_lut`.
+
+        Returns
+        -------
+        numpy.ndarray
+            The RGBA colors as uint8, with shape `values.shape + (4,)`.
+        """
+        t = self._normalize(values)
+        return _lut_lookup(colormap_lut(self.name, lut_size), t, False, out)
+
     def edit(self):
         "Create linked widgets for this data."
         children = []
@@ -8,13 +8,18 @@
 Defines array color scale widget, and any supporting functions
 """
 
-from traitlets import Unicode, TraitError, Undefined, Enum, CFloat
+import numpy as np
+from traitlets import Unicode, TraitError, Undefined, Enum, CFloat, observe
 from ipywidgets import register
-from ipydatawidgets import DataUnion, data_union_serialization
+from ipydatawidgets import DataUnion, data_union_serialization, get_union_array
 
-from .color import ColorScale
+from .color import ColorScale, _lut_lookup_exact
 from .scale import SequentialScale
 
+# Defined in .color, so that it can be used without ipydatawidgets, and
+# re-exported here where it was first defined:
+from .color import interpolate_colors
+
 
 def minlen_validator(minlen):
     def validator(trait, value):
@@ -61,6 +66,7 @@ class ArrayColorScale(SequentialScale, ColorScale):
     _model_name = Unicode("ArrayColorScaleModel").tag(sync=True)
 
     def __init__(self, colors=Undefined, space="rgb", gamma=1.0, **kwargs):
+        self._luts = {}
         if colors is not Undefined:
             kwargs["colors"] = colors
         super(ArrayColorScale, self).__init__(space=space, gamma=gamma, **kwargs)
@@ -78,3 +84,69 @@ class ArrayColorScale(SequentialScale, ColorScale):
     gamma = CFloat(1.0, help="Gamma to use if interpolating in RGB space.").tag(
         sync=True
     )
+
+    @observe("colors", "space", "gamma")
+    def _invalidate_luts(self, change):
+        self._luts.clear()
+
+    def lut(self, size=4096):
+        """Get the color map baked into a lookup table.
+
+        Entry `i` holds the color at `(i + 0.5) / size` along the
+        normalized domain. The table is cached until `colors`, `space`
+        or `gamma` changes. Changes to `domain` are applied when
+        mapping values, and do not invalidate the table. Note that
+        in-place modifications of the `colors` array are not detected.
+
+        Returns
+        -------
+        numpy.ndarray
+            A read-only (size, 4) array of uint8 RGBA colors.
+        """
+        try:
+            return self._luts[size]
+        except KeyError:
+            pass
+        t = (np.arange(size) + 0.5) / size
+        lut = interpolate_colors(
+            get_union_array(self.colors), t, self.space, self.gamma
+        )
+        lut.flags.writeable = False
+        self._luts[size] = lut
+        return lut
+
+    def map(self, values, out=None, lut_size=4096):
+        """Map values to RGBA colors.
+
+        Parameters
+        ----------
+        values : array_like
+            The values to map.
+        out : numpy.ndarray, optional
+            A uint8 array of shape `values.shape + (4,)` to write into.
+        lut_size : int or None
+            The size of the lookup table to use, see `lut`. If None, the
+            interpolation is evaluated for every value.
+
+        As on the frontend, values outside of the domain of a scale that
+        is not clamped are extrapolated by evaluating the interpolation.
+
+        Returns
+        -------
+        numpy.ndarray
+            The RGBA colors as uint8, with shape `values.shape + (4,)`.
+        """
+        t = self._normalize(values)
+        colors = get_union_array(self.colors)
+        if lut_size is not None:
+            return _lut_lookup_exact(
+                self.lut(lut_size),
+                t,
+                lambda t: interpolate_colors(colors, t, self.space, self.gamma),
+                out,
+            )
+        result = interpolate_colors(colors, t, self.space, self.gamma)
+        if out is None:
+            return result
+        out[...] = result
+        return out
@@ -8,12 +8,70 @@
 TODO: Add module docstring
 """
 
+from base64 import b64encode
+from xml.sax.saxutils import escape
+
+import numpy as np
 from ipywidgets import DOMWidget, widget_serialization, register
-from traitlets import Unicode, Instance, Enum, Float, Int
+from traitlets import Unicode, Instance, Enum, Float, Int, Bool, CFloat, observe
 from .color import ColorScale
+from .image import encode_png
+from .traittypes import VarlenTuple
 from ._frontend import module_name, module_version
 
 
+# Approximate metrics of the axis text, as rendered by d3-axis:
+_font_size = 10
+_char_width = 6
+_tick_size = 6
+_tick_padding = 3
+
+
+def _state_key(widget):
+    """A hashable key of the synced state of a widget."""
+    items = [type(widget)]
+    for name in sorted(widget.keys):
+        value = getattr(widget, name)
+        if isinstance(value, np.ndarray):
+            value = (value.dtype.str, value.shape, value.tobytes())
+        elif isinstance(value, list):
+            value = tuple(value)
+        items.append((name, value))
+    return tuple(items)
+
+
+def _bar_fractions(colormap, values):
+    """The relative positions of domain values along a color bar."""
+    d = np.array([colormap.domain[0], colormap.domain[-1]], dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if hasattr(colormap, "_transform"):
+        d = colormap._transform(d)
+        values = colormap._transform(values)
+    return (values - d[0]) / (d[1] - d[0])
+
+
+def _bar_colors(colormap, n):
+    """The colors of a color map at the centers of `n` pixels along a bar.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (n, 4) array of uint8 RGBA colors, from the start of the domain.
+    """
+    if not hasattr(colormap, "map"):
+        raise ValueError(
+            "Cannot render %s in the kernel" % type(colormap).__name__
+        )
+    t = (np.arange(n) + 0.5) / n
+    d = np.array([colormap.domain[0], colormap.domain[-1]], dtype=np.float64)
+    if hasattr(colormap, "_transform"):
+        lo, hi = colormap._transform(d)
+        values = colormap._untransform(lo + t * (hi - lo))
+    else:
+        values = d[0] + t * (d[1] - d[0])
+    return colormap.map(values)
+
+
 class Base(DOMWidget):
     """A color bar widget, representing a color map"""
 
@@ -46,6 +104,214 @@ class ColorBar(Base):
     title_padding = Int(0).tag(sync=True)
     axis_padding = Int(0).tag(sync=True)
 
+    kernel_ticks = Bool(
+        False,
+        help="Whether to compute the axis ticks in the kernel, "
+        "instead of on every redraw in the frontend.",
+    )
+    tick_count = Int(10, min=0)
+
+    tick_values = VarlenTuple(
+        trait=CFloat(), default_value=None, allow_none=True, minlen=0
+    ).tag(sync=True)
+    tick_labels = VarlenTuple(
+        trait=Unicode(), default_value=None, allow_none=True, minlen=0
+    ).tag(sync=True)
+
+    @observe("colormap")
+    def _on_colormap_change(self, change):
+        if change["old"] is not None:
+            change["old"].unobserve(self._on_colormap_trait_change)
+        if change["new"] is not None:
+            change["new"].observe(self._on_colormap_trait_change)
+        self._update_ticks()
+
+    def close(self):
+        # Do not keep this alive through the observer on the color map:
+        if self.colormap is not None:
+            self.colormap.unobserve(self._on_colormap_trait_change)
+        super(ColorBar, self).close()
+
+    @observe("kernel_ticks", "tick_count")
+    def _on_tick_config_change(self, change):
+        self._update_ticks()
+
+    def _on_colormap_trait_change(self, change):
+        self._update_ticks()
+
+    def _update_ticks(self):
+        # Ticks are only computed for color maps with a numeric domain:
+        colormap = self.colormap
+        values = labels = None
+        if self.kernel_ticks and hasattr(colormap, "ticks"):
+            values = colormap.ticks(self.tick_count)
+            labels = colormap.tick_labels(self.tick_count)
+        with self.hold_sync():
+            self.tick_values = values
+            self.tick_labels = labels
+
+    _render_cache = None
+
+    def _cached_render(self, kind, render):
+        # Renders are cached by the state of the bar and its color map:
+        key = (
+            self.orientation,
+            self.side,
+            self.length,
+            self.breadth,
+            self.border_thickness,
+            self.padding,
+            self.title,
+            self.title_padding,
+            self.axis_padding,
+            self.tick_count,
+            _state_key(self.colormap),
+        )
+        if self._render_cache is None:
+            self._render_cache = {}
+        cached = self._render_cache.get(kind)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        result = render()
+        self._render_cache[kind] = (key, result)
+        return result
+
+    def _bar_image(self):
+        """The colors of the bar as an RGBA image, with the domain start
+        at the left or bottom."""
+        colors = _bar_colors(self.colormap, self.length)
+        if self.orientation == "vertical":
+            return np.broadcast_to(colors[::-1, None], (self.length, 1, 4))
+        return colors[None]
+
+    def to_png(self):
+        """Render the color bar as a PNG image in the kernel.
+
+        The image holds the bar and its border, with padding, using the
+        lookup table of the color map. The axis and title are not
+        included, since rendering text would need a font rasterizer;
+        use `to_svg` for a complete color bar.
+
+        Returns
+        -------
+        bytes
+        """
+        return self._cached_render("png", self._render_png)
+
+    def _render_png(self):
+        bar = self._bar_image()
+        if self.orientation == "vertical":
+            bar = np.broadcast_to(bar, (self.length, self.breadth, 4))
+        else:
+            bar = np.broadcast_to(bar, (self.breadth, self.length, 4))
+        b = max(0, int(round(self.border_thickness)))
+        p = max(0, self.padding)
+        h, w = bar.shape[:2]
+        image = np.zeros((h + 2 * (b + p), w + 2 * (b + p), 4), dtype=np.uint8)
+        image[p : p + h + 2 * b, p : p + w + 2 * b] = (0, 0, 0, 255)
+        image[p + b : p + b + h, p + b : p + b + w] = bar
+        return encode_png(image)
+
+    def to_svg(self):
+        """Render the color bar as an SVG image in the kernel.
+
+        The colors are embedded as a single PNG strip from the lookup
+        table of the color map. The axis ticks are those of the color
+        map (see `tick_count`), and the text size is approximate.
+
+        Returns
+        -------
+        str
+        """
+        return self._cached_render("svg", self._render_svg)
+
+    def _render_svg(self):
+        vertical = self.orientation == "vertical"
+        colormap = self.colormap
+        if hasattr(colormap, "ticks"):
+            ticks = colormap.ticks(self.tick_count)
+            labels = colormap.tick_labels(self.tick_count)
+        else:
+            ticks, labels = (), ()
+        # Lay out along (u) and across (w) the bar, from the bar side:
+        b = max(0.0, self.border_thickness)
+        p = self.padding
+        widest = max([len(label) for label in labels] or [0]) * _char_width
+        label_across = widest if vertical else _font_size
+        label_along = _font_size if vertical else widest
+        u0 = p + b + label_along / 2
+        w0 = p + b
+        w_axis = w0 + self.breadth + b + self.axis_padding
+        w_labels = w_axis + _tick_size + _tick_padding
+        w_title = w_labels + label_across + self.title_padding + _font_size
+        along = 2 * u0 + self.length
+        across = (w_title if self.title else w_labels + label_across) + p
+        mirrored = self.side == "topleft"
+
+        def point(u, w):
+            if mirrored:
+                w = across - w
+            return (w, u) if vertical else (u, w)
+
+        def position(fraction):
+            return u0 + self.length * ((1 - fraction) if vertical else fraction)
+
+        width, height = (across, along) if vertical else (along, across)
+        x, y = point(u0, w0 if not mirrored else w0 + self.breadth)
+        bar_w, bar_h = (self.breadth, self.length)
+        if not vertical:
+            bar_w, bar_h = bar_h, bar_w
+        strip = b64encode(encode_png(self._bar_image())).decode("ascii")
+        parts = [
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'width="%g" height="%g" viewBox="0 0 %g %g" '
+            'font-family="sans-serif" font-size="%d">'
+            % (width, height, width, height, _font_size),
+            '<image x="%g" y="%g" width="%g" height="%g" '
+            'preserveAspectRatio="none" xlink:href="data:image/png;base64,%s"/>'
+            % (x, y, bar_w, bar_h, strip),
+        ]
+        if b > 0:
+            parts.append(
+                '<rect x="%g" y="%g" width="%g" height="%g" fill="none" '
+                'stroke="black" stroke-width="%g"/>'
+                % (x - b / 2, y - b / 2, bar_w + b, bar_h + b, b)
+            )
+        if vertical:
+            anchor = "end" if mirrored else "start"
+            dy = "0.32em"
+        else:
+            anchor = "middle"
+            dy = "0em" if mirrored else "0.71em"
+        fractions = _bar_fractions(colormap, ticks) if len(ticks) else ()
+        for fraction, label in zip(fractions, labels):
+            u = position(fraction)
+            x1, y1 = point(u, w_axis)
+            x2, y2 = point(u, w_axis + _tick_size)
+            tx, ty = point(u, w_labels)
+            parts.append(
+                '<line x1="%g" y1="%g" x2="%g" y2="%g" stroke="black"/>'
+                % (x1, y1, x2, y2)
+            )
+            if label:
+                parts.append(
+                    '<text x="%g" y="%g" dy="%s" text-anchor="%s">%s</text>'
+                    % (tx, ty, dy, anchor, escape(label))
+                )
+        if self.title:
+            tx, ty = point(along / 2, w_title - _font_size / 2)
+            rotate = ""
+            if vertical:
+                angle = 90 if mirrored else -90
+                rotate = ' transform="rotate(%d %g %g)"' % (angle, tx, ty)
+            parts.append(
+                '<text x="%g" y="%g" dy="0.32em" text-anchor="middle"%s>%s</text>'
+                % (tx, ty, rotate, escape(self.title))
+            )
+        parts.append("</svg>")
+        return "".join(parts)
+
 
 @register
 class ColorMapEditor(Base):
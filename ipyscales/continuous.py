@@ -8,29 +8,303 @@
 Defines linear scale widget, and any supporting functions
 """
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
+
+import numpy as np
 from traitlets import Float, CFloat, Unicode, List, Union, Bool, Any
 from ipywidgets import Color, register
 
-from .scale import Scale
+from .scale import Scale, tuple_serializers
+from .sketch import QuantileSketch
+from .ticks import LinearTicks, nice_linear, log_ticks, log_tick_format
 from .traittypes import VarlenTuple
 
 
-class ContinuousScale(Scale):
+def _piecewise_affine(domain, range):
+    """Get the segment breaks, slopes and offsets of a polylinear mapping.
+
+    Mirrors the bimap/polymap logic of d3-scale: the domain and range
+    are truncated to the same length, and reversed if the domain is
+    descending, so that segments can be found by binary search.
+    """
+    n = min(len(domain), len(range))
+    d = np.array(domain[:n], dtype=np.float64)
+    r = np.array(range[:n], dtype=np.float64)
+    if d[-1] < d[0]:
+        d = d[::-1]
+        r = r[::-1]
+    span = np.diff(d)
+    degenerate = span == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(degenerate, 0.0, np.diff(r) / span)
+    # d3 maps a zero-width domain segment to the midpoint of its range
+    offset = np.where(degenerate, 0.5 * (r[:-1] + r[1:]), r[:-1] - d[:-1] * slope)
+    return d, slope, offset
+
+
+def _apply_piecewise(x, breaks, slope, offset, out):
+    """Evaluate a piecewise affine mapping element-wise into `out`."""
+    if len(slope) == 1:
+        np.multiply(x, slope[0], out=out)
+        np.add(out, offset[0], out=out)
+        return out
+    # Equivalent to d3's `bisect(domain, x, 1, j) - 1`:
+    idx = np.searchsorted(breaks[1:-1], x, side="right")
+    k = slope[idx]
+    c = offset[idx]
+    np.multiply(x, k, out=out)
+    np.add(out, c, out=out)
+    return out
+
+
+def _prepare_output(values, out):
+    values = np.asanyarray(values)
+    if out is None:
+        dtype = values.dtype if values.dtype.kind == "f" else np.float64
+        out = np.empty(values.shape, dtype=dtype)
+    elif out.shape != values.shape:
+        raise ValueError(
+            "out has shape %s, but the input has shape %s" % (out.shape, values.shape)
+        )
+    return values, out
+
+
+def _iter_chunks(data, chunk_size):
+    """Split an array into chunks of about `chunk_size` values, without copying.
+
+    Memory-mapped arrays are only read when each chunk is reduced.
+    """
+    data = np.asanyarray(data)
+    if data.ndim <= 1 or data.flags.c_contiguous:
+        flat = data.reshape(-1)
+        for start in range(0, len(flat), chunk_size):
+            yield flat[start : start + chunk_size]
+    else:
+        rows = max(1, chunk_size * len(data) // max(1, data.size))
+        for start in range(0, len(data), rows):
+            yield data[start : start + rows]
+
+
+def _reduce_chunks(reduce, chunks, combine, workers):
+    """Reduce chunks in a thread pool, combining the results in order.
+
+    Only a bounded number of chunks are in flight at a time, so that
+    results (and any data read) do not accumulate for large inputs.
+    """
+    result = None
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(reduce, chunk))
+            if len(pending) >= 2 * workers:
+                result = combine(result, pending.popleft().result())
+        while pending:
+            result = combine(result, pending.popleft().result())
+    return result
+
+
+def _combine_extents(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a[0], b[0]), max(a[1], b[1])
+
+
+def _combine_sketches(a, b):
+    return b if a is None else a.merge(b)
+
+
+class ContinuousScale(Scale, LinearTicks):
     """A continuous scale widget.
 
     This should be treated as an abstract class, and should
     not be directly instantiated.
+
+    Calling the scale with an array will map the values with the
+    same semantics as the d3 scale on the frontend, but as a
+    vectorized NumPy operation in the kernel. Only numeric ranges
+    can be evaluated this way.
     """
 
-    domain = VarlenTuple(trait=CFloat(), default_value=(0.0, 1.0), minlen=2).tag(
-        sync=True
-    )
+    domain = VarlenTuple(
+        trait=CFloat(), default_value=(0.0, 1.0), minlen=2, finite=True
+    ).tag(sync=True, **tuple_serializers)
 
-    range = VarlenTuple(trait=Any(), default_value=(0.0, 1.0), minlen=2).tag(sync=True)
+    range = VarlenTuple(trait=Any(), default_value=(0.0, 1.0), minlen=2).tag(
+        sync=True, **tuple_serializers
+    )
 
     interpolator = Unicode("interpolate").tag(sync=True)
     clamp = Bool(False).tag(sync=True)
 
+    def __call__(self, values, out=None):
+        """Map values from the domain to the range.
+
+        Parameters
+        ----------
+        values : array_like
+            The values to scale.
+        out : numpy.ndarray, optional
+            A floating point array with the same shape as `values` to
+            write the result into. Can be `values` itself.
+
+        Returns
+        -------
+        numpy.ndarray
+            The scaled values (`out` if it was given).
+        """
+        return self._map_to(values, self.range, out)
+
+    def _map_to(self, values, range, out=None):
+        """Map values from the domain to the given range values."""
+        values, out = _prepare_output(values, out)
+        domain = self._transform(np.asarray(self.domain, dtype=np.float64))
+        breaks, slope, offset = _piecewise_affine(domain, range)
+        if self.clamp:
+            lo, hi = sorted((self.domain[0], self.domain[-1]))
+            values = np.clip(values, lo, hi, out=out)
+        values = self._transform(values, out=out)
+        return _apply_piecewise(values, breaks, slope, offset, out)
+
+    def invert(self, values, out=None):
+        """Map values from the range back to the domain.
+
+        Parameters
+        ----------
+        values : array_like
+            The values to invert.
+        out : numpy.ndarray, optional
+            A floating point array with the same shape as `values` to
+            write the result into. Can be `values` itself.
+
+        Returns
+        -------
+        numpy.ndarray
+            The inverted values (`out` if it was given).
+        """
+        values, out = _prepare_output(values, out)
+        domain = self._transform(np.asarray(self.domain, dtype=np.float64))
+        breaks, slope, offset = _piecewise_affine(self.range, domain)
+        _apply_piecewise(values, breaks, slope, offset, out)
+        self._untransform(out, out=out)
+        if self.clamp:
+            lo, hi = sorted((self.domain[0], self.domain[-1]))
+            np.clip(out, lo, hi, out=out)
+        return out
+
+    def fit(
+        self,
+        data,
+        nice=False,
+        ignore_nan=True,
+        percentiles=None,
+        chunk_size=1 << 20,
+        workers=None,
+    ):
+        """Set the domain to the extent of some data.
+
+        The data is reduced in chunks by a pool of threads, so that large
+        (e.g. memory-mapped) arrays are streamed through without being
+        loaded as a whole.
+
+        If the domain is descending, it stays descending. The stops of a
+        polylinear domain keep their relative positions.
+
+        Parameters
+        ----------
+        data : array_like
+            The data to fit the domain to.
+        nice : bool or int
+            Whether to extend the domain to round values, as with d3's
+            `nice()`. An integer gives the approximate tick count to
+            round for (default 10).
+        ignore_nan : bool
+            Whether to skip NaN values. If False, a ValueError is raised
+            if the data contains NaN.
+        percentiles : tuple of float, optional
+            The lower and upper percentiles (between 0 and 100) of the
+            data to use as the extent, instead of the minimum and maximum.
+            These are estimated with a `QuantileSketch`.
+        chunk_size : int
+            The approximate number of values in each chunk.
+        workers : int, optional
+            The number of threads to use. Defaults to the CPU count.
+
+        Returns
+        -------
+        The scale itself.
+        """
+        chunks = _iter_chunks(data, chunk_size)
+        workers = workers or os.cpu_count() or 1
+        if percentiles is None:
+            extent = _reduce_chunks(
+                lambda c: self._chunk_extent(c, ignore_nan),
+                chunks,
+                _combine_extents,
+                workers,
+            )
+        else:
+            sketch = _reduce_chunks(
+                lambda c: QuantileSketch().update(self._fit_values(c, ignore_nan)),
+                chunks,
+                _combine_sketches,
+                workers,
+            )
+            extent = None
+            if sketch is not None and sketch.count:
+                q = np.asarray(percentiles, dtype=np.float64) / 100
+                extent = tuple(sketch.quantiles(q).tolist())
+        if extent is None:
+            raise ValueError("Cannot fit the domain without any valid data")
+        lo, hi = extent
+        if nice:
+            lo, hi = self._nice(lo, hi, 10 if nice is True else nice)
+        domain = np.asarray(self.domain, dtype=np.float64)
+        if domain[-1] < domain[0]:
+            lo, hi = hi, lo
+        if len(domain) > 2 and domain[-1] != domain[0]:
+            relative = (domain - domain[0]) / (domain[-1] - domain[0])
+            self.domain = tuple((lo + relative * (hi - lo)).tolist())
+        else:
+            self.domain = (lo,) + (hi,) * (len(domain) - 1)
+        return self
+
+    def _fit_values(self, chunk, ignore_nan):
+        """Get the values of a chunk of data to fit the domain to."""
+        values = np.asarray(chunk, dtype=np.float64).reshape(-1)
+        nan = np.isnan(values)
+        if nan.any():
+            if not ignore_nan:
+                raise ValueError("Cannot fit the domain to data with NaN values")
+            values = values[~nan]
+        return values
+
+    def _chunk_extent(self, chunk, ignore_nan):
+        values = self._fit_values(chunk, ignore_nan)
+        if not len(values):
+            return None
+        return values.min(), values.max()
+
+    def _nice(self, lo, hi, count):
+        """Extend an ascending extent to round values."""
+        return nice_linear(lo, hi, count)
+
+    def _transform(self, values, out=None):
+        """Transform domain values into the linear space of the scale.
+
+        Implementations may write the result to `out`, but callers
+        should use the returned array.
+        """
+        return values
+
+    def _untransform(self, values, out=None):
+        """The inverse of `_transform`."""
+        return self._transform(values, out=out)
+
 
 @register
 class LinearScale(ContinuousScale):
@@ -53,12 +327,72 @@ class LogScale(ContinuousScale):
 
     _model_name = Unicode("LogScaleModel").tag(sync=True)
 
-    domain = VarlenTuple(trait=CFloat(), default_value=(1.0, 10.0), minlen=2).tag(
-        sync=True
-    )
+    domain = VarlenTuple(
+        trait=CFloat(), default_value=(1.0, 10.0), minlen=2, finite=True
+    ).tag(sync=True, **tuple_serializers)
 
     base = Float(10).tag(sync=True)
 
+    def _reflected(self):
+        # As in d3, a strictly negative domain is handled by reflection
+        return self.domain[0] < 0
+
+    def _fit_values(self, chunk, ignore_nan):
+        # Non-positive values cannot be shown on a log scale:
+        values = super(LogScale, self)._fit_values(chunk, ignore_nan)
+        return values[values > 0]
+
+    def _nice(self, lo, hi, count):
+        # As d3, round to integer powers of the base:
+        if self.base == 10:
+            logs, pows = math.log10, lambda x: float("1e%d" % x)
+        else:
+            logs = lambda x: math.log(x, self.base)
+            pows = lambda x: self.base ** x
+        return pows(math.floor(logs(lo))), pows(math.ceil(logs(hi)))
+
+    def ticks(self, count=10):
+        """Get about `count` representative values from the domain.
+
+        As for the d3 log scale, these are the integer powers of the
+        base and their multiples, if the domain spans few powers.
+        """
+        return log_ticks(
+            float(self.domain[0]), float(self.domain[-1]), count, float(self.base)
+        )
+
+    def tick_format(self, count=10, specifier=None):
+        """Get a function for formatting the ticks, as the d3 scale.
+
+        The default specifier is "s" (SI-prefix) for base 10, and ","
+        otherwise. As in d3, only the labels of about `count` ticks are
+        shown, with the others formatted as empty strings.
+        """
+        return log_tick_format(
+            float(self.domain[0]),
+            float(self.domain[-1]),
+            count,
+            float(self.base),
+            specifier,
+        )
+
+    def _transform(self, values, out=None):
+        # The base does not affect the mapping, since it cancels out
+        # when normalizing against the domain (as in d3). Natural
+        # logarithms are therefore used for speed and precision.
+        if self._reflected():
+            out = np.negative(values, out=out)
+            np.log(out, out=out)
+            return np.negative(out, out=out)
+        return np.log(values, out=out)
+
+    def _untransform(self, values, out=None):
+        if self._reflected():
+            out = np.negative(values, out=out)
+            np.exp(out, out=out)
+            return np.negative(out, out=out)
+        return np.exp(values, out=out)
+
 
 @register
 class PowScale(ContinuousScale):
@@ -71,3 +405,19 @@ class PowScale(ContinuousScale):
     _model_name = Unicode("PowScaleModel").tag(sync=True)
 
     exponent = Float(1).tag(sync=True)
+
+    def _transform(self, values, out=None):
+        return self._signed_power(values, self.exponent, out)
+
+    def _untransform(self, values, out=None):
+        return self._signed_power(values, 1.0 / self.exponent, out)
+
+    @staticmethod
+    def _signed_power(values, exponent, out):
+        if exponent == 1:
+            return values
+        if out is None or np.may_share_memory(values, out):
+            return np.copysign(np.power(np.abs(values), exponent), values, out=out)
+        np.abs(values, out=out)
+        np.power(out, exponent, out=out)
+        return np.copysign(out, values, out=out)
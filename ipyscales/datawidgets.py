@@ -8,20 +8,150 @@
 Scaled data widget.
 """
 
-from ipywidgets import register, widget_serialization
-from traitlets import Instance, Unicode, Undefined, Union
+from io import BytesIO
+import operator
+import os
+import stat
+import uuid
+
+import numpy as np
+from ipywidgets import Widget, register, widget_serialization
+from traitlets import Bool, Enum, Instance, Int, Unicode, Undefined, Union, observe
 from ipydatawidgets import (
     DataUnion,
     data_union_serialization,
+    get_union_array,
     NDArraySource,
     NDArrayBase,
 )
 
-from .scale import Scale
-from .color import ColorScale
+from .scale import Scale, ComposedScale
+from .traittypes import VarlenTuple
+from .image import write_png
 from ._frontend import module_name, module_version
 
 
+# Javascript has no 64 bit typed arrays, so these are cast when serialized:
+_serialized_dtypes = {
+    np.dtype("int64"): np.dtype("int32"),
+    np.dtype("uint64"): np.dtype("uint32"),
+}
+
+# The normalized integer output dtypes, as (storage dtype, maximum):
+_normalized_dtypes = {
+    "uint8_norm": (np.dtype("uint8"), 255),
+    "uint16_norm": (np.dtype("uint16"), 65535),
+}
+
+# The output dtypes of ScaledArray, besides "inherit". These match the
+# typed arrays available on the frontend:
+_output_dtypes = (
+    "int8",
+    "uint8",
+    "uint8_clamped",
+    "int16",
+    "uint16",
+    "int32",
+    "uint32",
+    "float32",
+    "float64",
+) + tuple(_normalized_dtypes)
+
+
+def _as_typed_array(values, dtype):
+    """Convert values as when assigned to a Javascript typed array.
+
+    Assignment to an integer typed array truncates, and wraps around
+    on overflow, with non-finite values as 0. The "uint8_clamped"
+    dtype of ndarray rounds and clamps instead.
+    """
+    values = np.asarray(values)
+    if dtype == "uint8_clamped":
+        values = np.nan_to_num(values.astype(np.float64), nan=0.0)
+        return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f" or values.dtype == dtype:
+        return values.astype(dtype)
+    if values.dtype.kind in "biu":
+        return values.astype(dtype)
+    values = np.trunc(values.astype(np.float64))
+    values = np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+    return values.astype(np.int64).astype(dtype)
+
+
+def _as_output(values, output_dtype, color):
+    """Convert scaled values to an output dtype, as the frontend does.
+
+    For the normalized integer dtypes, numeric values in [0, 1] are
+    mapped to the full range of the integer type (rounding half up, as
+    Javascript's Math.round), with values outside clamped and NaN as 0.
+    Color channels are rescaled from 0-255 to the full range instead.
+    """
+    if output_dtype not in _normalized_dtypes:
+        return _as_typed_array(values, output_dtype)
+    dtype, maximum = _normalized_dtypes[output_dtype]
+    values = np.asarray(values, dtype=np.float64)
+    if color:
+        return (values * (maximum // 255)).astype(dtype)
+    values = np.clip(np.nan_to_num(values, nan=0.0), 0, 1)
+    return np.floor(values * maximum + 0.5).astype(dtype)
+
+
+def _write_file_atomic(path, write):
+    """Write a file by calling `write` with a binary file object.
+
+    The content is written to a temporary file in the same directory,
+    which then replaces the file at `path`. If `write` raises, the
+    temporary file is removed and any existing file is left untouched.
+    """
+    path = os.fsdecode(path)
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, ".%s.%s.tmp" % (name, uuid.uuid4().hex))
+    # Created as a new file would be, with the umask applied by the OS:
+    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+    fd = os.open(temp_path, flags, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            write(fp)
+        # Keep the mode of a file that is replaced:
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _normalize_region(index, shape):
+    """Get the box region of an index, as (start, stop) pairs per axis.
+
+    Only integers and slices with unit step are supported.
+    """
+    if not isinstance(index, tuple):
+        index = (index,)
+    if len(index) > len(shape):
+        raise IndexError(
+            "Too many indices for array of dimension %d" % len(shape)
+        )
+    index = index + (slice(None),) * (len(shape) - len(index))
+    region = []
+    for s, n in zip(index, shape):
+        if isinstance(s, slice):
+            start, stop, step = s.indices(n)
+            if step != 1:
+                raise ValueError("Only slices with a step of 1 are supported")
+            region.append((start, max(start, stop)))
+        else:
+            i = operator.index(s)
+            if not -n <= i < n:
+                raise IndexError("Index %d is out of bounds for axis with size %d" % (i, n))
+            i %= n
+            region.append((i, i + 1))
+    return region
+
+
 @register
 class ScaledArray(NDArraySource):
     """A widget that provides a scaled version of the array.
@@ -29,6 +159,9 @@ class ScaledArray(NDArraySource):
     The widget will compute the scaled version of the array on the
     frontend side in order to avoid re-transmission of data when
     only the scale changes.
+
+    For headless use (e.g. when executing notebooks without a frontend),
+    the scaled array can also be computed in the kernel with `compute`.
     """
 
     _model_name = Unicode("ScaledArrayModel").tag(sync=True)
@@ -41,18 +174,285 @@ class ScaledArray(NDArraySource):
 
     scale = Instance(Scale).tag(sync=True, **widget_serialization)
 
-    # TODO: Use Enum instead of free-text:
-    output_dtype = Unicode("inherit").tag(sync=True)
+    output_dtype = Enum(
+        ("inherit",) + _output_dtypes,
+        "inherit",
+        help="The dtype of the scaled array. With \"inherit\", the dtype of "
+        "the data is kept. For compact RGBA outputs of color scales, use "
+        "\"uint8_clamped\". The normalized integer dtypes \"uint8_norm\" and "
+        "\"uint16_norm\" map numeric outputs in [0, 1] to the full range of "
+        "the integer type (clamping values outside), and rescale the 0-255 "
+        "color channels to that range.",
+    ).tag(sync=True)
+
+    lut_size = Int(
+        4096,
+        min=2,
+        allow_none=True,
+        help="The size of the lookup table used to map values with a continuous "
+        "color scale. If None, the color scale is evaluated for every value.",
+    ).tag(sync=True)
+
+    use_workers = Bool(
+        False,
+        help="Whether to compute the scaled array in background workers on the "
+        "frontend, to keep the page responsive for large arrays. Only continuous "
+        "scales with numeric ranges, and continuous color scales with a lookup "
+        "table, are supported. Other scales are computed as usual.",
+    ).tag(sync=True)
 
     def __init__(self, data=Undefined, scale=Undefined, **kwargs):
         super(ScaledArray, self).__init__(data=data, scale=scale, **kwargs)
 
+    _scale_version = 0
+    _compute_cache = None
+    _observed_scales = ()
+
+    @observe("scale")
+    def _on_scale_change(self, change):
+        self._observe_scales()
+        self._compute_cache = None
+
+    def _observe_scales(self):
+        """Observe the scale, and the members of composed scales."""
+        scales = []
+        pending = [self.scale] if self.scale is not None else []
+        while pending:
+            scale = pending.pop()
+            if scale not in scales:
+                scales.append(scale)
+                if isinstance(scale, ComposedScale):
+                    pending.extend(scale.scales)
+        for scale in self._observed_scales:
+            if scale not in scales:
+                scale.unobserve(self._on_scale_trait_change)
+        for scale in scales:
+            if scale not in self._observed_scales:
+                scale.observe(self._on_scale_trait_change)
+        self._observed_scales = tuple(scales)
+
+    def _on_scale_trait_change(self, change):
+        # Only synced traits can affect the frontend result:
+        if change["name"] in change["owner"].keys:
+            self._scale_version += 1
+        if change["name"] == "scales" and isinstance(change["owner"], ComposedScale):
+            self._observe_scales()
+
+    def compute(self):
+        """Compute the scaled array in the kernel.
+
+        The result matches the `scaledData` computed by the frontend,
+        including the conversion to `output_dtype`, and the trailing RGBA axis
+        for color scales. It is cached until the data array is replaced,
+        or a synced trait of the scale (including the members of composed
+        scales), `output_dtype` or `lut_size` changes. Note that in-place
+        modifications of the data are not detected.
+
+        Returns
+        -------
+        numpy.ndarray
+            A read-only array of the scaled data.
+        """
+        result = self._cached_result()
+        if result is not None:
+            return result
+        array = get_union_array(self.data)
+        result = self.scale._evaluate(array, self.lut_size)
+        result = _as_output(result, self._output_dtype(), self.scale._color_output)
+        result.flags.writeable = False
+        self._compute_cache = (array, self._compute_key(), result)
+        return result
+
+    def _compute_key(self):
+        return (self.scale, self._scale_version, self._output_dtype(), self.lut_size)
+
+    def _cached_result(self):
+        """The result of `compute`, if it is cached and still valid."""
+        cache = self._compute_cache
+        if cache is None or cache[0] is not get_union_array(self.data):
+            return None
+        if cache[1] != self._compute_key():
+            return None
+        return cache[2]
+
+    def to_image(self, tile_rows=None):
+        """Colorize the 2D data in the kernel, and encode it as PNG.
+
+        See `save` for the parameters.
+
+        Returns
+        -------
+        bytes
+        """
+        fp = BytesIO()
+        self.save(fp, tile_rows=tile_rows)
+        return fp.getvalue()
+
+    def save(self, file, tile_rows=None):
+        """Colorize the 2D data in the kernel, and write it as a PNG image.
+
+        The data is mapped through the color scale in tiles of rows,
+        which are encoded as they are computed, so that memory use is
+        bounded for large (e.g. memory-mapped) arrays. If the result of
+        `compute` is cached and still valid, it is used instead.
+
+        The first row of the data is the top row of the image.
+
+        Parameters
+        ----------
+        file : str, path-like, or file-like object
+            The path to write to, or a binary file object. A path is
+            only replaced once the whole image is written.
+        tile_rows : int, optional
+            The number of rows per tile. Defaults to tiles of about a
+            million pixels.
+        """
+        array = get_union_array(self.data)
+        if array.ndim != 2:
+            raise ValueError(
+                "Only 2D data can be saved as an image, got %dD" % array.ndim
+            )
+        if not self.scale._color_output:
+            raise TypeError(
+                "Only data scaled by a color scale can be saved as an image"
+            )
+        height, width = array.shape
+        if tile_rows is None:
+            tile_rows = max(1, (1 << 20) // max(1, width))
+        cached = self._cached_result()
+        # Only reuse results that hold the exact colors:
+        if cached is not None and not (
+            cached.dtype == np.uint8 or cached.dtype.kind == "f"
+        ):
+            cached = None
+
+        def tiles():
+            for start in range(0, height, tile_rows):
+                rows = slice(start, start + tile_rows)
+                if cached is not None:
+                    yield _as_typed_array(cached[rows], "uint8_clamped")
+                else:
+                    yield self.scale._evaluate(array[rows], self.lut_size)
+
+        if isinstance(file, (str, bytes, os.PathLike)):
+            _write_file_atomic(
+                file, lambda fp: write_png(fp, tiles(), width, height)
+            )
+        else:
+            write_png(file, tiles(), width, height)
+
+    def update_slice(self, index, values):
+        """Update part of the data, and the scaled array.
+
+        The data array is updated in place, and only the updated region
+        is sent to the frontend, where only that region is rescaled.
+        The `scaledData` change event on the frontend has the updated
+        region as `dirtyRegion` in its options.
+
+        Parameters
+        ----------
+        index : int, slice, or tuple of int and slice
+            The region to update. Slices must have a step of 1.
+        values : array_like
+            The new values, broadcastable to the region.
+        """
+        array = get_union_array(self.data)
+        region = _normalize_region(index, array.shape)
+        array[index] = values
+        self._compute_cache = None
+        box = tuple(slice(start, stop) for start, stop in region)
+        dtype = _serialized_dtypes.get(array.dtype, array.dtype)
+        buffer = np.ascontiguousarray(array[box], dtype=dtype)
+        if buffer.size == 0:
+            return
+        self.send(
+            {"event": "update_slice", "region": region},
+            buffers=[memoryview(buffer)],
+        )
+
+    def _output_dtype(self):
+        """The output dtype, with "inherit" resolved."""
+        if self.output_dtype != "inherit":
+            return self.output_dtype
+        dtype = get_union_array(self.data).dtype
+        return _serialized_dtypes.get(dtype, dtype).name
+
     def _get_dtype(self):
-        if self.output_dtype == "inherit":
-            return self.data.dtype
-        return self.output_dtype
+        output_dtype = self._output_dtype()
+        if output_dtype == "uint8_clamped":
+            return np.dtype("uint8")
+        if output_dtype in _normalized_dtypes:
+            return _normalized_dtypes[output_dtype][0]
+        return np.dtype(output_dtype)
 
     def _get_shape(self):
-        if isinstance(self.scale, ColorScale):
-            return self.data.shape + (4,)
-        return self.data.shape
+        shape = get_union_array(self.data).shape
+        if self.scale._color_output:
+            return shape + (4,)
+        return shape
+
+
+@register
+class ScaledArrayGroup(Widget):
+    """A group of ScaledArrays that share a scale.
+
+    On the frontend, a change of the scale is handled once for the whole
+    group: the color lookup table and normalization are built once, and
+    the members are recomputed together in a single scheduled batch,
+    after which the group triggers a single "computed" event.
+
+    The scale of the group is assigned to all of its members.
+    """
+
+    _model_name = Unicode("ScaledArrayGroupModel").tag(sync=True)
+    _model_module = Unicode(module_name).tag(sync=True)
+    _model_module_version = Unicode(module_version).tag(sync=True)
+
+    scale = Instance(Scale).tag(sync=True, **widget_serialization)
+
+    arrays = VarlenTuple(
+        trait=Instance(ScaledArray), default_value=(), minlen=0
+    ).tag(sync=True, **widget_serialization)
+
+    displayed_only = Bool(
+        False,
+        help="Whether to only recompute the members that are displayed, as "
+        "reported by the frontend views using them. Other members are "
+        "recomputed when they are displayed again, or their scaled data "
+        "is accessed.",
+    ).tag(sync=True)
+
+    def __init__(self, scale=Undefined, arrays=(), **kwargs):
+        super(ScaledArrayGroup, self).__init__(scale=scale, arrays=arrays, **kwargs)
+
+    @observe("scale", "arrays")
+    def _on_members_change(self, change):
+        if self.scale is None:
+            return
+        for array in self.arrays:
+            array.scale = self.scale
+
+    def add(self, data, **kwargs):
+        """Add a new ScaledArray of `data` to the group.
+
+        Any keyword arguments are passed to ScaledArray.
+
+        Returns
+        -------
+        ScaledArray
+        """
+        array = ScaledArray(data, self.scale, **kwargs)
+        self.arrays = self.arrays + (array,)
+        return array
+
+    def compute(self):
+        """Compute the scaled arrays of all members in the kernel.
+
+        See `ScaledArray.compute`. Lookup tables are cached by the
+        scale, and so are shared by the members.
+
+        Returns
+        -------
+        list of numpy.ndarray
+        """
+        return [array.compute() for array in self.arrays]
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+"""
+Encoding of RGBA images, for kernel-side exports without a frontend.
+
+Only the standard library and NumPy are used, so that no imaging
+library is required.
+"""
+
+from io import BytesIO
+import struct
+import zlib
+
+import numpy as np
+
+
+_png_signature = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(tag, data):
+    return (
+        struct.pack(">I", len(data))
+        + tag
+        + data
+        + struct.pack(">I", zlib.crc32(data, zlib.crc32(tag)) & 0xFFFFFFFF)
+    )
+
+
+def write_png(fp, blocks, width, height, compress_level=6):
+    """Write an RGBA PNG image to a file object, block by block.
+
+    Only one block of rows needs to be in memory at a time, so that
+    large images can be written with bounded memory.
+
+    Parameters
+    ----------
+    fp : file-like object
+        A binary file object to write to.
+    blocks : iterable of array_like
+        Consecutive blocks of rows, each a uint8 array of shape
+        (rows, width, 4). The rows of all blocks should add up to
+        `height`.
+    width, height : int
+        The size of the image, in pixels.
+    compress_level : int
+        The zlib compression level, from 0 (none) to 9 (best).
+
+    Returns
+    -------
+    int
+        The number of bytes written.
+    """
+    if width < 1 or height < 1:
+        raise ValueError("Images should be at least one pixel wide and high")
+    written = 0
+
+    def write(data):
+        nonlocal written
+        fp.write(data)
+        written += len(data)
+
+    write(_png_signature)
+    # 8 bits per channel, RGBA, no interlacing:
+    write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+    compressor = zlib.compressobj(compress_level)
+    rows = 0
+    for block in blocks:
+        block = np.asarray(block)
+        if block.dtype != np.uint8 or block.shape[1:] != (width, 4):
+            raise ValueError(
+                "Expected uint8 blocks of shape (rows, %d, 4), got %s %s"
+                % (width, block.dtype, block.shape)
+            )
+        rows += len(block)
+        if rows > height:
+            raise ValueError("Got more than %d rows" % height)
+        # Each row is prefixed by its filter type (0, none):
+        scanlines = np.zeros((len(block), 1 + 4 * width), dtype=np.uint8)
+        scanlines[:, 1:] = block.reshape(len(block), 4 * width)
+        data = compressor.compress(scanlines.data)
+        if data:
+            write(_png_chunk(b"IDAT", data))
+    if rows != height:
+        raise ValueError("Got %d rows, expected %d" % (rows, height))
+    write(_png_chunk(b"IDAT", compressor.flush()))
+    write(_png_chunk(b"IEND", b""))
+    return written
+
+
+def encode_png(rgba, compress_level=6):
+    """Encode an RGBA image as PNG.
+
+    Parameters
+    ----------
+    rgba : array_like
+        A uint8 array of shape (height, width, 4).
+    compress_level : int
+        The zlib compression level, from 0 (none) to 9 (best).
+
+    Returns
+    -------
+    bytes
+    """
+    rgba = np.asarray(rgba)
+    if rgba.ndim != 3:
+        raise ValueError("Expected an array of shape (height, width, 4)")
+    fp = BytesIO()
+    write_png(fp, [rgba], rgba.shape[1], rgba.shape[0], compress_level)
+    return fp.getvalue()
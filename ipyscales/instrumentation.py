@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+"""
+Opt-in instrumentation of the comm traffic of widgets.
+
+Recording is enabled for the given widgets with the `record_comm_stats`
+context manager (or `enable_comm_stats`), which wraps the messaging
+methods of those widget instances only. Nothing is wrapped while
+disabled, so that it has no cost otherwise.
+"""
+
+from contextlib import contextmanager
+import json
+import threading
+from time import perf_counter
+
+
+_stats = {}
+
+# The instrumented widgets:
+_instrumented = set()
+
+# Guards the stats and the set of instrumented widgets:
+_lock = threading.RLock()
+
+# The instance attributes set on instrumented widgets:
+_wrapped_methods = ("_send", "get_state", "set_state")
+
+
+class WidgetCommStats(object):
+    """The comm traffic recorded for a single widget."""
+
+    fields = (
+        "model_id",
+        "widget_class",
+        "messages_sent",
+        "messages_received",
+        "json_bytes_sent",
+        "json_bytes_received",
+        "buffer_bytes_sent",
+        "buffer_bytes_received",
+        "serialize_seconds",
+        "deserialize_seconds",
+    )
+
+    def __init__(self, model_id, widget_class):
+        self.model_id = model_id
+        self.widget_class = widget_class
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.json_bytes_sent = 0
+        self.json_bytes_received = 0
+        self.buffer_bytes_sent = 0
+        self.buffer_bytes_received = 0
+        self.serialize_seconds = 0.0
+        self.deserialize_seconds = 0.0
+
+    @property
+    def total_bytes(self):
+        return (
+            self.json_bytes_sent
+            + self.json_bytes_received
+            + self.buffer_bytes_sent
+            + self.buffer_bytes_received
+        )
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.fields}
+
+
+def _record(widget):
+    """Get the stats of a widget, or None if it has no comm."""
+    model_id = getattr(widget.comm, "comm_id", None)
+    if model_id is None:
+        return None
+    try:
+        return _stats[model_id]
+    except KeyError:
+        stats = _stats[model_id] = WidgetCommStats(model_id, type(widget).__name__)
+        return stats
+
+
+def _add(widget, **amounts):
+    with _lock:
+        stats = _record(widget)
+        if stats is not None:
+            for field, amount in amounts.items():
+                setattr(stats, field, getattr(stats, field) + amount)
+
+
+def _json_size(msg):
+    return len(json.dumps(msg, default=str).encode("utf-8"))
+
+
+def _buffers_size(buffers):
+    return sum(memoryview(b).nbytes for b in buffers or ())
+
+
+def _instrument(widget):
+    """Wrap the messaging methods of a single widget instance."""
+    cls = type(widget)
+
+    def _send(msg, buffers=None):
+        _add(
+            widget,
+            messages_sent=1,
+            json_bytes_sent=_json_size(msg),
+            buffer_bytes_sent=_buffers_size(buffers),
+        )
+        return cls._send(widget, msg, buffers)
+
+    def get_state(key=None, drop_defaults=False):
+        start = perf_counter()
+        try:
+            return cls.get_state(widget, key, drop_defaults)
+        finally:
+            _add(widget, serialize_seconds=perf_counter() - start)
+
+    def set_state(sync_data):
+        start = perf_counter()
+        try:
+            return cls.set_state(widget, sync_data)
+        finally:
+            _add(widget, deserialize_seconds=perf_counter() - start)
+
+    def handle_msg(msg):
+        _add(
+            widget,
+            messages_received=1,
+            json_bytes_received=_json_size(msg["content"]["data"]),
+            buffer_bytes_received=_buffers_size(msg.get("buffers")),
+        )
+        return widget._handle_msg(msg)
+
+    widget._send = _send
+    widget.get_state = get_state
+    widget.set_state = set_state
+    if widget.comm is not None:
+        widget.comm.on_msg(handle_msg)
+
+
+def _restore(widget):
+    for name in _wrapped_methods:
+        widget.__dict__.pop(name, None)
+    if widget.comm is not None:
+        widget.comm.on_msg(widget._handle_msg)
+
+
+def comm_stats_enabled(widget=None):
+    """Whether comm traffic is being recorded (for a widget, if given)."""
+    with _lock:
+        if widget is None:
+            return bool(_instrumented)
+        return widget in _instrumented
+
+
+def enable_comm_stats(*widgets):
+    """Start recording the comm traffic of some widgets.
+
+    The number of messages, the size of their JSON and binary buffer
+    parts, and the time spent getting and setting the (serialized)
+    state are recorded per widget. Only the given widget instances are
+    instrumented. Recorded stats are kept until `reset_comm_stats`.
+
+    Prefer `record_comm_stats`, which always disables the recording.
+    """
+    with _lock:
+        for widget in widgets:
+            if widget not in _instrumented:
+                _instrument(widget)
+                _instrumented.add(widget)
+
+
+def disable_comm_stats(*widgets):
+    """Stop recording the comm traffic of some widgets, or of all if none given."""
+    with _lock:
+        for widget in widgets or list(_instrumented):
+            if widget in _instrumented:
+                _restore(widget)
+                _instrumented.discard(widget)
+
+
+def reset_comm_stats():
+    """Clear all recorded stats."""
+    with _lock:
+        _stats.clear()
+
+
+@contextmanager
+def record_comm_stats(*widgets, reset=True):
+    """Context manager to record the comm traffic of some widgets.
+
+    The widgets are restored when leaving the context, also if an error
+    is raised.
+
+    Example
+    -------
+    >>> with record_comm_stats(scale, scaled_array):
+    ...     scale.domain = (0, 10)
+    >>> comm_stats()
+    """
+    if reset:
+        reset_comm_stats()
+    try:
+        enable_comm_stats(*widgets)
+        yield
+    finally:
+        disable_comm_stats(*widgets)
+
+
+def comm_stats(sort_by="total_bytes", widget_class=None):
+    """Get a table of the recorded comm traffic.
+
+    Parameters
+    ----------
+    sort_by : str
+        The field to sort the rows by, in descending order. Either one of
+        `WidgetCommStats.fields` or "total_bytes".
+    widget_class : str or type, optional
+        Only include the widgets of this class (by name or type).
+
+    Returns
+    -------
+    list of dict
+        One row per widget, with the keys of `WidgetCommStats.fields`
+        and "total_bytes". The rows can be passed directly to
+        `pandas.DataFrame` for further analysis.
+    """
+    if isinstance(widget_class, type):
+        widget_class = widget_class.__name__
+    rows = []
+    with _lock:
+        recorded = list(_stats.values())
+    for stats in recorded:
+        if widget_class is not None and stats.widget_class != widget_class:
+            continue
+        row = stats.as_dict()
+        row["total_bytes"] = stats.total_bytes
+        rows.append(row)
+    rows.sort(key=lambda row: row[sort_by], reverse=True)
+    return rows
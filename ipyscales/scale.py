@@ -8,11 +8,27 @@
 Defines a scale widget base class, and any supporting functions
 """
 
-from ipywidgets import Widget, register
-from traitlets import Unicode, CFloat, Bool, Tuple, Any, Undefined
+from contextlib import contextmanager, ExitStack
+
+import numpy as np
+from ipywidgets import Widget, register, widget_serialization
+from traitlets import (
+    Unicode,
+    CFloat,
+    Bool,
+    Tuple,
+    Any,
+    Instance,
+    TraitError,
+    Undefined,
+    observe,
+    validate,
+)
 
 from ._frontend import module_name, module_version
 
+from .sketch import QuantileSketch
+from .ticks import LinearTicks
 from .traittypes import VarlenTuple
 
 
@@ -29,8 +45,106 @@ class Scale(Widget):
     _model_module = Unicode(module_name).tag(sync=True)
     _model_module_version = Unicode(module_version).tag(sync=True)
 
+    # Whether the frontend maps values to RGBA colors:
+    _color_output = False
 
-class SequentialScale(Scale):
+    def batch(self):
+        """Context manager to apply several changes to the scale at once.
+
+        See `batch_update` for details.
+        """
+        return batch_update(self)
+
+    def _evaluate(self, values, lut_size):
+        """Evaluate the scale in the kernel, as done by the frontend."""
+        if not callable(self):
+            raise TypeError(
+                "%s cannot be evaluated in the kernel" % type(self).__name__
+            )
+        return self(values)
+
+
+@contextmanager
+def batch_update(*scales):
+    """Context manager to apply changes to several scales at once.
+
+    All changes to each scale are synced in a single message, and the
+    frontend defers recomputing any dependent values (e.g. of
+    `ScaledArray` and `ScaledValue`) until all the changes have been
+    applied, so that each is only recomputed once.
+
+    A single scale needs no more than its one state message for this.
+    For several scales, the batch is marked by one message before and
+    one after the state messages, sent by the first scale.
+
+    Example
+    -------
+    >>> with batch_update(scale_a, scale_b):
+    ...     scale_a.domain = (0, 10)
+    ...     scale_a.clamp = True
+    ...     scale_b.range = (0, 5)
+    """
+    scales = list(dict.fromkeys(scales))
+    lead = scales[0] if len(scales) > 1 else None
+    if lead is not None:
+        lead.send({"event": "batch_begin"})
+    try:
+        with ExitStack() as stack:
+            for scale in scales:
+                stack.enter_context(scale.hold_sync())
+            yield
+    finally:
+        if lead is not None:
+            lead.send(
+                {
+                    "event": "batch_end",
+                    "scales": [scale.model_id for scale in scales[1:]],
+                }
+            )
+
+
+# Tuples at least this long are synced as binary buffers, if numeric:
+binary_tuple_min_length = 32
+
+
+def _binary_tuple_array(value):
+    """Get a numeric tuple as an array to sync as binary, or None for JSON."""
+    if value is None or len(value) < binary_tuple_min_length:
+        return None
+    try:
+        array = np.asarray(value)
+    except ValueError:
+        return None
+    if array.ndim != 1:
+        return None
+    if array.dtype.kind in "iu":
+        info = np.iinfo(np.int32)
+        if array.min() >= info.min and array.max() <= info.max:
+            return array.astype(np.int32)
+        return array.astype(np.float64)
+    if array.dtype.kind == "f":
+        return array.astype(np.float64)
+    # Booleans, strings and mixed types are sent as JSON:
+    return None
+
+
+def serialize_tuple(value, widget):
+    array = _binary_tuple_array(value)
+    if array is None:
+        return value
+    return {"dtype": str(array.dtype), "shape": [len(array)], "buffer": memoryview(array)}
+
+
+def deserialize_tuple(value, widget):
+    if isinstance(value, dict) and "buffer" in value:
+        return tuple(np.frombuffer(value["buffer"], dtype=value["dtype"]).tolist())
+    return value
+
+
+tuple_serializers = {"to_json": serialize_tuple, "from_json": deserialize_tuple}
+
+
+class SequentialScale(Scale, LinearTicks):
     """A sequential scale widget.
     """
 
@@ -38,8 +152,23 @@ class SequentialScale(Scale):
 
     clamp = Bool(False).tag(sync=True)
 
+    def _normalize(self, values):
+        """Map values to the [0, 1] interpolator input, as in d3.
+
+        Returns a new float64 array. NaN values are preserved.
+        """
+        x0, x1 = self.domain
+        t = np.subtract(values, x0, dtype=np.float64)
+        if x0 == x1:
+            t[~np.isnan(t)] = 0.5
+        else:
+            t *= 1.0 / (x1 - x0)
+        if self.clamp:
+            np.clip(t, 0, 1, out=t)
+        return t
+
 
-class DivergingScale(Scale):
+class DivergingScale(Scale, LinearTicks):
     """A diverging scale widget.
     """
 
@@ -49,9 +178,165 @@ class DivergingScale(Scale):
 
     clamp = Bool(False).tag(sync=True)
 
+    def _normalize(self, values):
+        """Map values to the [0, 1] interpolator input, as in d3.
+
+        Returns a new float64 array. NaN values are preserved.
+        """
+        x0, x1, x2 = self.domain
+        k10 = 0.0 if x0 == x1 else 0.5 / (x1 - x0)
+        k21 = 0.0 if x1 == x2 else 0.5 / (x2 - x1)
+        t = np.subtract(values, x1, dtype=np.float64)
+        # Pick the slope of the half of the domain each value falls in:
+        below = t < 0 if x0 <= x1 else t > 0
+        t *= np.where(below, k10, k21)
+        t += 0.5
+        if self.clamp:
+            np.clip(t, 0, 1, out=t)
+        return t
+
+
+class DiscretizingScale(Scale):
+    """A common base class for scales mapping continuous values to buckets.
+
+    This should be treated as an abstract class, and should
+    not be directly instantiated.
+
+    Calling the scale with an array will map the values with the same
+    semantics as the d3 scale on the frontend, by a binary search over
+    the thresholds between the buckets. The thresholds are cached, and
+    are only recomputed when the domain or range changes.
+
+    Subclasses define `_compute_thresholds()`, returning the sorted
+    thresholds between the buckets, and `_compute_extents(thresholds)`,
+    returning the lower and upper bounds of the domain of each bucket.
+    """
+
+    _bucket_cache = None
+
+    @observe("domain", "range")
+    def _invalidate_bucket_cache(self, change):
+        self._bucket_cache = None
+
+    def _cached(self, key, compute):
+        if self._bucket_cache is None:
+            self._bucket_cache = {}
+        try:
+            return self._bucket_cache[key]
+        except KeyError:
+            value = self._bucket_cache[key] = compute()
+            return value
+
+    def _thresholds(self):
+        return self._cached("thresholds", self._compute_thresholds)
+
+    def _extents(self):
+        def compute():
+            lower, upper = self._compute_extents(self._thresholds())
+            # The last row is for values not in the range, so that
+            # a missing index (-1) picks it:
+            extents = np.full((len(self.range) + 1, 2), np.nan)
+            extents[:-1, 0] = lower
+            extents[:-1, 1] = upper
+            return extents
+
+        return self._cached("extents", compute)
+
+    def _range_lookup(self):
+        return self._cached("range", lambda: _range_lookup(self.range))
+
+    def bucket(self, values):
+        """Get the index into the range for each value.
+
+        Invalid (NaN) values get the index -1.
+        """
+        thresholds = self._thresholds()
+        values = np.asanyarray(values)
+        idx = np.searchsorted(thresholds, values, side="right")
+        if values.dtype.kind in "fc":
+            idx[np.isnan(values)] = -1
+        return idx
+
+    def __call__(self, values):
+        """Map values from the domain to the range.
+
+        Invalid (NaN) values are mapped to NaN for numeric ranges,
+        and to None otherwise.
+
+        Returns
+        -------
+        numpy.ndarray
+            The range values, with the same shape as `values`.
+        """
+        idx = self.bucket(values)
+        range_values = self._range_lookup()[0]
+        result = range_values.take(idx)
+        invalid = idx < 0
+        if invalid.any():
+            if result.dtype.kind in "iuf":
+                result = result.astype(np.float64)
+                result[invalid] = np.nan
+            else:
+                result = result.astype(object)
+                result[invalid] = None
+        return result
+
+    def invert_extent(self, values):
+        """Get the extent of the domain mapped to each of the given range values.
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of shape `values.shape + (2,)` with the lower and upper
+            bounds. Values not in the range give NaN bounds, as do bounds
+            that are undefined in d3.
+        """
+        index_of = self._range_lookup()[1]
+        return self._extents()[index_of(values)]
+
+
+def _range_array(range):
+    """Convert range values to an array, without coercing mixed types."""
+    range_values = np.asarray(range)
+    if range_values.dtype.kind in "biuf" or all(isinstance(v, str) for v in range):
+        return range_values
+    return _object_array(range)
+
+
+def _object_array(values):
+    result = np.empty(len(values), dtype=object)
+    result[:] = values
+    return result
+
+
+def _range_lookup(range):
+    """Create a vectorized `range.indexOf()`, with -1 for missing values."""
+    range_values = _range_array(range)
+    if len(range) and range_values.dtype.kind in "biuf":
+        order = np.argsort(range_values, kind="stable")
+        ordered = range_values[order]
+
+        def index_of(values):
+            values = np.asanyarray(values)
+            pos = np.searchsorted(ordered, values, side="left")
+            pos = np.minimum(pos, len(ordered) - 1)
+            return np.where(ordered[pos] == values, order[pos], -1)
+
+    else:
+        first = {}
+        for i, v in enumerate(range):
+            first.setdefault(v, i)
+
+        def index_of(values):
+            values = np.asanyarray(values, dtype=object)
+            idx = [first.get(v, -1) for v in values.ravel()]
+            return np.array(idx, dtype=np.intp).reshape(values.shape)
+
+    return range_values, index_of
+
 
 @register
-class QuantizeScale(Scale):
+class QuantizeScale(DiscretizingScale):
     """A quantized scale widget.
     """
 
@@ -59,31 +344,196 @@ class QuantizeScale(Scale):
 
     domain = Tuple(CFloat(), CFloat(), default_value=(0.0, 1.0)).tag(sync=True)
 
-    range = VarlenTuple(trait=Any(), default_value=(0.0, 1.0), minlen=2).tag(sync=True)
+    range = VarlenTuple(trait=Any(), default_value=(0.0, 1.0), minlen=2).tag(
+        sync=True, **tuple_serializers
+    )
+
+    def _compute_thresholds(self):
+        x0, x1 = self.domain
+        n = len(self.range) - 1
+        i = np.arange(n)
+        return ((i + 1) * x1 - (i - n) * x0) / (n + 1)
+
+    def _compute_extents(self, thresholds):
+        x0, x1 = self.domain
+        return np.r_[x0, thresholds], np.r_[thresholds, x1]
 
 
 @register
-class QuantileScale(Scale):
+class QuantileScale(DiscretizingScale):
     """A quantile scale widget.
     """
 
     _model_name = Unicode("QuantileScaleModel").tag(sync=True)
 
-    domain = VarlenTuple(trait=CFloat(), default_value=(0,), minlen=1).tag(sync=True)
+    domain = VarlenTuple(trait=CFloat(), default_value=(0,), minlen=1).tag(
+        sync=True, **tuple_serializers
+    )
 
-    range = VarlenTuple(trait=Any(), default_value=(0,), minlen=1).tag(sync=True)
+    range = VarlenTuple(trait=Any(), default_value=(0,), minlen=1).tag(
+        sync=True, **tuple_serializers
+    )
+
+    def _sorted_domain(self):
+        domain = np.asarray(self.domain, dtype=np.float64)
+        return np.sort(domain[~np.isnan(domain)])
+
+    def _compute_thresholds(self):
+        n = max(1, len(self.range))
+        return np.quantile(self._sorted_domain(), np.arange(1, n) / n)
+
+    def _compute_extents(self, thresholds):
+        domain = self._sorted_domain()
+        return np.r_[domain[0], thresholds], np.r_[thresholds, domain[-1]]
+
+    @classmethod
+    def from_data(cls, data, n_quantiles=4, k=1000, **kwargs):
+        """Create a quantile scale summarizing a (possibly huge) data set.
+
+        Instead of using all the samples as the domain, the data is
+        summarized with a `QuantileSketch`, and the domain is set to
+        the smallest set of values that gives the same thresholds on
+        the frontend (see `sketch_domain`).
+
+        Parameters
+        ----------
+        data : array_like, iterable of array_like, or QuantileSketch
+            The samples, either as a single array, as an iterable of
+            chunks, or summarized by a sketch (e.g. merged from the
+            sketches of several workers).
+        n_quantiles : int
+            The number of quantiles. Ignored if `range` is given, and
+            otherwise the range defaults to `(0, 1, ..., n_quantiles - 1)`.
+        k : int
+            The accuracy parameter of the sketch, if one is created.
+        """
+        if "range" in kwargs:
+            n_quantiles = len(kwargs["range"])
+        else:
+            kwargs["range"] = tuple(range(n_quantiles))
+        sketch = _as_sketch(data, k)
+        return cls(domain=sketch_domain(sketch, n_quantiles), **kwargs)
+
+    def update_from_data(self, data, k=1000):
+        """Update the domain from a (possibly huge) data set.
+
+        See `from_data` for details. The number of quantiles is
+        taken from the current range.
+        """
+        sketch = _as_sketch(data, k)
+        self.domain = sketch_domain(sketch, len(self.range))
+
+
+def _as_sketch(data, k):
+    if isinstance(data, QuantileSketch):
+        return data
+    sketch = QuantileSketch(k)
+    if isinstance(data, np.ndarray):
+        return sketch.update(data)
+    data = iter(data)
+    try:
+        first = next(data)
+    except StopIteration:
+        return sketch
+    if np.ndim(first) == 0:
+        # A plain sequence of values, not of chunks:
+        return sketch.update(np.fromiter(data, dtype=np.float64, count=-1)).update(
+            [first]
+        )
+    return sketch.update(first).update_chunks(data)
+
+
+def sketch_domain(sketch, n):
+    """Get a compact QuantileScale domain from a quantile sketch.
+
+    The d3 quantile scale computes its `n - 1` thresholds by linear
+    interpolation over its (sorted) domain. For a domain of `n + 1`
+    values `[min, t_1, ..., t_(n-1), max]`, these interpolations land
+    exactly on `t_1, ..., t_(n-1)`, so only these values need to be
+    synced to the frontend.
+    """
+    if sketch.count == 0:
+        raise ValueError("Cannot compute a domain without any data")
+    return (sketch.min,) + tuple(sketch.thresholds(n)) + (sketch.max,)
 
 
 @register
-class TresholdScale(Scale):
+class TresholdScale(DiscretizingScale):
     """A treshold scale widget.
     """
 
     _model_name = Unicode("TresholdScaleModel").tag(sync=True)
 
-    domain = VarlenTuple(trait=Any(), default_value=(), minlen=0).tag(sync=True)
+    domain = VarlenTuple(trait=Any(), default_value=(), minlen=0).tag(
+        sync=True, **tuple_serializers
+    )
+
+    range = VarlenTuple(trait=Any(), default_value=(0,), minlen=1).tag(
+        sync=True, **tuple_serializers
+    )
+
+    def _compute_thresholds(self):
+        n = min(len(self.domain), len(self.range) - 1)
+        return np.asarray(self.domain[:n])
+
+    def _compute_extents(self, thresholds):
+        # Unlike the thresholds, the extents use the full domain, as in d3
+        domain = np.asarray(self.domain, dtype=np.float64)
+        n = len(self.range)
+        bounds = np.full(n + 1, np.nan)
+        m = min(len(domain), n)
+        bounds[1 : m + 1] = domain[:m]
+        return bounds[:-1], bounds[1:]
+
+
+def _factorize(values):
+    """Get integer codes and unique values for an array.
+
+    Also returns a function giving the position of the first occurrence
+    of each unique value.
+    """
+    values = np.asanyarray(values)
+    flat = values.reshape(-1)
+    if flat.dtype.kind in "iu" and len(flat):
+        lo = flat.min()
+        span = int(flat.max()) - int(lo) + 1
+        if span <= 4 * len(flat) + 1024:
+            return _factorize_dense(flat, lo, span, values.shape)
+    try:
+        uniques, first, codes = np.unique(flat, return_index=True, return_inverse=True)
+        first_positions = lambda: first
+    except TypeError:
+        # Unorderable (mixed type) values, fall back to hashing:
+        index = {}
+        codes = [index.setdefault(v, len(index)) for v in flat]
+        codes = np.array(codes, dtype=np.intp)
+        uniques = _object_array(list(index))
+        # Hashing assigns codes in order of appearance:
+        first_positions = lambda: np.arange(len(uniques))
+    # Use Python scalars, which hash equal to the domain values. NaN is
+    # replaced by a single object, since NaN objects only match themselves.
+    uniques = _object_array(
+        [_nan if v != v else v for v in uniques.tolist()]
+    )
+    return codes.reshape(values.shape), uniques, first_positions
+
+
+def _factorize_dense(flat, lo, span, shape):
+    """Factorize integers with a limited span through a direct index array."""
+    offsets = flat - lo
+    present = np.bincount(offsets, minlength=span) > 0
+    dense = np.cumsum(present) - 1
+    uniques = _object_array((np.flatnonzero(present) + lo).tolist())
 
-    range = VarlenTuple(trait=Any(), default_value=(0,), minlen=1).tag(sync=True)
+    def first_positions():
+        first = np.full(span, len(flat))
+        np.minimum.at(first, offsets, np.arange(len(flat)))
+        return first[present]
+
+    return dense.take(offsets).reshape(shape), uniques, first_positions
+
+
+_nan = float("nan")
 
 
 def serialize_unkown(value, widget):
@@ -113,8 +563,167 @@ class OrdinalScale(Scale):
 
     domain = VarlenTuple(
         trait=Any(), default_value=None, minlen=0, allow_none=True
-    ).tag(sync=True)
+    ).tag(sync=True, **tuple_serializers)
 
-    range = VarlenTuple(trait=Any(), default_value=(), minlen=0).tag(sync=True)
+    range = VarlenTuple(trait=Any(), default_value=(), minlen=0).tag(
+        sync=True, **tuple_serializers
+    )
 
     unknown = Any(scaleImplicit, allow_none=True).tag(sync=True, **unknown_serializers)
+
+    _domain_index = None
+
+    @observe("domain")
+    def _invalidate_domain_index(self, change):
+        self._domain_index = None
+
+    def _domain_values(self):
+        return self.domain or ()
+
+    def _get_domain_index(self):
+        if self._domain_index is None:
+            index = {}
+            for i, v in enumerate(self._domain_values()):
+                index.setdefault(v, i)
+            self._domain_index = index
+        return self._domain_index
+
+    def index(self, values):
+        """Get the index into the domain for each value.
+
+        The values are hashed once per distinct value, and the lookup is
+        otherwise vectorized. Pandas categorical data is mapped through
+        its codes, so that only the categories present are looked up.
+
+        If `unknown` is `scaleImplicit`, values not in the domain are
+        appended to it in order of first appearance, as in d3. Otherwise
+        they get the index -1.
+
+        Integer arrays with a limited span of values, such as category
+        codes, are mapped directly through an index array.
+
+        Returns
+        -------
+        numpy.ndarray
+            The domain indices, with the same shape as `values`.
+        """
+        categorical = getattr(values, "cat", values)
+        if hasattr(categorical, "categories") and hasattr(categorical, "codes"):
+            codes = np.asarray(categorical.codes)
+            # Only the categories present are looked up, so that unused
+            # ones are not added to an implicit domain:
+            present, first_index, inverse = np.unique(
+                codes, return_index=True, return_inverse=True
+            )
+            categories = categorical.categories
+            # Missing values (code -1) are looked up as None
+            uniques = _object_array(
+                [categories[c] if c >= 0 else None for c in present]
+            )
+            first = lambda: first_index
+            codes = inverse.reshape(codes.shape)
+        else:
+            codes, uniques, first = _factorize(values)
+        return self._lookup_uniques(uniques, first).take(codes)
+
+    def __call__(self, values):
+        """Map values from the domain to the range.
+
+        See `index` for how values are looked up. Unknown values map to
+        `unknown`, and the range is repeated if shorter than the domain.
+
+        Returns
+        -------
+        numpy.ndarray
+            The range values, with the same shape as `values`.
+        """
+        if self.range is None:
+            raise TypeError("%s has no range to map to" % type(self).__name__)
+        idx = self.index(values)
+        range_values = _range_array(self.range)
+        n = len(range_values)
+        missing = idx < 0
+        if n == 0:
+            result = np.empty(idx.shape, dtype=object)
+            result[...] = None
+        else:
+            result = range_values.take(idx % n)
+        if missing.any():
+            result = result.astype(object)
+            result[missing] = self.unknown
+        return result
+
+    def _lookup_uniques(self, uniques, first):
+        """Get the domain index of each unique value, growing it if implicit.
+
+        `first` is None, or a function giving the first occurrence of each
+        of the unique values, which is the order new values are added in.
+        """
+        index = self._get_domain_index()
+        lookup = np.array([index.get(v, -1) for v in uniques], dtype=np.intp)
+        new = np.flatnonzero(lookup < 0)
+        if len(new) and self.unknown is scaleImplicit:
+            if first is not None:
+                new = new[np.argsort(first()[new], kind="stable")]
+            added = tuple(uniques[new])
+            domain = self._domain_values()
+            start = len(domain)
+            self.domain = domain + added
+            for i, v in enumerate(added, start):
+                index[v] = i
+            lookup[new] = np.arange(start, start + len(new))
+            # Keep the extended index, rather than rebuilding it:
+            self._domain_index = index
+        return lookup
+
+
+@register
+class ComposedScale(Scale):
+    """A scale that maps values through several scales in turn.
+
+    When used with ScaledArray, the frontend evaluates all the scales
+    in a single pass over the data, without intermediate arrays. A
+    color scale should only be used as the last of the scales.
+    """
+
+    _model_name = Unicode("ComposedScaleModel").tag(sync=True)
+
+    scales = VarlenTuple(trait=Instance(Scale), minlen=1).tag(
+        sync=True, **widget_serialization
+    )
+
+    def __init__(self, scales=Undefined, **kwargs):
+        super(ComposedScale, self).__init__(scales=scales, **kwargs)
+
+    @validate("scales")
+    def _validate_scales(self, proposal):
+        pending = list(proposal["value"])
+        while pending:
+            scale = pending.pop()
+            if scale is self:
+                raise TraitError("A ComposedScale cannot contain itself")
+            if isinstance(scale, ComposedScale):
+                pending.extend(scale.scales)
+        return proposal["value"]
+
+    @property
+    def _color_output(self):
+        return self.scales[-1]._color_output
+
+    def __call__(self, values, lut_size=4096):
+        """Map values through each of the scales.
+
+        Parameters
+        ----------
+        values : array_like
+            The values to map.
+        lut_size : int or None
+            The lookup table size for continuous color scales, see
+            `ScaledArray.lut_size`.
+        """
+        return self._evaluate(values, lut_size)
+
+    def _evaluate(self, values, lut_size):
+        for scale in self.scales:
+            values = scale._evaluate(values, lut_size)
+        return values
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+"""
+Defines a streaming quantile sketch, for summarizing large data sets
+"""
+
+import numpy as np
+
+
+class QuantileSketch(object):
+    """A mergeable, streaming quantile sketch.
+
+    This is a KLL style sketch: values are kept in a hierarchy of
+    compactors, where the items of level `h` each represent `2**h`
+    of the original values. When a level overflows, it is sorted and
+    every other item is promoted to the next level. The memory used is
+    bounded by roughly `3 * k` values, independent of the amount of
+    data seen, and the rank error is of order `1 / k`.
+
+    While fewer than `k` values have been seen, quantiles are exact.
+    Sketches can be pickled, and merged, so that data can be summarized
+    in parallel in several processes. NaN values are ignored.
+
+    Parameters
+    ----------
+    k : int
+        The accuracy parameter of the sketch.
+    seed : int, optional
+        Seed for the random choices made during compaction.
+    """
+
+    # The number of values to process at a time, to bound memory use
+    block_size = 1 << 16
+
+    def __init__(self, k=1000, seed=None):
+        if k < 8:
+            raise ValueError("k should be at least 8, got %r" % k)
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add the values of an array to the sketch.
+
+        Large arrays (including memory-mapped arrays) are consumed in
+        blocks, so they are never copied as a whole.
+
+        Returns the sketch itself.
+        """
+        values = np.asanyarray(values).reshape(-1)
+        for start in range(0, len(values), self.block_size):
+            self._update_block(values[start : start + self.block_size])
+        return self
+
+    def update_chunks(self, chunks):
+        """Add the values of an iterable of arrays to the sketch.
+
+        Returns the sketch itself.
+        """
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other):
+        """Merge another sketch into this one.
+
+        Returns the sketch itself.
+        """
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for level, items in enumerate(other._levels):
+            if level == len(self._levels):
+                self._levels.append(np.empty(0))
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self._compress()
+        return self
+
+    def quantiles(self, q):
+        """Estimate the quantiles `q` of the values seen.
+
+        Exact quantiles are computed with linear interpolation, matching
+        the d3 quantile scale, as long as no compaction has happened.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        if len(self._levels) == 1:
+            return np.quantile(self._levels[0], q)
+        items = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [np.full(len(v), 2.0 ** h) for h, v in enumerate(self._levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        idx = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        result = items[np.clip(idx, 0, len(items) - 1)]
+        result = np.where(q <= 0, self.min, result)
+        return np.where(q >= 1, self.max, result)
+
+    def thresholds(self, n):
+        """Estimate the `n - 1` thresholds splitting the data into `n` quantiles."""
+        return self.quantiles(np.arange(1, n) / n)
+
+    def __len__(self):
+        return self.count
+
+    def _update_block(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self):
+        # Adding levels shrinks the capacity of those below, so sweep
+        # until all levels fit:
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self._levels)):
+                if len(self._levels[level]) > self._capacity(level):
+                    self._compact(level)
+                    compacted = True
+
+    def _compact(self, level):
+        if level + 1 == len(self._levels):
+            self._levels.append(np.empty(0))
+        items = np.sort(self._levels[level])
+        # An odd item out stays behind, to preserve the total weight
+        if len(items) % 2:
+            if self._rng.integers(2):
+                kept, items = items[:1], items[1:]
+            else:
+                kept, items = items[-1:], items[:-1]
+        else:
+            kept = items[:0]
+        promoted = items[self._rng.integers(2) :: 2]
+        self._levels[level] = kept
+        self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
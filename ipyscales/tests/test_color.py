@@ -6,18 +6,51 @@
 
 import pytest
 
+import numpy as np
 from traitlets import TraitError
 
 from ..color import (
+    colormap_lut,
+    deserialize_color_tuple,
+    serialize_color_tuple,
+    seq_colormap_names,
+    div_colormap_names,
     LinearColorScale,
     LogColorScale,
     NamedSequentialColorMap,
     NamedDivergingColorMap,
     NamedOrdinalColorMap,
+    parse_color,
 )
 from ..colorbar import ColorMapEditor
 
 
+@pytest.mark.parametrize(
+    "color,expected",
+    [
+        ("red", (1, 0, 0, 1)),
+        ("Blue", (0, 0, 1, 1)),
+        ("transparent", (0, 0, 0, 0)),
+        ("#0f0", (0, 1, 0, 1)),
+        ("#0f08", (0, 1, 0, 0x88 / 255)),
+        ("#ff0000", (1, 0, 0, 1)),
+        ("#ff000080", (1, 0, 0, 0x80 / 255)),
+        ("rgb(255, 0, 0)", (1, 0, 0, 1)),
+        ("rgba(0%, 100%, 0%, 0.5)", (0, 1, 0, 0.5)),
+        ("hsl(240, 100%, 50%)", (0, 0, 1, 1)),
+        ("hsla(0, 100%, 25%, 0.5)", (0.5, 0, 0, 0.5)),
+    ],
+)
+def test_parse_color(color, expected):
+    assert parse_color(color) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("color", ["notacolor", "#ff000", "rgb(0, 0)", "hsl(a, b, c)"])
+def test_parse_color_invalid(color):
+    with pytest.raises(ValueError):
+        parse_color(color)
+
+
 def test_lincolorscale_creation_blank():
     LinearColorScale()
 
@@ -161,3 +194,206 @@ def test_named_ordinal_colorscale_creation_invalid_name():
         NamedOrdinalColorMap("Foobar")
     with pytest.raises(TraitError):
         NamedOrdinalColorMap("Viridis")
+
+
+def test_colormap_lut_all_names():
+    for name in seq_colormap_names + div_colormap_names:
+        for size in (256, 4096):
+            lut = colormap_lut(name, size)
+            assert lut.shape == (size, 4)
+            assert lut.dtype == np.uint8
+            assert (lut[:, 3] == 255).all()
+
+
+def test_colormap_lut_matches_d3_ramp():
+    # First and last entries of d3's viridis ramp
+    lut = colormap_lut("Viridis", 256)
+    assert tuple(lut[0]) == (0x44, 0x01, 0x54, 255)
+    assert tuple(lut[-1]) == (0xFD, 0xE7, 0x25, 255)
+
+
+def test_colormap_lut_is_readonly():
+    lut = colormap_lut("Viridis")
+    with pytest.raises(ValueError):
+        lut[0, 0] = 0
+
+
+def test_colormap_lut_invalid():
+    with pytest.raises(ValueError):
+        colormap_lut("Foobar")
+    with pytest.raises(ValueError):
+        colormap_lut("Viridis", 100)
+
+
+def test_named_sequential_colorscale_map():
+    w = NamedSequentialColorMap("Viridis", domain=(0, 10))
+    result = w.map(np.array([[0, 5], [10, 20]]))
+    assert result.shape == (2, 2, 4)
+    assert result.dtype == np.uint8
+    lut = colormap_lut("Viridis", 256)
+    np.testing.assert_array_equal(result[0, 0], lut[0])
+    np.testing.assert_array_equal(result[0, 1], lut[128])
+    np.testing.assert_array_equal(result[1, 0], lut[-1])
+    np.testing.assert_array_equal(result[1, 1], lut[-1])
+
+
+def test_named_sequential_colorscale_map_nan():
+    w = NamedSequentialColorMap("Viridis")
+    result = w.map(np.array([0.5, np.nan]))
+    assert tuple(result[1]) == (0, 0, 0, 0)
+
+
+def test_named_sequential_colorscale_map_cyclic():
+    w = NamedSequentialColorMap("Rainbow")
+    values = np.array([0.25, 1.25, -0.75])
+    result = w.map(values)
+    np.testing.assert_array_equal(result[1], result[0])
+    np.testing.assert_array_equal(result[2], result[0])
+    w.clamp = True
+    result = w.map(values)
+    lut = colormap_lut("Rainbow")
+    np.testing.assert_array_equal(result[1], lut[-1])
+    np.testing.assert_array_equal(result[2], lut[0])
+
+
+# CubehelixDefault saturates to black and white outside of the domain:
+@pytest.mark.parametrize("name", ["Warm", "Cool"])
+def test_named_sequential_colorscale_map_cubehelix_extrapolates(name):
+    w = NamedSequentialColorMap(name)
+    lut = colormap_lut(name)
+    result = w.map(np.array([1.0, 1.0 + 1e-9, 1.5, -0.5]))
+    # Continuous with the table at the edge of the domain:
+    assert np.abs(result[1].astype(int) - lut[-1]).max() <= 1
+    assert not np.array_equal(result[2], result[0])
+    assert not np.array_equal(result[3], lut[0])
+    w.clamp = True
+    result = w.map(np.array([1.5, -0.5]))
+    np.testing.assert_array_equal(result, lut[[-1, 0]])
+
+
+def test_named_sequential_colorscale_map_ramp_clamps():
+    w = NamedSequentialColorMap("Viridis")
+    lut = colormap_lut("Viridis")
+    np.testing.assert_array_equal(w.map(np.array([1.5, -0.5])), lut[[-1, 0]])
+
+
+def test_named_sequential_colorscale_map_out():
+    w = NamedSequentialColorMap("Blues")
+    out = np.empty((3, 4), dtype=np.uint8)
+    assert w.map(np.array([0, 0.5, 1]), out=out, lut_size=256) is out
+    with pytest.raises(ValueError):
+        w.map(np.array([0, 0.5, 1]), out=np.empty((3, 3), dtype=np.uint8))
+
+
+def test_named_diverging_colorscale_map():
+    w = NamedDivergingColorMap("RdBu", domain=(-1, 0, 3))
+    result = w.map(np.array([-1, 0, 1.5, 3]), lut_size=256)
+    lut = colormap_lut("RdBu", 256)
+    np.testing.assert_array_equal(result[0], lut[0])
+    np.testing.assert_array_equal(result[1], lut[128])
+    np.testing.assert_array_equal(result[2], lut[192])
+    np.testing.assert_array_equal(result[3], lut[-1])
+
+
+def test_named_diverging_colorscale_map_reversed():
+    w = NamedDivergingColorMap("RdBu", domain=(1, 0, -1))
+    result = w.map(np.array([1, -1]), lut_size=256)
+    lut = colormap_lut("RdBu", 256)
+    np.testing.assert_array_equal(result[0], lut[0])
+    np.testing.assert_array_equal(result[1], lut[-1])
+
+
+def test_lincolorscale_syncs_long_range_as_rgba():
+    colors = ("red", "#00ff0080", "rgb(0, 0, 255)") * 11
+    scale = LinearColorScale(domain=tuple(range(len(colors))), range=colors)
+    state = scale.get_state()
+    assert state["range"]["format"] == "rgba"
+    assert state["range"]["shape"] == [len(colors), 4]
+    rgba = np.frombuffer(state["range"]["buffer"], dtype=np.float32).reshape(-1, 4)
+    np.testing.assert_allclose(rgba[:3], [[1, 0, 0, 1], [0, 1, 0, 128 / 255], [0, 0, 1, 1]])
+    assert deserialize_color_tuple(state["range"], scale)[:2] == (
+        "rgba(255, 0, 0, 1)",
+        "rgba(0, 255, 0, 0.501961)",
+    )
+
+
+def test_serialize_color_tuple_short_is_json():
+    assert serialize_color_tuple(("red", "blue"), None) == ("red", "blue")
+
+
+def test_lincolorscale_range_rgba():
+    w = LinearColorScale(range=("red", "#0000ff80"))
+    np.testing.assert_allclose(w.range_rgba, [[1, 0, 0, 1], [0, 0, 1, 128 / 255]])
+    assert w.range_rgba is w.range_rgba
+    w.range = ("black", "white")
+    np.testing.assert_allclose(w.range_rgba, [[0, 0, 0, 1], [1, 1, 1, 1]])
+
+
+def test_lincolorscale_parses_each_color_once():
+    parse_color.cache_clear()
+    LinearColorScale(range=("red", "blue") * 128).range_rgba
+    LinearColorScale(range=("red", "blue") * 128).range_rgba
+    assert parse_color.cache_info().misses == 2
+
+
+def test_lincolorscale_map():
+    w = LinearColorScale(domain=(0, 1, 2), range=("red", "lime", "blue"))
+    values = np.array([0, 0.5, 1, 2, 3, np.nan])
+    np.testing.assert_array_equal(
+        w.map(values),
+        [
+            [255, 0, 0, 255],
+            [127, 128, 0, 255],
+            [0, 255, 0, 255],
+            [0, 0, 255, 255],
+            [0, 0, 255, 255],
+            [0, 0, 0, 0],
+        ],
+    )
+    exact = w.map(values[:4], lut_size=None)
+    np.testing.assert_array_equal(exact[1], [128, 128, 0, 255])
+
+
+def test_lincolorscale_map_matches_frontend_outside_domain():
+    # Expected colors are those of the d3 scale on the frontend
+    w = LinearColorScale(domain=(0, 1), range=("#808080", "#c0c0c0"))
+    values = np.array([1.5, -3, np.nan])
+    expected = [[224, 224, 224, 255], [0, 0, 0, 255], [0, 0, 0, 0]]
+    np.testing.assert_array_equal(w.map(values), expected)
+    np.testing.assert_array_equal(w.map(values, lut_size=None), expected)
+    w.clamp = True
+    np.testing.assert_array_equal(
+        w.map(values), [[192, 192, 192, 255], [128, 128, 128, 255], [0, 0, 0, 0]]
+    )
+
+
+def test_logcolorscale_map_invalid_values():
+    # d3 gives unknown for NaN, but interpolates NaN for negative values
+    w = LogColorScale(domain=(1, 10), range=("red", "blue"))
+    np.testing.assert_array_equal(
+        w.map(np.array([-1.0, np.nan])), [[0, 0, 0, 255], [0, 0, 0, 0]]
+    )
+
+
+def test_lincolorscale_lut_cache():
+    w = LinearColorScale(range=("red", "blue"))
+    lut = w.lut(256)
+    assert w.lut(256) is lut
+    w.domain = (0, 2)
+    assert w.lut(256) is lut
+    w.domain = (0, 1, 2)
+    assert w.lut(256) is lut
+    w.range = ("red", "lime")
+    assert w.lut(256) is not lut
+
+
+def test_lincolorscale_map_unsupported_interpolator():
+    w = LinearColorScale(interpolator="interpolateHsl")
+    with pytest.raises(ValueError):
+        w.map(np.zeros(2))
+
+
+def test_logcolorscale_map():
+    w = LogColorScale(domain=(1, 100), range=("black", "white"))
+    result = w.map(np.array([1, 10, 100]), lut_size=None)
+    np.testing.assert_allclose(result[:, 0], [0, 128, 255], atol=1)
@@ -59,3 +59,89 @@ def test_arraycolorscale_accepts_2x4_array():
 
 def test_arraycolorscale_accepts_hsl():
     ArrayColorScale(space="hsl")
+
+
+def test_arraycolorscale_map_rgb():
+    w = ArrayColorScale(colors=[[1, 0, 0], [0, 0, 1]], domain=(0, 10))
+    result = w.map(np.array([0, 5, 10]), lut_size=None)
+    np.testing.assert_array_equal(
+        result, [[255, 0, 0, 255], [128, 0, 128, 255], [0, 0, 255, 255]]
+    )
+
+
+def test_arraycolorscale_map_alpha():
+    w = ArrayColorScale(colors=[[0, 0, 0, 0], [1, 1, 1, 1]])
+    result = w.map(np.array([0, 0.5, 1]), lut_size=None)
+    np.testing.assert_array_equal(result[:, 3], [0, 128, 255])
+
+
+def test_arraycolorscale_map_piecewise():
+    w = ArrayColorScale(colors=[[0, 0, 0], [1, 1, 1], [0, 0, 0]])
+    result = w.map(np.array([0, 0.25, 0.5, 0.75, 1]), lut_size=None)
+    np.testing.assert_array_equal(result[:, 0], [0, 128, 255, 128, 0])
+
+
+def test_arraycolorscale_map_gamma():
+    w = ArrayColorScale(colors=[[0, 0, 0], [1, 1, 1]], gamma=2.2)
+    result = w.map(np.array([0.5]), lut_size=None)
+    # Matches d3.interpolateRgb.gamma(2.2)("black", "white")(0.5)
+    assert tuple(result[0]) == (186, 186, 186, 255)
+
+
+def test_arraycolorscale_map_hsl_shortest_hue():
+    # Hues 0.9 and 0.1 (324 and 36 degrees) should interpolate via red:
+    w = ArrayColorScale(colors=[[0.9, 1, 0.5], [0.1, 1, 0.5]], space="hsl")
+    result = w.map(np.array([0.5]), lut_size=None)
+    assert tuple(result[0]) == (255, 0, 0, 255)
+
+
+def test_arraycolorscale_map_extrapolates():
+    w = ArrayColorScale(colors=[[0.2, 0.2, 0.2], [0.6, 0.6, 0.6]])
+    result = w.map(np.array([-0.5, 1.5]), lut_size=None)
+    np.testing.assert_array_equal(result[:, 0], [0, 204])
+    w.clamp = True
+    result = w.map(np.array([-0.5, 1.5]), lut_size=None)
+    np.testing.assert_array_equal(result[:, 0], [51, 153])
+
+
+def test_arraycolorscale_map_lut():
+    w = ArrayColorScale(colors=[[1, 0, 0], [0, 0, 1]], domain=(0, 10))
+    values = np.linspace(0, 10, 101)
+    exact = w.map(values, lut_size=None)
+    baked = w.map(values)
+    assert np.abs(exact.astype(int) - baked).max() <= 1
+
+
+def test_arraycolorscale_map_lut_outside_domain():
+    # Black to gray, as the frontend extrapolates values outside the table:
+    w = ArrayColorScale(colors=[[0, 0, 0], [0.5, 0.5, 0.5]])
+    values = np.array([-1.0, 0.5, 1.5, 2.0])
+    exact = w.map(values, lut_size=None)
+    np.testing.assert_array_equal(w.map(values, lut_size=256), exact)
+    np.testing.assert_array_equal(exact[-1], [255, 255, 255, 255])
+    w.clamp = True
+    np.testing.assert_array_equal(
+        w.map(values, lut_size=256)[-1], w.lut(256)[-1]
+    )
+
+
+def test_arraycolorscale_lut_cache():
+    w = ArrayColorScale()
+    lut = w.lut(256)
+    assert w.lut(256) is lut
+    w.domain = (1, 2)
+    assert w.lut(256) is lut
+    w.gamma = 2.0
+    assert w.lut(256) is not lut
+    lut = w.lut(256)
+    w.colors = [[1, 0, 0], [0, 0, 1]]
+    assert w.lut(256) is not lut
+    assert w.lut(256)[0, 0] == 255
+    assert w.lut(256)[-1, 2] == 255
+
+
+def test_interpolate_colors_reexported():
+    from ..color import interpolate_colors
+    from ..colorarray import interpolate_colors as reexported
+
+    assert reexported is interpolate_colors
@@ -8,7 +8,7 @@ import pytest
 
 from traitlets import TraitError
 
-from ..color import LinearColorScale
+from ..color import LinearColorScale, LogColorScale, NamedOrdinalColorMap
 from ..colorbar import ColorBar
 
 
@@ -21,3 +21,76 @@ def test_colorbar_creation():
     colormap = LinearColorScale(range=("red", "blue"))
     w = ColorBar(colormap=colormap)
     assert w.colormap is colormap
+
+
+def test_colorbar_kernel_ticks():
+    colormap = LinearColorScale(range=("red", "blue"))
+    w = ColorBar(colormap=colormap, tick_count=5)
+    assert w.tick_values is None
+    w.kernel_ticks = True
+    assert w.tick_values == (0, 0.2, 0.4, 0.6, 0.8, 1)
+    assert w.tick_labels == ("0.0", "0.2", "0.4", "0.6", "0.8", "1.0")
+    colormap.domain = (0, 1000)
+    assert w.tick_labels[-1] == "1,000"
+    w.colormap = LinearColorScale(range=("red", "blue"), domain=(0, 2))
+    colormap.domain = (0, 10)
+    assert w.tick_values[-1] == 2
+    w.kernel_ticks = False
+    assert w.tick_values is None and w.tick_labels is None
+
+
+def _observes(colormap, colorbar):
+    return any(
+        getattr(handler, "__self__", None) is colorbar
+        for handlers in colormap._trait_notifiers.values()
+        for handlers_by_type in handlers.values()
+        for handler in handlers_by_type
+    )
+
+
+def test_colorbar_releases_colormap_observer():
+    colormap = LinearColorScale(range=("red", "blue"))
+    w = ColorBar(colormap=colormap)
+    assert _observes(colormap, w)
+    other = LinearColorScale(range=("red", "blue"))
+    w.colormap = other
+    assert not _observes(colormap, w)
+    assert _observes(other, w)
+    w.close()
+    assert not _observes(other, w)
+
+
+def test_colorbar_to_png():
+    from .test_image import decode_png
+
+    colormap = LinearColorScale(range=("red", "blue"))
+    w = ColorBar(colormap=colormap, length=20, breadth=4, padding=1)
+    image = decode_png(w.to_png())
+    assert image.shape == (24, 8, 4)
+    assert tuple(image[0, 0]) == (0, 0, 0, 0)
+    assert tuple(image[1, 1]) == (0, 0, 0, 255)
+    # The end of the domain is at the top:
+    assert tuple(image[2, 2]) == (6, 0, 249, 255)
+    assert tuple(image[21, 2]) == (249, 0, 6, 255)
+    assert w.to_png() is w.to_png()
+    w.orientation = "horizontal"
+    assert decode_png(w.to_png()).shape == (8, 24, 4)
+
+
+def test_colorbar_to_svg():
+    colormap = LogColorScale(range=("red", "blue"), domain=(1, 1000))
+    w = ColorBar(colormap=colormap, title="a < b")
+    svg = w.to_svg()
+    assert svg.startswith("<svg ")
+    assert svg.count("<image ") == 1
+    assert ">1k</text>" in svg
+    assert ">a &lt; b</text>" in svg
+    assert w.to_svg() is svg
+    colormap.domain = (1, 100)
+    assert ">1k</text>" not in w.to_svg()
+
+
+def test_colorbar_render_ordinal():
+    w = ColorBar(colormap=NamedOrdinalColorMap())
+    with pytest.raises(ValueError):
+        w.to_png()
@@ -6,6 +6,8 @@
 
 import pytest
 
+import numpy as np
+
 from ..continuous import LinearScale, LogScale, PowScale
 
 
@@ -19,3 +21,227 @@ def test_logscale_creation_blank():
 
 def test_powscale_creation_blank():
     w = PowScale()
+
+
+def test_linearscale_call():
+    w = LinearScale(domain=(0, 10), range=(-10, -5))
+    result = w(np.array([1, 2, 3, 4, 5, 10]))
+    np.testing.assert_allclose(result, [-9.5, -9, -8.5, -8, -7.5, -5])
+
+
+def test_linearscale_call_array_domain():
+    w = LinearScale(domain=np.array([0, 10]), range=np.array([-10, -5]))
+    np.testing.assert_allclose(w(np.array([1, 10])), [-9.5, -5])
+    # Arrays are stored as tuples, as any other sequence:
+    assert w.domain == (0.0, 10.0)
+    assert w.range == (-10, -5)
+    state = w.get_state()
+    assert state["domain"] == (0.0, 10.0)
+    assert state["range"] == (-10, -5)
+
+
+def test_linearscale_call_reversed_domain():
+    w = LinearScale(domain=(10, 0), range=(0, 1))
+    np.testing.assert_allclose(w(np.array([0, 2.5, 10])), [1, 0.75, 0])
+
+
+def test_linearscale_call_polylinear():
+    w = LinearScale(domain=(-1, 0, 1), range=(0, 10, 12))
+    result = w(np.array([-2, -1, -0.5, 0, 0.5, 1, 2]))
+    np.testing.assert_allclose(result, [-10, 0, 5, 10, 11, 12, 14])
+
+
+def test_linearscale_call_polylinear_truncates():
+    w = LinearScale(domain=(0, 1, 2, 3), range=(0, 10, 30))
+    np.testing.assert_allclose(w(np.array([0.5, 1.5, 3])), [5, 20, 50])
+
+
+def test_linearscale_call_degenerate_domain():
+    w = LinearScale(domain=(1, 1), range=(0, 10))
+    np.testing.assert_allclose(w(np.array([0, 1, 2])), [5, 5, 5])
+
+
+def test_linearscale_call_clamp():
+    w = LinearScale(domain=(0, 10), range=(0, 1), clamp=True)
+    np.testing.assert_allclose(w(np.array([-5, 5, 15])), [0, 0.5, 1])
+
+
+def test_linearscale_call_out():
+    w = LinearScale(domain=(0, 10), range=(0, 1))
+    values = np.array([[0, 5], [10, 20]], dtype=np.float32)
+    out = np.empty_like(values)
+    result = w(values, out=out)
+    assert result is out
+    np.testing.assert_allclose(out, [[0, 0.5], [1, 2]])
+    w(values, out=values)
+    np.testing.assert_allclose(values, [[0, 0.5], [1, 2]])
+
+
+def test_linearscale_call_out_shape_mismatch():
+    w = LinearScale()
+    with pytest.raises(ValueError):
+        w(np.zeros(3), out=np.zeros(4))
+
+
+def test_linearscale_call_int_input():
+    w = LinearScale(domain=(0, 4), range=(0, 1))
+    result = w(np.arange(5))
+    assert result.dtype == np.float64
+    np.testing.assert_allclose(result, [0, 0.25, 0.5, 0.75, 1])
+
+
+def test_linearscale_invert():
+    w = LinearScale(domain=(-1, 0, 1), range=(0, 10, 12))
+    values = np.array([-2, -1, -0.5, 0, 0.5, 1, 2])
+    np.testing.assert_allclose(w.invert(w(values)), values)
+
+
+def test_linearscale_invert_clamp():
+    w = LinearScale(domain=(0, 10), range=(0, 1), clamp=True)
+    np.testing.assert_allclose(w.invert(np.array([-1, 0.5, 2])), [0, 5, 10])
+
+
+def test_logscale_call():
+    w = LogScale(domain=(1, 100), range=(0, 2))
+    np.testing.assert_allclose(w(np.array([1, 10, 100, 1000])), [0, 1, 2, 3])
+
+
+def test_logscale_call_base_independent():
+    values = np.array([1, 2, 50, 100])
+    a = LogScale(domain=(1, 100), range=(0, 2), base=10)
+    b = LogScale(domain=(1, 100), range=(0, 2), base=2)
+    np.testing.assert_allclose(a(values), b(values))
+
+
+def test_logscale_call_negative_domain():
+    w = LogScale(domain=(-100, -1), range=(0, 2))
+    np.testing.assert_allclose(w(np.array([-100, -10, -1])), [0, 1, 2])
+    np.testing.assert_allclose(w.invert(np.array([0, 1, 2])), [-100, -10, -1])
+
+
+def test_logscale_invert():
+    w = LogScale(domain=(1, 1000), range=(0, 3), clamp=True)
+    values = np.array([0, 1.5, 3, 4])
+    out = np.empty_like(values)
+    assert w.invert(values, out=out) is out
+    np.testing.assert_allclose(out, [1, 10 ** 1.5, 1000, 1000])
+
+
+def test_powscale_call():
+    w = PowScale(domain=(0, 4), range=(0, 2), exponent=0.5)
+    np.testing.assert_allclose(w(np.array([0, 1, 4])), [0, 1, 2])
+
+
+def test_powscale_call_negative_values():
+    w = PowScale(domain=(-2, 2), range=(-4, 4), exponent=2)
+    values = np.array([-2, -1, 0, 1, 2])
+    np.testing.assert_allclose(w(values), [-4, -1, 0, 1, 4])
+    np.testing.assert_allclose(w.invert(w(values)), values)
+
+
+def test_powscale_call_inplace():
+    w = PowScale(domain=(-2, 2), range=(-4, 4), exponent=2)
+    values = np.array([-2.0, -1, 0, 1, 2])
+    w(values, out=values)
+    np.testing.assert_allclose(values, [-4, -1, 0, 1, 4])
+
+
+def test_fit():
+    w = LinearScale()
+    assert w.fit(np.array([[0.12, np.nan], [9.7, 3]])) is w
+    assert w.domain == (0.12, 9.7)
+
+
+def test_fit_nice():
+    w = LinearScale().fit([0.12, 9.7], nice=True)
+    assert w.domain == (0, 10)
+    w.fit([-0.43, 0.97], nice=True)
+    assert w.domain == (-0.6, 1)
+    w.fit([12, 3487], nice=5)
+    assert w.domain == (0, 3500)
+
+
+def test_fit_keeps_direction_and_stops():
+    assert LinearScale(domain=(1, 0)).fit([3, 5]).domain == (5, 3)
+    assert LinearScale(domain=(0, 5, 10)).fit([2, 4]).domain == (2, 3, 4)
+
+
+def test_fit_chunked():
+    data = np.random.RandomState(0).rand(300, 100)
+    data[17, 3] = -2
+    data[250, 99] = 3
+    w = LinearScale().fit(data, chunk_size=1000, workers=4)
+    assert w.domain == (-2, 3)
+    # Non-contiguous data is split by rows:
+    assert LinearScale().fit(data[:, ::3], chunk_size=1000).domain == (
+        data[:, ::3].min(),
+        data[:, ::3].max(),
+    )
+
+
+def test_fit_memmap(tmp_path):
+    data = np.memmap(str(tmp_path / "data.bin"), np.float32, "w+", shape=(1000, 100))
+    data[:] = np.arange(data.size).reshape(data.shape)
+    data.flush()
+    data = np.memmap(str(tmp_path / "data.bin"), np.float32, "r", shape=(1000, 100))
+    assert LinearScale().fit(data, chunk_size=4096).domain == (0, data.size - 1)
+
+
+def test_fit_percentiles():
+    w = LinearScale().fit(np.arange(101.0), percentiles=(10, 90))
+    np.testing.assert_allclose(w.domain, (10, 90))
+
+
+def test_fit_nan():
+    with pytest.raises(ValueError):
+        LinearScale().fit([1, np.nan], ignore_nan=False)
+    with pytest.raises(ValueError):
+        LinearScale().fit([np.nan])
+
+
+def test_logscale_fit():
+    w = LogScale().fit([-1, 0, 0.03, 420])
+    assert w.domain == (0.03, 420)
+    w.fit([-1, 0, 0.03, 420], nice=True)
+    assert w.domain == (0.01, 1000)
+    assert LogScale(base=2).fit([3, 9], nice=True).domain == (2, 16)
+    with pytest.raises(ValueError):
+        LogScale().fit([-1, 0])
+
+
+def test_linearscale_ticks():
+    w = LinearScale(domain=(0, 1))
+    assert w.ticks() == (0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1)
+    assert w.ticks(2) == (0, 0.5, 1)
+    assert w.tick_labels(2) == ("0.0", "0.5", "1.0")
+    w.domain = (1000, -1000)
+    assert w.ticks(4) == (1000, 500, 0, -500, -1000)
+    assert w.tick_labels(4) == ("1,000", "500", "0", "−500", "−1,000")
+
+
+def test_linearscale_ticks_cached():
+    w = LinearScale(domain=(0, 7))
+    assert w.ticks(5) is LinearScale(domain=(0, 7)).ticks(5)
+    assert w.tick_format(5) is w.tick_format(5)
+
+
+def test_logscale_ticks():
+    w = LogScale(domain=(1, 100))
+    assert w.ticks() == tuple(range(1, 10)) + tuple(range(10, 101, 10))
+    labels = w.tick_labels()
+    assert labels[:4] == ("1", "2", "3", "4")
+    assert labels[5] == ""
+    assert labels[-1] == "100"
+    assert LogScale(domain=(1, 1e10)).ticks()[-1] == 1e10
+    assert LogScale(domain=(-100, -1)).ticks()[:2] == (-100, -90)
+    assert LogScale(domain=(1, 64), base=2).tick_labels() == (
+        "1", "2", "4", "8", "16", "32", "64"
+    )
+
+
+def test_powscale_ticks():
+    w = PowScale(domain=(0, 100), exponent=2)
+    assert w.ticks(4) == (0, 20, 40, 60, 80, 100)
+    assert w.tick_labels(4, ",.0%") == (
+        "0%", "2,000%", "4,000%", "6,000%", "8,000%", "10,000%"
+    )
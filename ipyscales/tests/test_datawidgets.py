@@ -4,13 +4,18 @@
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import os
+
 import pytest
 
 import numpy as np
 from traitlets import TraitError, Undefined
 
+from ..color import LinearColorScale, NamedSequentialColorMap, NamedOrdinalColorMap
+from ..colorarray import ArrayColorScale
 from ..continuous import LinearScale
-from ..datawidgets import ScaledArray
+from ..datawidgets import ScaledArray, ScaledArrayGroup
+from ..scale import ComposedScale
 
 
 def test_scaled_creation_blank():
@@ -23,3 +28,276 @@ def test_scaled_creation():
     scale = LinearScale()
     w = ScaledArray(data, scale)
     assert w.data is data
+
+
+def test_scaled_compute():
+    data = np.array([0.0, 0.5, 2.0])
+    w = ScaledArray(data, LinearScale(range=(0, 10)))
+    result = w.compute()
+    np.testing.assert_allclose(result, [0, 5, 20])
+    assert result.dtype == np.float64
+    assert not result.flags.writeable
+
+
+def test_scaled_compute_output_dtype():
+    data = np.array([0.0, 0.27, -0.27, 40.0, np.nan])
+    w = ScaledArray(data, LinearScale(range=(0, 10)), output_dtype="uint8")
+    # Truncating and wrapping like a typed array:
+    np.testing.assert_array_equal(w.compute(), [0, 2, 254, 144, 0])
+    w.output_dtype = "uint8_clamped"
+    np.testing.assert_array_equal(w.compute(), [0, 3, 0, 255, 0])
+
+
+def test_scaled_compute_inherits_serialized_dtype():
+    data = np.arange(3, dtype=np.int64)
+    w = ScaledArray(data, LinearScale(range=(0, 2)))
+    assert w.compute().dtype == np.int32
+    np.testing.assert_array_equal(w.compute(), [0, 2, 4])
+
+
+def test_scaled_compute_color():
+    data = np.array([[0.0, 1.0]], dtype=np.float32)
+    w = ScaledArray(data, NamedSequentialColorMap("Greys"))
+    result = w.compute()
+    assert result.shape == w.shape == (1, 2, 4)
+    # Color outputs inherit the data dtype, unless asked for bytes:
+    assert result.dtype == w.dtype == np.float32
+    np.testing.assert_array_equal(result[0, :, 3], [255, 255])
+    w.output_dtype = "uint8_clamped"
+    assert w.compute().dtype == w.dtype == np.uint8
+
+
+def test_scaled_output_dtype_invalid():
+    with pytest.raises(TraitError):
+        ScaledArray(np.zeros(2), LinearScale(), output_dtype="uint64")
+
+
+def test_scaled_compute_normalized_output():
+    data = np.array([0.0, 0.5, 1.0, 2.0, -1.0, np.nan])
+    w = ScaledArray(data, LinearScale(), output_dtype="uint8_norm")
+    assert w.dtype == np.uint8
+    np.testing.assert_array_equal(w.compute(), [0, 128, 255, 255, 0, 0])
+    w.output_dtype = "uint16_norm"
+    assert w.dtype == np.uint16
+    np.testing.assert_array_equal(w.compute(), [0, 32768, 65535, 65535, 0, 0])
+
+
+def test_scaled_compute_normalized_color_output():
+    scale = LinearColorScale(range=("red", "blue"))
+    w = ScaledArray(np.array([0.0, 1.0]), scale, output_dtype="uint16_norm")
+    np.testing.assert_array_equal(
+        w.compute(), [[65535, 0, 0, 65535], [0, 0, 65535, 65535]]
+    )
+
+
+def test_scaled_compute_linear_color():
+    w = ScaledArray(np.array([0.0, 1.0]), LinearColorScale(range=("red", "blue")))
+    result = w.compute()
+    np.testing.assert_array_equal(result, [[255, 0, 0, 255], [0, 0, 255, 255]])
+
+
+def test_scaled_compute_unsupported_color_scale():
+    w = ScaledArray(np.zeros(2), NamedOrdinalColorMap())
+    with pytest.raises(TypeError):
+        w.compute()
+
+
+def test_scaled_compute_cache():
+    data = np.array([0.0, 1.0])
+    scale = LinearScale()
+    w = ScaledArray(data, scale)
+    first = w.compute()
+    w.output_dtype = "inherit"
+    scale.interpolator = "interpolate"
+    assert w.compute() is first
+    scale.range = (0, 2)
+    second = w.compute()
+    assert second is not first
+    np.testing.assert_array_equal(second, [0, 2])
+    w.data = np.array([1.0])
+    np.testing.assert_array_equal(w.compute(), [2])
+
+
+def test_scaled_compute_cache_scale_replaced():
+    data = np.array([0.0, 1.0])
+    old = LinearScale()
+    w = ScaledArray(data, old)
+    w.compute()
+    w.scale = LinearScale(range=(0, 3))
+    np.testing.assert_array_equal(w.compute(), [0, 3])
+    old.range = (0, 5)
+    cached = w.compute()
+    assert w.compute() is cached
+
+
+def test_scaled_compute_cache_composed_members():
+    first = LinearScale(domain=(0, 2), range=(0, 100))
+    second = LinearScale(domain=(0, 100), range=(0, 1))
+    scale = ComposedScale([first, ComposedScale([second])])
+    w = ScaledArray(np.array([1.0]), scale)
+    np.testing.assert_array_equal(w.compute(), [0.5])
+    # A member of a nested composed scale changes:
+    second.range = (0, 2)
+    np.testing.assert_array_equal(w.compute(), [1.0])
+    first.domain = (0, 4)
+    np.testing.assert_array_equal(w.compute(), [0.5])
+    # Members are observed again when replaced:
+    third = LinearScale(domain=(0, 100), range=(0, 1))
+    scale.scales = (first, third)
+    np.testing.assert_array_equal(w.compute(), [0.25])
+    third.range = (0, 4)
+    np.testing.assert_array_equal(w.compute(), [1.0])
+    cached = w.compute()
+    second.range = (0, 8)
+    assert w.compute() is cached
+
+
+def test_scaled_compute_lut_size():
+    data = np.array([0.1, 0.3])
+    scale = ArrayColorScale(colors=[[1, 0, 0], [0, 0, 1]])
+    w = ScaledArray(data, scale, lut_size=4)
+    np.testing.assert_array_equal(w.compute()[:, 0], [223, 159])
+    w.lut_size = None
+    np.testing.assert_array_equal(w.compute()[:, 0], [230, 179])
+
+
+def test_scaled_update_slice(mock_comm):
+    data = np.zeros((3, 4), dtype=np.float32)
+    w = ScaledArray(data, LinearScale(range=(0, 10)))
+    w.comm = mock_comm
+    before = w.compute()
+    w.update_slice((1, slice(1, 3)), [0.5, 1.0])
+    np.testing.assert_array_equal(data[1], [0, 0.5, 1, 0])
+    (args, kwargs), = mock_comm.log_send
+    content = kwargs["data"]["content"]
+    assert content == {"event": "update_slice", "region": [(1, 2), (1, 3)]}
+    (buffer,) = kwargs["buffers"]
+    np.testing.assert_array_equal(
+        np.frombuffer(buffer, dtype=np.float32), [0.5, 1.0]
+    )
+    # The kernel-side result is recomputed:
+    assert before[1, 1] == 0
+    np.testing.assert_array_equal(w.compute()[1], [0, 5, 10, 0])
+
+
+def test_scaled_update_slice_negative_index(mock_comm):
+    data = np.zeros((3, 2), dtype=np.int64)
+    w = ScaledArray(data, LinearScale())
+    w.comm = mock_comm
+    w.update_slice(-1, 7)
+    np.testing.assert_array_equal(data[2], [7, 7])
+    (args, kwargs), = mock_comm.log_send
+    assert kwargs["data"]["content"]["region"] == [(2, 3), (0, 2)]
+    # Sent as the serialized dtype:
+    assert np.frombuffer(kwargs["buffers"][0], dtype=np.int32).tolist() == [7, 7]
+
+
+def test_scaled_update_slice_invalid():
+    w = ScaledArray(np.zeros((3, 2)), LinearScale())
+    with pytest.raises(ValueError):
+        w.update_slice(slice(None, None, 2), 1)
+    with pytest.raises(IndexError):
+        w.update_slice((0, 0, 0), 1)
+    with pytest.raises(IndexError):
+        w.update_slice(3, 1)
+
+
+def test_scaled_to_image():
+    from .test_image import decode_png
+
+    data = np.linspace(0, 1, 35).reshape(5, 7)
+    w = ScaledArray(data, LinearColorScale(range=("red", "blue")))
+    expected = w.scale.map(data)
+    np.testing.assert_array_equal(decode_png(w.to_image()), expected)
+    np.testing.assert_array_equal(decode_png(w.to_image(tile_rows=2)), expected)
+    # From the cached result:
+    w.compute()
+    np.testing.assert_array_equal(decode_png(w.to_image(tile_rows=3)), expected)
+
+
+def test_scaled_save(tmp_path):
+    from .test_image import decode_png
+
+    data = np.array([[0.0, 1.0], [1.0, 0.0]])
+    w = ScaledArray(data, NamedSequentialColorMap("Greys"))
+    path = tmp_path / "image.png"
+    w.save(path)
+    assert path.read_bytes() == w.to_image()
+    assert tuple(decode_png(path.read_bytes())[0, 1]) == (0, 0, 0, 255)
+
+
+def test_scaled_save_error_keeps_file(tmp_path):
+    w = ScaledArray(np.zeros((4, 2)), NamedSequentialColorMap("Greys"))
+    path = tmp_path / "image.png"
+    path.write_bytes(b"previous")
+    calls = []
+
+    def evaluate(values, lut_size):
+        if calls:
+            raise RuntimeError("failed")
+        calls.append(values)
+        return np.zeros(values.shape + (4,), dtype=np.uint8)
+
+    w.scale._evaluate = evaluate
+    with pytest.raises(RuntimeError):
+        w.save(path, tile_rows=2)
+    assert path.read_bytes() == b"previous"
+    assert os.listdir(tmp_path) == ["image.png"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_scaled_save_file_mode(tmp_path):
+    w = ScaledArray(np.zeros((2, 2)), NamedSequentialColorMap("Greys"))
+    path = tmp_path / "image.png"
+    w.save(path)
+    # A new file gets the mode of any new file, not a private one:
+    reference = tmp_path / "reference"
+    reference.write_bytes(b"")
+    assert path.stat().st_mode == reference.stat().st_mode
+    path.chmod(0o640)
+    w.save(path)
+    assert path.stat().st_mode & 0o777 == 0o640
+
+
+def test_scaled_to_image_invalid():
+    with pytest.raises(ValueError):
+        ScaledArray(np.zeros(3), LinearColorScale()).to_image()
+    with pytest.raises(TypeError):
+        ScaledArray(np.zeros((2, 2)), LinearScale()).to_image()
+
+
+def test_group_assigns_scale():
+    scale = LinearScale(range=(0, 1))
+    arrays = [ScaledArray(np.zeros(3), LinearScale()) for _ in range(2)]
+    group = ScaledArrayGroup(scale, arrays)
+    assert all(array.scale is scale for array in arrays)
+
+    other = LinearScale(range=(0, 2))
+    group.scale = other
+    assert all(array.scale is other for array in arrays)
+
+
+def test_group_add_and_compute():
+    scale = LinearScale(domain=(0, 10), range=(0, 1))
+    group = ScaledArrayGroup(scale)
+    first = group.add(np.array([0, 5, 10], dtype=np.float32))
+    second = group.add(np.array([10, 0], dtype=np.float32))
+    assert group.arrays == (first, second)
+    assert first.scale is scale
+
+    results = group.compute()
+    np.testing.assert_allclose(results[0], [0, 0.5, 1])
+    np.testing.assert_allclose(results[1], [1, 0])
+
+
+def test_scaled_compute_color_outside_domain():
+    # As the frontend: extrapolated if not clamped, and NaN transparent
+    scale = LinearColorScale(domain=(0, 1), range=("#808080", "#c0c0c0"))
+    w = ScaledArray(np.array([[1.5, np.nan]]), scale)
+    np.testing.assert_array_equal(
+        w.compute(), [[[224, 224, 224, 255], [0, 0, 0, 0]]]
+    )
+    scale.clamp = True
+    np.testing.assert_array_equal(
+        w.compute(), [[[192, 192, 192, 255], [0, 0, 0, 0]]]
+    )
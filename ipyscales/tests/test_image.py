@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+from io import BytesIO
+import struct
+import zlib
+
+import pytest
+
+import numpy as np
+
+from ..image import encode_png, write_png
+
+
+def decode_png(data):
+    """Decode the RGBA PNGs written by `write_png`."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos = 8
+    idat = b""
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos : pos + 4])
+        tag = data[pos + 4 : pos + 8]
+        body = data[pos + 8 : pos + 8 + length]
+        (crc,) = struct.unpack(">I", data[pos + 8 + length : pos + 12 + length])
+        assert crc == zlib.crc32(tag + body)
+        if tag == b"IHDR":
+            width, height = struct.unpack(">II", body[:8])
+        elif tag == b"IDAT":
+            idat += body
+        pos += 12 + length
+    raw = np.frombuffer(zlib.decompress(idat), dtype=np.uint8)
+    scanlines = raw.reshape(height, 1 + 4 * width)
+    assert not scanlines[:, 0].any()
+    return scanlines[:, 1:].reshape(height, width, 4)
+
+
+def test_encode_png_roundtrip():
+    rgba = np.random.RandomState(0).randint(0, 256, (7, 5, 4)).astype(np.uint8)
+    np.testing.assert_array_equal(decode_png(encode_png(rgba)), rgba)
+
+
+def test_write_png_blocks():
+    rgba = np.arange(6 * 3 * 4, dtype=np.uint8).reshape(6, 3, 4)
+    fp = BytesIO()
+    n = write_png(fp, [rgba[:4], rgba[4:]], 3, 6)
+    assert n == len(fp.getvalue())
+    np.testing.assert_array_equal(decode_png(fp.getvalue()), rgba)
+
+
+def test_write_png_invalid():
+    rgba = np.zeros((2, 3, 4), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        write_png(BytesIO(), [rgba], 3, 3)
+    with pytest.raises(ValueError):
+        write_png(BytesIO(), [rgba.astype(np.float32)], 3, 2)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+def _loaded_modules(code):
+    # Run in a fresh interpreter, as the test session imports everything:
+    script = "import sys\n%s\nimport json\nprint(json.dumps(sorted(sys.modules)))" % code
+    output = subprocess.check_output([sys.executable, "-c", script])
+    return set(json.loads(output.decode("utf-8").splitlines()[-1]))
+
+
+def test_bare_import_is_lazy():
+    modules = _loaded_modules("import ipyscales")
+    loaded = {m for m in modules if m.startswith("ipyscales.")}
+    assert loaded == {"ipyscales._version", "ipyscales.nbextension"}
+    assert "ipywidgets" not in modules
+    assert "numpy" not in modules
+
+
+def test_attribute_access_imports_only_its_module():
+    modules = _loaded_modules("import ipyscales; ipyscales.LinearScale")
+    assert "ipyscales.continuous" in modules
+    assert "ipyscales.color" not in modules
+    assert "ipyscales.colorbar" not in modules
+
+
+def test_public_names():
+    import ipyscales
+
+    from ipyscales.continuous import LinearScale
+    from ipyscales.scale import Scale, batch_update
+
+    assert ipyscales.LinearScale is LinearScale
+    assert ipyscales.batch_update is batch_update
+    assert ipyscales.ScaleWidget is Scale
+    assert ipyscales.LinearScaleWidget is LinearScale
+    assert "NamedSequentialColorMap" in dir(ipyscales)
+
+
+def test_star_import():
+    namespace = {}
+    exec("from ipyscales import *", namespace)
+
+    from ipyscales.color import NamedSequentialColorMap
+    from ipyscales.continuous import LinearScale
+
+    assert namespace["NamedSequentialColorMap"] is NamedSequentialColorMap
+    assert namespace["LinearScaleWidget"] is LinearScale
+    assert "batch_update" in namespace
+    assert "_lazy_names" not in namespace
+
+
+def test_unknown_attribute():
+    import ipyscales
+
+    with pytest.raises(AttributeError):
+        ipyscales.NotAScale
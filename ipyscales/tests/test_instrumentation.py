@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import pytest
+
+import numpy as np
+
+from ..instrumentation import (
+    comm_stats,
+    comm_stats_enabled,
+    disable_comm_stats,
+    enable_comm_stats,
+    record_comm_stats,
+    reset_comm_stats,
+)
+from ..scale import OrdinalScale, QuantileScale, binary_tuple_min_length
+from ..selectors import StringDropdown
+from .conftest import MockComm
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_comm_stats()
+    yield
+    disable_comm_stats()
+    reset_comm_stats()
+
+
+def _with_comm(widget, comm_id):
+    comm = MockComm()
+    comm.comm_id = comm_id
+    widget.comm = comm
+    return widget
+
+
+def test_disabled_by_default():
+    assert not comm_stats_enabled()
+    w = _with_comm(QuantileScale(), "q")
+    w.domain = (0, 1)
+    assert comm_stats() == []
+    with record_comm_stats(w):
+        assert comm_stats_enabled(w)
+        assert "_send" in w.__dict__
+    assert not comm_stats_enabled()
+    assert "_send" not in w.__dict__
+
+
+def test_records_sent_messages():
+    w = _with_comm(QuantileScale(), "q")
+    enable_comm_stats(w)
+    w.domain = tuple(range(binary_tuple_min_length))
+    (row,) = comm_stats()
+    assert row["model_id"] == "q"
+    assert row["widget_class"] == "QuantileScale"
+    assert row["messages_sent"] == 1
+    assert row["json_bytes_sent"] > 0
+    assert row["buffer_bytes_sent"] == 8 * binary_tuple_min_length
+    assert row["serialize_seconds"] > 0
+    assert row["total_bytes"] == row["json_bytes_sent"] + row["buffer_bytes_sent"]
+
+
+def test_records_received_messages():
+    w = _with_comm(OrdinalScale(), "o")
+    enable_comm_stats(w)
+    msg = {"method": "update", "state": {"unknown": "__implicit"}, "buffer_paths": []}
+    w.comm.handle_msg({"content": {"data": msg}, "buffers": []})
+    (row,) = comm_stats()
+    assert row["messages_received"] == 1
+    assert row["json_bytes_received"] > 0
+    assert row["deserialize_seconds"] > 0
+
+
+def test_only_records_given_widgets():
+    recorded = _with_comm(QuantileScale(), "recorded")
+    other = _with_comm(QuantileScale(), "other")
+    with record_comm_stats(recorded):
+        recorded.domain = (0, 1)
+        other.domain = (0, 1)
+    assert [row["model_id"] for row in comm_stats()] == ["recorded"]
+    assert "_send" not in other.__dict__
+
+
+def test_table_sort_and_filter():
+    small = _with_comm(QuantileScale(), "small")
+    large = _with_comm(QuantileScale(), "large")
+    dropdown = _with_comm(StringDropdown(("a",)), "dropdown")
+    with record_comm_stats(small, large, dropdown):
+        small.domain = (0, 1)
+        large.domain = np.arange(100.0)
+        dropdown.options = ("a", "b")
+    assert [row["model_id"] for row in comm_stats(widget_class="QuantileScale")] == [
+        "large",
+        "small",
+    ]
+    assert [row["model_id"] for row in comm_stats(widget_class=StringDropdown)] == [
+        "dropdown"
+    ]
+    # The stats are kept after disabling, until reset:
+    reset_comm_stats()
+    assert comm_stats() == []
+
+
+def test_restored_after_error():
+    w = _with_comm(OrdinalScale(), "o")
+    with pytest.raises(RuntimeError):
+        with record_comm_stats(w):
+            raise RuntimeError()
+    assert not comm_stats_enabled()
+    assert "get_state" not in w.__dict__
+    # Received messages are handled by the widget again:
+    assert w.comm._msg_callback == w._handle_msg
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import pytest
+
+import numpy as np
+from traitlets import TraitError
+
+from ..color import LinearColorScale
+from ..continuous import LinearScale, PowScale
+from ..scale import (
+    ComposedScale,
+    SequentialScale,
+    QuantizeScale,
+    QuantileScale,
+    TresholdScale,
+    OrdinalScale,
+    batch_update,
+    binary_tuple_min_length,
+    deserialize_tuple,
+    serialize_tuple,
+    sketch_domain,
+)
+from ..sketch import QuantileSketch
+
+
+def d3_quantile_thresholds(domain, n):
+    # Mirrors the threshold computation of d3's scaleQuantile
+    return np.quantile(np.sort(domain), np.arange(1, n) / n)
+
+
+def test_quantilescale_creation_blank():
+    QuantileScale()
+
+
+def test_quantilescale_from_data():
+    data = np.random.default_rng(0).random(1000)
+    w = QuantileScale.from_data(data)
+    assert w.range == (0, 1, 2, 3)
+    assert len(w.domain) == 5
+    np.testing.assert_allclose(
+        d3_quantile_thresholds(w.domain, 4), np.quantile(data, [0.25, 0.5, 0.75])
+    )
+
+
+def test_quantilescale_from_data_range():
+    w = QuantileScale.from_data(np.arange(101), range=("a", "b"))
+    assert w.range == ("a", "b")
+    assert w.domain == (0, 50, 100)
+
+
+def test_quantilescale_from_data_chunks():
+    chunks = (np.full(10, i) for i in range(10))
+    w = QuantileScale.from_data(chunks, n_quantiles=2)
+    assert w.domain[0] == 0
+    assert w.domain[-1] == 9
+
+
+def test_quantilescale_from_data_values():
+    w = QuantileScale.from_data([3, 1, 2], n_quantiles=2)
+    assert w.domain == (1, 2, 3)
+
+
+def test_quantilescale_from_sketch():
+    sketch = QuantileSketch().update(np.arange(101))
+    w = QuantileScale.from_data(sketch, n_quantiles=10)
+    np.testing.assert_allclose(
+        d3_quantile_thresholds(w.domain, 10), np.arange(10, 100, 10)
+    )
+
+
+def test_quantilescale_update_from_data():
+    w = QuantileScale(range=(0, 1))
+    w.update_from_data(np.arange(11))
+    assert w.domain == (0, 5, 10)
+
+
+def test_sketch_domain_empty():
+    with pytest.raises(ValueError):
+        sketch_domain(QuantileSketch(), 4)
+
+
+def test_quantizescale_call():
+    w = QuantizeScale(domain=(0, 1), range=("a", "b", "c", "d"))
+    result = w(np.array([-1, 0, 0.2, 0.25, 0.5, 0.8, 1, 2]))
+    assert list(result) == ["a", "a", "a", "b", "c", "d", "d", "d"]
+
+
+def test_quantizescale_call_nan():
+    w = QuantizeScale(domain=(0, 1), range=(10, 20))
+    result = w(np.array([0.2, np.nan]))
+    assert result[0] == 10
+    assert np.isnan(result[1])
+    w.range = ("a", "b")
+    result = w(np.array([0.2, np.nan]))
+    assert list(result) == ["a", None]
+
+
+def test_quantizescale_bucket():
+    w = QuantizeScale(domain=(0, 10), range=(0, 1, 2, 3, 4))
+    np.testing.assert_array_equal(
+        w.bucket(np.array([[0, 2], [5, 9.9]])), [[0, 1], [2, 4]]
+    )
+
+
+def test_quantizescale_cache_invalidation():
+    w = QuantizeScale(domain=(0, 1), range=(0, 1))
+    assert w(np.array([0.75]))[0] == 1
+    w.domain = (0, 2)
+    assert w(np.array([0.75]))[0] == 0
+    w.range = (0, 1, 2, 3)
+    assert w(np.array([0.75]))[0] == 1
+
+
+def test_quantizescale_invert_extent():
+    w = QuantizeScale(domain=(0, 1), range=("a", "b", "c", "d"))
+    result = w.invert_extent(np.array(["a", "c", "d", "x"]))
+    np.testing.assert_allclose(
+        result, [[0, 0.25], [0.5, 0.75], [0.75, 1], [np.nan, np.nan]]
+    )
+
+
+def test_quantilescale_call():
+    w = QuantileScale(domain=(3, 6, 7, 8, 8, 10, 13, 15, 16, 20), range=(0, 1, 2, 3))
+    # Thresholds from d3: [7.25, 9, 14.5]
+    np.testing.assert_array_equal(
+        w(np.array([0, 7.25, 8, 9, 14, 14.5, 30])), [0, 1, 1, 2, 2, 3, 3]
+    )
+
+
+def test_quantilescale_invert_extent():
+    w = QuantileScale(domain=(3, 6, 7, 8, 8, 10, 13, 15, 16, 20), range=(0, 1, 2, 3))
+    np.testing.assert_allclose(
+        w.invert_extent(np.array([0, 1, 3])), [[3, 7.25], [7.25, 9], [14.5, 20]]
+    )
+
+
+def test_tresholdscale_call():
+    w = TresholdScale(domain=(0, 1), range=("red", "white", "blue"))
+    result = w(np.array([-1, 0, 0.5, 1, 1000]))
+    assert list(result) == ["red", "white", "white", "blue", "blue"]
+
+
+def test_tresholdscale_call_truncates_domain():
+    w = TresholdScale(domain=(0, 1, 2), range=(0, 1))
+    np.testing.assert_array_equal(w(np.array([-1, 0.5, 1.5, 3])), [0, 1, 1, 1])
+
+
+def test_tresholdscale_invert_extent():
+    w = TresholdScale(domain=(0, 1), range=("red", "white", "blue"))
+    np.testing.assert_allclose(
+        w.invert_extent(np.array(["red", "white", "blue"])),
+        [[np.nan, 0], [0, 1], [1, np.nan]],
+    )
+
+
+def test_tresholdscale_default():
+    w = TresholdScale()
+    np.testing.assert_array_equal(w(np.array([1, 2])), [0, 0])
+
+
+def test_ordinalscale_call():
+    w = OrdinalScale(domain=("a", "b", "c"), range=(10, 20, 30), unknown=None)
+    result = w(np.array(["c", "a", "b", "a", "x"]))
+    assert list(result) == [30, 10, 20, 10, None]
+    assert w.domain == ("a", "b", "c")
+
+
+def test_ordinalscale_call_repeats_range():
+    w = OrdinalScale(domain=(1, 2, 3, 4, 5), range=("odd", "even"))
+    assert list(w(np.arange(1, 6))) == ["odd", "even", "odd", "even", "odd"]
+
+
+def test_ordinalscale_call_numeric_range_keeps_dtype():
+    w = OrdinalScale(domain=("a", "b"), range=(0.5, 1.5))
+    result = w(["b", "a"])
+    assert result.dtype == np.float64
+    np.testing.assert_array_equal(result, [1.5, 0.5])
+
+
+def test_ordinalscale_implicit_domain_growth():
+    w = OrdinalScale(domain=("a",), range=(0, 1, 2))
+    result = w(np.array(["c", "a", "b", "c"]))
+    # New values are added in order of first appearance:
+    assert w.domain == ("a", "c", "b")
+    np.testing.assert_array_equal(result, [1, 0, 2, 1])
+    np.testing.assert_array_equal(w(np.array(["b", "c"])), [2, 1])
+
+
+def test_ordinalscale_implicit_from_none():
+    w = OrdinalScale(range=("x", "y"))
+    assert list(w([3, 1, 3])) == ["x", "y", "x"]
+    assert w.domain == (3, 1)
+
+
+def test_ordinalscale_unknown():
+    w = OrdinalScale(domain=("a",), range=(0,), unknown=-1)
+    np.testing.assert_array_equal(w(["a", "b"]), [0, -1])
+    assert w.domain == ("a",)
+
+
+def test_ordinalscale_index_after_domain_change():
+    w = OrdinalScale(domain=("a", "b"), range=(0, 1), unknown=None)
+    np.testing.assert_array_equal(w.index(["b"]), [1])
+    w.domain = ("b", "a")
+    np.testing.assert_array_equal(w.index(["b"]), [0])
+
+
+def test_ordinalscale_mixed_types():
+    w = OrdinalScale(domain=("a", 1), range=("x", "y"), unknown=None)
+    assert list(w(np.array(["a", 1, 2.5], dtype=object))) == ["x", "y", None]
+
+
+def test_ordinalscale_nan_implicit():
+    w = OrdinalScale(range=(0, 1))
+    w([np.nan, 1.0])
+    w([np.nan, 1.0])
+    assert len(w.domain) == 2
+
+
+def test_ordinalscale_empty_range():
+    w = OrdinalScale(domain=("a",))
+    assert list(w(["a"])) == [None]
+
+
+def test_ordinalscale_categorical():
+    pd = pytest.importorskip("pandas")
+    values = pd.Categorical(["b", "a", None, "c", "b"])
+    w = OrdinalScale(domain=("a", "b"), range=("x", "y", "z"))
+    assert list(w(values)) == ["y", "x", "z", "x", "y"]
+    # New values are added in order of first appearance, as for arrays:
+    assert w.domain == ("a", "b", None, "c")
+    assert list(w(pd.Series(values))) == ["y", "x", "z", "x", "y"]
+
+    plain = OrdinalScale(domain=("a", "b"), range=("x", "y", "z"))
+    plain(np.array(["b", "a", None, "c", "b"], dtype=object))
+    assert plain.domain == w.domain
+
+
+def test_ordinalscale_categorical_unused_category():
+    pd = pytest.importorskip("pandas")
+    values = pd.Categorical(["c", "a"], categories=["a", "b", "c", "d"])
+    w = OrdinalScale(domain=(), range=("x", "y"))
+    assert list(w(values)) == ["x", "y"]
+    assert w.domain == ("c", "a")
+
+
+def test_ordinalscale_categorical_unknown():
+    pd = pytest.importorskip("pandas")
+    values = pd.Categorical(["b", None, "c"])
+    w = OrdinalScale(domain=("a", "b"), range=("x", "y"), unknown="?")
+    assert list(w(values)) == ["y", "?", "?"]
+
+
+def test_ordinalscale_integer_codes():
+    w = OrdinalScale(domain=(5, 3), range=("a", "b", "c", "d"))
+    codes = np.array([[3, 7, 5], [6, 7, 3]], dtype=np.int16)
+    result = w(codes)
+    assert result.shape == (2, 3)
+    assert result.tolist() == [["b", "c", "a"], ["d", "c", "b"]]
+    assert w.domain == (5, 3, 7, 6)
+
+
+def test_ordinalscale_integer_sparse():
+    w = OrdinalScale(domain=(10 ** 12,), range=("a", "b"))
+    assert list(w(np.array([0, 10 ** 12]))) == ["b", "a"]
+    assert w.domain == (10 ** 12, 0)
+
+
+def _sent_messages(comm):
+    return [kwargs["data"] for args, kwargs in comm.log_send]
+
+
+def test_scale_batch_single_message(mock_comm):
+    scale = QuantizeScale()
+    scale.comm = mock_comm
+    with scale.batch():
+        scale.domain = (0, 10)
+        scale.range = (1, 2, 3)
+    messages = _sent_messages(mock_comm)
+    assert [m["method"] for m in messages] == ["update"]
+    assert set(messages[0]["state"]) == {"domain", "range"}
+
+
+def test_batch_update_multiple_scales(mock_comm):
+    a = QuantizeScale()
+    b = QuantizeScale()
+    a.comm = b.comm = mock_comm
+    with pytest.raises(RuntimeError):
+        with batch_update(a, b):
+            a.domain = (0, 10)
+            b.domain = (0, 5)
+            raise RuntimeError()
+    messages = _sent_messages(mock_comm)
+    events = [m["content"]["event"] if m["method"] == "custom" else m["method"]
+              for m in messages]
+    # The batch is marked once, and ended even if an error is raised:
+    assert events == ["batch_begin", "update", "update", "batch_end"]
+    assert messages[-1]["content"]["scales"] == [b.model_id]
+    assert a.domain == (0, 10)
+
+
+def test_serialize_tuple_short_is_json():
+    assert serialize_tuple((0.0, 1.0), None) == (0.0, 1.0)
+
+
+def test_serialize_tuple_numeric_is_binary():
+    n = binary_tuple_min_length
+    floats = serialize_tuple(tuple(np.linspace(0, 1, n)), None)
+    assert floats["dtype"] == "float64"
+    assert floats["shape"] == [n]
+    assert deserialize_tuple(floats, None) == tuple(np.linspace(0, 1, n))
+    ints = serialize_tuple(tuple(range(n)), None)
+    assert ints["dtype"] == "int32"
+    assert deserialize_tuple(ints, None) == tuple(range(n))
+    # Integers that do not fit in int32 are sent as floats:
+    big = serialize_tuple((2 ** 40,) * n, None)
+    assert big["dtype"] == "float64"
+
+
+def test_serialize_tuple_mixed_is_json():
+    n = binary_tuple_min_length
+    for value in [("a",) * n, (0, "a") * n, (True,) * n]:
+        assert serialize_tuple(value, None) is value
+
+
+def test_scale_syncs_long_domain_as_binary():
+    n = binary_tuple_min_length
+    scale = QuantileScale(domain=tuple(range(n)), range=("a", "b"))
+    state = scale.get_state()
+    assert isinstance(state["domain"]["buffer"], memoryview)
+    assert state["range"] == ("a", "b")
+    scale.set_state({"domain": state["domain"]})
+    assert scale.domain == tuple(range(n))
+
+
+def test_composedscale():
+    w = ComposedScale(
+        [LinearScale(domain=(0, 100)), PowScale(exponent=2), LinearScale(range=(0, 10))]
+    )
+    np.testing.assert_allclose(w(np.array([0, 50, 100])), [0, 2.5, 10])
+    assert not w._color_output
+
+
+def test_composedscale_color():
+    w = ComposedScale([LinearScale(domain=(0, 10)), LinearColorScale()])
+    assert w._color_output
+    np.testing.assert_array_equal(
+        w(np.array([0, 10]), lut_size=None), [[0, 0, 0, 255], [255, 255, 255, 255]]
+    )
+
+
+def test_composedscale_invalid():
+    with pytest.raises(TraitError):
+        ComposedScale([])
+    w = ComposedScale([LinearScale()])
+    with pytest.raises(TraitError):
+        w.scales = (LinearScale(), ComposedScale([w]))
+    with pytest.raises(TypeError):
+        ComposedScale([SequentialScale()])(np.array([0]))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import pickle
+
+import pytest
+
+import numpy as np
+
+from ..sketch import QuantileSketch
+
+
+def rank_error(data, estimates, q):
+    ranks = np.searchsorted(np.sort(data), estimates) / len(data)
+    return np.abs(ranks - q).max()
+
+
+def test_sketch_creation_blank():
+    s = QuantileSketch()
+    assert len(s) == 0
+    assert np.isnan(s.quantiles([0.5])).all()
+
+
+def test_sketch_invalid_k():
+    with pytest.raises(ValueError):
+        QuantileSketch(k=2)
+
+
+def test_sketch_exact_for_small_data():
+    data = np.random.default_rng(0).random(100)
+    s = QuantileSketch().update(data)
+    q = [0, 0.1, 0.5, 0.9, 1]
+    np.testing.assert_allclose(s.quantiles(q), np.quantile(data, q))
+
+
+def test_sketch_ignores_nan():
+    s = QuantileSketch().update([1, np.nan, 3])
+    assert len(s) == 2
+    np.testing.assert_allclose(s.quantiles([0.5]), [2])
+
+
+def test_sketch_bounded_memory():
+    s = QuantileSketch(k=100, seed=0)
+    for _ in range(20):
+        s.update(np.random.default_rng(1).random(50000))
+    assert len(s) == 1000000
+    assert sum(len(level) for level in s._levels) <= 300
+
+
+def test_sketch_accuracy():
+    data = np.random.default_rng(0).standard_normal(1000000)
+    s = QuantileSketch(seed=0).update(data)
+    q = np.linspace(0.01, 0.99, 99)
+    assert rank_error(data, s.quantiles(q), q) < 0.01
+    assert s.min == data.min()
+    assert s.max == data.max()
+
+
+def test_sketch_chunks():
+    data = np.random.default_rng(0).random(200000)
+    s = QuantileSketch(seed=0).update_chunks(np.array_split(data, 7))
+    assert len(s) == len(data)
+    q = np.linspace(0.05, 0.95, 19)
+    assert rank_error(data, s.quantiles(q), q) < 0.01
+
+
+def test_sketch_merge():
+    data = np.random.default_rng(0).random(300000)
+    parts = [QuantileSketch(seed=i).update(chunk) for i, chunk in enumerate(
+        np.array_split(data, 3)
+    )]
+    # Sketches should survive a round-trip to other processes:
+    parts = [pickle.loads(pickle.dumps(p)) for p in parts]
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+    assert len(merged) == len(data)
+    assert merged.min == data.min()
+    q = np.linspace(0.05, 0.95, 19)
+    assert rank_error(data, merged.quantiles(q), q) < 0.01
+
+
+def test_sketch_thresholds():
+    s = QuantileSketch().update(np.arange(101))
+    np.testing.assert_allclose(s.thresholds(4), [25, 50, 75])
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import pytest
+
+from ..ticks import (
+    linear_ticks, linear_tick_format, log_tick_format, format_number
+)
+
+
+def test_linear_ticks_degenerate():
+    assert linear_ticks(1.0, 1.0, 10) == (1.0,)
+    assert linear_ticks(0.0, 1.0, 0) == ()
+    assert linear_ticks(0.0, float("inf"), 10) == ()
+
+
+@pytest.mark.parametrize(
+    "value, specifier, expected",
+    [
+        (1234.5, ",.2f", "1,234.50"),
+        (-0.001, ".1f", "0.0"),
+        (-2.5, ".1f", "−2.5"),
+        (0.25, ".0%", "25%"),
+        (123456, ".2e", "1.23e+5"),
+        (0.000123, ".2~g", "0.00012"),
+        (1500, "s", "1.50000k"),
+        (1500, ".2~s", "1.5k"),
+        (0.0015, ".2s", "1.5m"),
+        (0.1, "", "0.1"),
+        (float("nan"), ",f", "NaN"),
+    ],
+)
+def test_format_number(value, specifier, expected):
+    assert format_number(value, specifier) == expected
+
+
+def test_format_number_unsupported():
+    with pytest.raises(ValueError):
+        format_number(1, "$,.2f")
+
+
+def test_linear_tick_format_prefix():
+    fmt = linear_tick_format(0.0, 1e6, 5, "s")
+    assert [fmt(t) for t in linear_ticks(0.0, 1e6, 5)] == [
+        "0.0M", "0.2M", "0.4M", "0.6M", "0.8M", "1.0M"
+    ]
+
+
+@pytest.mark.parametrize("specifier, expected", [
+    ("g", ["0", "0.1", "0.5", "1"]),
+    ("", ["0", "0.1", "0.5", "1"]),
+    ("e", ["0e+0", "1e-1", "5e-1", "1e+0"]),
+])
+def test_linear_tick_format_precision_round(specifier, expected):
+    # The precision is from the largest value less a step, as d3:
+    fmt = linear_tick_format(0, 1, 10, specifier)
+    assert [fmt(x) for x in (0, 0.1, 0.5, 1)] == expected
+
+
+def test_log_tick_format_thins_by_default_count():
+    # d3 counts the ticks with the default count, whatever count is asked for:
+    fmt = log_tick_format(1, 1000, 2)
+    assert fmt(2) == ""
+    assert fmt(10) == "10"
+    assert log_tick_format(1, 1000)(2) == "2"
+
+
+def test_log_tick_format_trims_without_precision():
+    assert log_tick_format(1, 100)(20) == "20"
+    assert log_tick_format(1, 100, specifier=".2s")(20) == "20"
+    assert log_tick_format(1, 100, specifier=".3s")(20) == "20.0"
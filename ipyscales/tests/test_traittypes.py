@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import pytest
+
+import numpy as np
+from traitlets import Any, CFloat, HasTraits, TraitError
+
+from ..traittypes import VarlenTuple
+
+
+class _Holder(HasTraits):
+    floats = VarlenTuple(trait=CFloat(), minlen=2, finite=True)
+    anything = VarlenTuple(trait=Any())
+
+
+def test_varlentuple_stores_arrays_as_tuples():
+    values = np.arange(5)
+    holder = _Holder(floats=values, anything=values)
+    assert holder.floats == (0.0, 1.0, 2.0, 3.0, 4.0)
+    assert type(holder.floats[0]) is float
+    assert holder.anything == (0, 1, 2, 3, 4)
+    assert type(holder.anything[0]) is int
+    # Copied, so that the value cannot change without notification:
+    values[0] = 10
+    assert holder.floats[0] == 0
+
+
+def test_varlentuple_validates_arrays():
+    holder = _Holder()
+    with pytest.raises(TraitError):
+        holder.floats = np.zeros(1)
+    with pytest.raises(TraitError):
+        holder.floats = np.array([0, np.inf])
+    with pytest.raises(TraitError):
+        holder.floats = np.zeros((2, 2))
+
+
+def test_varlentuple_finite_only_checks_arrays():
+    # Sequences are validated element-wise, as before:
+    holder = _Holder(floats=(0, np.inf))
+    assert holder.floats == (0.0, np.inf)
+    holder.floats = [np.nan, 1]
+    assert np.isnan(holder.floats[0])
+
+
+def test_varlentuple_validates_other_arrays_per_element():
+    holder = _Holder(floats=np.array(["1", "2"]), anything=np.array(["a", "b"]))
+    assert holder.floats == (1.0, 2.0)
+    assert holder.anything == ("a", "b")
@@ -6,8 +6,10 @@
 
 import pytest
 
+import numpy as np
 from traitlets import TraitError, Undefined
 
+from ..color import LinearColorScale
 from ..continuous import LinearScale
 from ..value import ScaledValue
 
@@ -22,3 +24,26 @@ def test_scaled_creation():
     w = ScaledValue(input=5, scale=scale)
     assert w.input is 5
     assert w.scale is scale
+
+
+def test_scaled_chain_fused():
+    a = ScaledValue(input=5, scale=LinearScale(domain=(0, 10), range=(-10, -5)))
+    b = ScaledValue(input=a, scale=LinearScale(domain=(-10, -5), range=(0, 1)))
+    c = ScaledValue(input=b, scale=LinearColorScale(range=("red", "blue")))
+    assert c.chain() == [a, b, c]
+    assert a.chain() == [a]
+    np.testing.assert_array_equal(b.fused()(np.array([0, 5, 10])), [0, 0.5, 1])
+    colors = c.fused(lut_size=None)(np.array([0, 10]))
+    np.testing.assert_array_equal(colors, [[255, 0, 0, 255], [0, 0, 255, 255]])
+    # Changes to the scales are reflected:
+    fused = b.fused()
+    b.scale.range = (0, 2)
+    np.testing.assert_array_equal(fused(np.array([10])), [2])
+
+
+def test_scaled_chain_invalid():
+    a = ScaledValue(input=5, scale=LinearScale())
+    b = ScaledValue(input=a, scale=LinearScale())
+    a.input = b
+    with pytest.raises(ValueError):
+        b.chain()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+"""
+Defines tick generation and formatting for scales, matching d3
+"""
+
+from functools import lru_cache
+import math
+import re
+
+
+_e10 = math.sqrt(50)
+_e5 = math.sqrt(10)
+_e2 = math.sqrt(2)
+
+
+def _js_round(x):
+    # Math.round() rounds half-way cases towards positive infinity
+    return math.floor(x + 0.5)
+
+
+def _exponent(x):
+    """The decimal exponent of a number, as d3-format's `exponent`."""
+    return int(format(abs(x), ".16e").split("e")[1])
+
+
+def tick_increment(start, stop, count):
+    """Port of d3-array's `tickIncrement`.
+
+    Positive results are the tick step, and negative results are the
+    inverse of a step below one (for precision).
+    """
+    step = (stop - start) / max(0, count)
+    power = math.floor(math.log10(step))
+    error = step / 10 ** power
+    factor = 10 if error >= _e10 else 5 if error >= _e5 else 2 if error >= _e2 else 1
+    if power >= 0:
+        return factor * 10 ** power
+    return -(10 ** -power) / factor
+
+
+def tick_step(start, stop, count):
+    """Port of d3-array's `tickStep`."""
+    step0 = abs(stop - start) / max(0, count)
+    step1 = 10 ** math.floor(math.log10(step0))
+    error = step0 / step1
+    if error >= _e10:
+        step1 *= 10
+    elif error >= _e5:
+        step1 *= 5
+    elif error >= _e2:
+        step1 *= 2
+    return -step1 if stop < start else step1
+
+
+def nice_linear(start, stop, count=10):
+    """Extend an ascending extent to round values, as d3's `linear.nice()`."""
+    prestep = None
+    for _ in range(10):
+        if not stop > start:
+            break
+        step = tick_increment(start, stop, count)
+        if step == prestep:
+            break
+        if step > 0:
+            start = math.floor(start / step) * step
+            stop = math.ceil(stop / step) * step
+        elif step < 0:
+            start = math.ceil(start * step) / step
+            stop = math.floor(stop * step) / step
+        else:
+            break
+        prestep = step
+    return start, stop
+
+
+@lru_cache(maxsize=1024)
+def linear_ticks(start, stop, count=10):
+    """Get about `count` round values between `start` and `stop`, as d3's `ticks`.
+
+    The results are cached.
+
+    Returns
+    -------
+    tuple of float
+    """
+    if start == stop and count > 0:
+        return (start,)
+    if count <= 0 or not (math.isfinite(start) and math.isfinite(stop)):
+        return ()
+    reverse = stop < start
+    if reverse:
+        start, stop = stop, start
+    step = tick_increment(start, stop, count)
+    if step == 0 or not math.isfinite(step):
+        return ()
+    if step > 0:
+        r0, r1 = _js_round(start / step), _js_round(stop / step)
+        if r0 * step < start:
+            r0 += 1
+        if r1 * step > stop:
+            r1 -= 1
+        ticks = tuple(float((r0 + i) * step) for i in range(r1 - r0 + 1))
+    else:
+        step = -step
+        r0, r1 = _js_round(start * step), _js_round(stop * step)
+        if r0 / step < start:
+            r0 += 1
+        if r1 / step > stop:
+            r1 -= 1
+        ticks = tuple(float((r0 + i) / step) for i in range(r1 - r0 + 1))
+    return ticks[::-1] if reverse else ticks
+
+
+def _log_functions(base, reflect):
+    """Get the log and pow functions of a log scale, as in d3."""
+    if base == 10:
+        logs = math.log10
+        pows = lambda x: float("1e%d" % x) if x == int(x) else 10.0 ** x
+    elif base == math.e:
+        logs, pows = math.log, math.exp
+    elif base == 2:
+        logs, pows = math.log2, lambda x: 2.0 ** x
+    else:
+        logs = lambda x: math.log(x) / math.log(base)
+        pows = lambda x: base ** x
+    if reflect:
+        return (lambda x: -logs(-x)), (lambda x: -pows(-x))
+    return logs, pows
+
+
+@lru_cache(maxsize=1024)
+def log_ticks(start, stop, count=10, base=10):
+    """Get the ticks of a log scale, as d3's `log.ticks`.
+
+    The results are cached.
+
+    Returns
+    -------
+    tuple of float
+    """
+    reverse = stop < start
+    u, v = (stop, start) if reverse else (start, stop)
+    logs, pows = _log_functions(base, start < 0)
+    i, j = logs(u), logs(v)
+    z = []
+    if base % 1 == 0 and j - i < count:
+        i, j = math.floor(i), math.ceil(j)
+        base = int(base)
+        if u > 0:
+            for p in range(i, j + 1):
+                for k in range(1, base):
+                    t = k / pows(-p) if p < 0 else k * pows(p)
+                    if t < u:
+                        continue
+                    if t > v:
+                        break
+                    z.append(t)
+        else:
+            for p in range(i, j + 1):
+                for k in range(base - 1, 0, -1):
+                    t = k / pows(-p) if p > 0 else k * pows(p)
+                    if t < u:
+                        continue
+                    if t > v:
+                        break
+                    z.append(t)
+        if len(z) * 2 < count:
+            z = list(linear_ticks(u, v, count))
+    else:
+        z = [pows(t) for t in linear_ticks(i, j, min(j - i, count))]
+    return tuple(z[::-1] if reverse else z)
+
+
+# A subset of the d3-format specifier syntax: [,][.precision][~][type]
+_specifier_re = re.compile(r"^(?P<comma>,)?(?:\.(?P<precision>\d+))?(?P<trim>~)?(?P<type>[efgs%]?)$")
+
+_si_prefixes = ["y", "z", "a", "f", "p", "n", "µ", "m", "", "k", "M", "G", "T", "P", "E", "Z", "Y"]
+
+_minus = "−"
+
+
+def _parse_specifier(specifier):
+    m = _specifier_re.match(specifier)
+    if m is None:
+        raise ValueError("Unsupported format specifier: %r" % specifier)
+    precision = m.group("precision")
+    return {
+        "comma": bool(m.group("comma")),
+        "precision": None if precision is None else int(precision),
+        "trim": bool(m.group("trim")),
+        "type": m.group("type"),
+    }
+
+
+def _to_exponential(x, p):
+    # As JavaScript's toExponential, with no zero padding of the exponent
+    return re.sub(r"e([+-])0*(\d)", r"e\1\2", format(x, ".%de" % p))
+
+
+def _to_precision(x, p):
+    # As JavaScript's toPrecision
+    if x == 0:
+        e = 0
+    else:
+        e = _exponent(float(format(x, ".%de" % (p - 1))))
+    if e < -6 or e >= p:
+        return _to_exponential(x, p - 1)
+    return format(x, ".%df" % max(0, p - 1 - e))
+
+
+def _prefix_auto(x, p):
+    # As d3-format's formatPrefixAuto
+    digits, exponent = format(x, ".%de" % (p - 1)).split("e")
+    coefficient = digits.replace(".", "")
+    exponent = int(exponent)
+    prefix_exponent = max(-8, min(8, exponent // 3))
+    i = exponent - prefix_exponent * 3 + 1
+    n = len(coefficient)
+    if i == n:
+        result = coefficient
+    elif i > n:
+        result = coefficient + "0" * (i - n)
+    elif i > 0:
+        result = coefficient[:i] + "." + coefficient[i:]
+    else:
+        small = format(x, ".%de" % max(0, p + i - 2)).split("e")[0].replace(".", "")
+        result = "0." + "0" * -i + small
+    return result + _si_prefixes[8 + prefix_exponent]
+
+
+def _trim(s):
+    # Remove insignificant trailing zeros, as d3-format's formatTrim
+    m = re.match(r"^(\d*\.\d*?)0+(\D.*)?$", s)
+    if m:
+        s = m.group(1) + (m.group(2) or "")
+    return re.sub(r"\.(\D|$)", r"\1", s)
+
+
+def _group(s):
+    m = re.match(r"^(\d+)(.*)$", s)
+    if not m:
+        return s
+    return "{:,}".format(int(m.group(1))) + m.group(2)
+
+
+def format_number(value, specifier):
+    """Format a number as d3-format, for a subset of its specifiers.
+
+    Supported are the comma, precision and trim options, and the
+    types "e", "f", "g", "s" and "%", or none (like ".12~g").
+    """
+    spec = _parse_specifier(specifier) if isinstance(specifier, str) else specifier
+    kind, precision, trim = spec["type"], spec["precision"], spec["trim"]
+    if not kind:
+        kind, trim = "g", True
+        if precision is None:
+            precision = 12
+    elif precision is None:
+        precision = 6
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    negative = value < 0 or math.copysign(1, value) < 0
+    x = abs(value)
+    if kind == "f":
+        s = format(x, ".%df" % precision)
+    elif kind == "%":
+        s = format(x * 100, ".%df" % precision)
+    elif kind == "e":
+        s = _to_exponential(x, precision)
+    elif kind == "g":
+        s = _to_precision(x, max(1, precision))
+    else:
+        s = _prefix_auto(x, max(1, precision))
+    if trim:
+        s = _trim(s)
+    if spec["comma"]:
+        s = _group(s)
+    # Hide the sign of negative values that round to zero:
+    if negative and not re.search(r"[1-9]", s.split("e")[0]):
+        negative = False
+    return (_minus if negative else "") + s + ("%" if kind == "%" else "")
+
+
+@lru_cache(maxsize=1024)
+def linear_tick_format(start, stop, count=10, specifier=None):
+    """Get a tick formatting function, as d3's `linear.tickFormat`.
+
+    The precision is derived from the tick step, unless given in the
+    specifier. The results are cached.
+    """
+    step = tick_step(start, stop, count)
+    spec = _parse_specifier(",f" if specifier is None else specifier)
+    if spec["type"] == "s":
+        value = max(abs(start), abs(stop))
+        prefix_exponent = max(-8, min(8, _exponent(value) // 3))
+        if spec["precision"] is None:
+            spec["precision"] = max(0, prefix_exponent * 3 - _exponent(step))
+        # The SI prefix is fixed by the largest value:
+        scale = 10.0 ** (-3 * prefix_exponent)
+        prefix = _si_prefixes[8 + prefix_exponent]
+        spec["type"] = "f"
+        return lambda x: format_number(x * scale, spec) + prefix
+    if spec["precision"] is None:
+        if spec["type"] in ("", "e", "g"):
+            # As d3's precisionRound, from the largest value less a step:
+            step = abs(step)
+            value = max(abs(start), abs(stop)) - step
+            precision = max(0, _exponent(value) - _exponent(step)) + 1
+            spec["precision"] = precision - (spec["type"] == "e")
+        else:
+            spec["precision"] = max(0, -_exponent(step) - 2 * (spec["type"] == "%"))
+    return lambda x: format_number(x, spec)
+
+
+@lru_cache(maxsize=1024)
+def log_tick_format(start, stop, count=10, base=10, specifier=None):
+    """Get a tick formatting function, as d3's `log.tickFormat`.
+
+    Only the labels of some ticks are shown when there are many of them,
+    with the others formatted as empty strings. The results are cached.
+    """
+    if specifier is None:
+        specifier = "s" if base == 10 else ","
+    spec = _parse_specifier(specifier)
+    if spec["precision"] is None and base % 1 == 0:
+        spec["trim"] = True
+    logs, pows = _log_functions(base, start < 0)
+    # As d3, the ticks are counted with the default count, whatever `count` is:
+    k = max(1, base * count / max(1, len(log_ticks(start, stop, 10, base))))
+
+    def fmt(d):
+        i = d / pows(_js_round(logs(d)))
+        if i * base < base - 0.5:
+            i *= base
+        return format_number(d, spec) if i <= k else ""
+
+    return fmt
+
+
+class LinearTicks(object):
+    """Tick methods for scales that are linear in their domain (d3's linearish)."""
+
+    def ticks(self, count=10):
+        """Get about `count` representative values from the domain.
+
+        Matches the ticks of the d3 scale, and is cached per domain
+        and count.
+
+        Returns
+        -------
+        tuple of float
+        """
+        return linear_ticks(float(self.domain[0]), float(self.domain[-1]), count)
+
+    def tick_format(self, count=10, specifier=None):
+        """Get a function for formatting the ticks, as the d3 scale.
+
+        Parameters
+        ----------
+        count : int
+            The tick count, as passed to `ticks`.
+        specifier : str, optional
+            A d3-format specifier. Only a subset is supported, see
+            `format_number`.
+        """
+        return linear_tick_format(
+            float(self.domain[0]), float(self.domain[-1]), count, specifier
+        )
+
+    def tick_labels(self, count=10, specifier=None):
+        """Get the formatted ticks, as a tuple of strings."""
+        fmt = self.tick_format(count, specifier)
+        return tuple(fmt(t) for t in self.ticks(count))
@@ -8,16 +8,70 @@
 Defines some trait types used by ipsycales
 """
 
+from functools import lru_cache
 import re
 
+import numpy as np
 from ipywidgets import Color
-from traitlets import TraitError, List
+from traitlets import TraitError, List, Float, Any
 
 
 class VarlenTuple(List):
+    """A tuple trait of variable length.
+
+    One dimensional NumPy arrays are validated in a single vectorized
+    check when the elements are floats or of any type, and are then
+    converted to a tuple in one go. Other arrays and sequences are
+    validated element by element. The value is always a tuple.
+
+    If `finite` is True, NaN and infinite values are rejected in arrays
+    that are validated as a whole. Element-wise validation is unchanged.
+    """
+
     klass = tuple
     _cast_types = (list,)
 
+    def __init__(self, *args, finite=False, **kwargs):
+        self.finite = finite
+        super(VarlenTuple, self).__init__(*args, **kwargs)
+
+    def validate(self, obj, value):
+        if isinstance(value, np.ndarray):
+            array = self._validate_array(obj, value)
+            if array is not None:
+                return array
+            value = value.tolist()
+        return super(VarlenTuple, self).validate(obj, value)
+
+    def _validate_array(self, obj, value):
+        """Validate an array as a whole, or return None if not possible.
+
+        Returns the validated values as a tuple.
+        """
+        if value.ndim != 1:
+            self.error(obj, value)
+        kind = value.dtype.kind
+        trait = self._trait
+        if kind not in "biuf":
+            return None
+        if isinstance(trait, Float):
+            if trait.min not in (None, -np.inf) or trait.max not in (None, np.inf):
+                return None
+            dtype = np.float64
+        elif trait is None or type(trait) is Any:
+            dtype = value.dtype
+        else:
+            return None
+        if not self._minlen <= len(value) <= self._maxlen:
+            self.length_error(obj, value)
+        array = np.asarray(value, dtype=dtype)
+        if self.finite and not np.isfinite(array).all():
+            raise TraitError(
+                "The '%s' trait of %s instance must only contain finite values."
+                % (self.name, type(obj).__name__)
+            )
+        return tuple(array.tolist())
+
 
 _color_hexa_re = re.compile(r"^#[a-fA-F0-9]{4}(?:[a-fA-F0-9]{4})?$")
 
@@ -36,13 +90,30 @@ _color_rgbhsl_re = re.compile(
 )
 
 
+# The number of distinct color strings to cache the parsing of:
+color_cache_size = 4096
+
+
+_base_color = Color()
+
+
+@lru_cache(maxsize=color_cache_size)
+def _is_full_color(value):
+    try:
+        _base_color.validate(None, value)
+    except TraitError:
+        return bool(_color_hexa_re.match(value) or _color_rgbhsl_re.match(value))
+    return True
+
+
 class FullColor(Color):
+    """A color trait, that also accepts hex colors with alpha.
+
+    The validity of each distinct string is cached, and
+    `ipyscales.color.parse_color` can be used to get the color as RGBA.
+    """
+
     def validate(self, obj, value):
-        if isinstance(value, str):
-            try:
-                return super(FullColor, self).validate(obj, value)
-            except TraitError:
-                if _color_hexa_re.match(value) or _color_rgbhsl_re.match(value):
-                    return value
-                raise
+        if isinstance(value, str) and _is_full_color(value):
+            return value
         self.error(obj, value)
@@ -17,6 +17,13 @@ from .scale import Scale
 
 @register
 class ScaledValue(Widget):
+    """A value mapped through a scale on the frontend.
+
+    The input can be another ScaledValue, to chain scales. On the
+    frontend, a change of the input of a chain is evaluated for the
+    whole chain in one pass, before any output change events fire.
+    """
+
     _model_module = Unicode(module_name).tag(sync=True)
     _model_module_version = Unicode(module_version).tag(sync=True)
     _model_name = Unicode("ScaledValueModel").tag(sync=True)
@@ -37,3 +44,49 @@ class ScaledValue(Widget):
     ).tag(
         sync=True
     )  # Not actually synced, even if sync=True
+
+    def chain(self):
+        """Get the scaled values of the chain ending in this one.
+
+        Returns
+        -------
+        list of ScaledValue
+            The chain, in evaluation order: the first has an input that
+            is not a ScaledValue, and the last is this one.
+        """
+        chain = [self]
+        while isinstance(chain[-1].input, ScaledValue):
+            if chain[-1].input in chain:
+                raise ValueError("The inputs of the scaled values form a cycle")
+            chain.append(chain[-1].input)
+        return chain[::-1]
+
+    def fused(self, lut_size=4096):
+        """Compose the scales of the chain into a single function.
+
+        The function maps values through each scale of the chain in
+        turn, evaluated in the kernel, e.g. for bulk evaluation of many
+        inputs at once. Changes to the scales are reflected, but
+        changes to the chain itself are not.
+
+        Parameters
+        ----------
+        lut_size : int or None
+            The lookup table size for continuous color scales, see
+            `ScaledArray.lut_size`.
+
+        Returns
+        -------
+        callable
+            A function of an array of inputs to the start of the chain.
+        """
+        scales = [link.scale for link in self.chain()]
+        if any(scale is None for scale in scales):
+            raise ValueError("All scaled values of the chain need a scale")
+
+        def evaluate(values):
+            for scale in scales:
+                values = scale._evaluate(values, lut_size)
+            return values
+
+        return evaluate
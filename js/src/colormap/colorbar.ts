@@ -24,6 +24,41 @@ declare module "@jupyter-widgets/base" {
 }
 
 
+/**
+ * Wrap a scale so that its axis uses the ticks computed by the kernel.
+ *
+ * The wrapper forwards to the live scale, so that changes to it are
+ * reflected. If the model has no tick values, the ticks and format of
+ * the scale itself are used.
+ */
+export function withKernelTicks(scale: any, model: Backbone.Model): any {
+  const wrapper: any = (x: any) => scale(x);
+  Object.assign(wrapper, scale);
+  wrapper.ticks = (...args: any[]) => {
+    const values = model.get('tick_values');
+    return values ? Array.from(values) : scale.ticks(...args);
+  };
+  wrapper.tickFormat = (...args: any[]) => {
+    const values = model.get('tick_values');
+    const labels = model.get('tick_labels');
+    if (!values || !labels) {
+      return scale.tickFormat(...args);
+    }
+    const lookup = new Map<number, string>();
+    for (let i = 0; i < values.length; ++i) {
+      lookup.set(values[i], labels[i]);
+    }
+    return (d: number) => {
+      const label = lookup.get(d);
+      return label === undefined ? '' : label;
+    };
+  };
+  // Axes can copy the scale, so make sure copies keep the ticks:
+  wrapper.copy = () => withKernelTicks(scale.copy(), model);
+  return wrapper;
+}
+
+
 export class ColorBarModel extends DOMWidgetModel {
   defaults() {
     return {...super.defaults(),
@@ -44,6 +79,8 @@ export class ColorBarModel extends DOMWidgetModel {
       padding: 5,
       title_padding: 0,
       axis_padding: 0,
+      tick_values: null,
+      tick_labels: null,
     };
   }
 
@@ -98,7 +135,7 @@ export class ColorBarModel extends DOMWidgetModel {
 export class ColorBarView extends DOMWidgetView {
   render() {
     const cmModel = this.model.get('colormap');
-    this.barFunc = chromabar(cmModel.obj);
+    this.barFunc = chromabar(withKernelTicks(cmModel.obj, this.model));
 
     this.onChange();
     this.model.on('change', this.onChange, this);
@@ -6,7 +6,7 @@ import {
 } from 'd3-color';
 
 import {
-  interpolateRgb, interpolateHsl, piecewise
+  interpolateRgb, interpolateHsl, interpolateNumber, piecewise
 } from 'd3-interpolate';
 
 import {
@@ -27,12 +27,12 @@ import {
 import ndarray = require('ndarray')
 
 import {
-  LinearScaleModel, LogScaleModel
+  ContinuousScaleModel, LinearScaleModel, LogScaleModel
 } from '../continuous';
 
 import { SequentialScaleModel, OrdinalScaleModel } from '../scale';
 
-import { arrayEquals } from '../utils';
+import { arrayEquals, colorTupleSerializers, parseCssColor } from '../utils';
 
 
 /**
@@ -47,6 +47,10 @@ export class LinearColorScaleModel extends LinearScaleModel {
 
   isColorScale = true;
 
+  static serializers = {
+    ...LinearScaleModel.serializers,
+    range: colorTupleSerializers,
+  }
 }
 
 /**
@@ -61,6 +65,11 @@ export class LogColorScaleModel extends LogScaleModel {
 
   isColorScale = true;
 
+  static serializers = {
+    ...LogScaleModel.serializers,
+    range: colorTupleSerializers,
+  }
+
   static model_name = 'LogColorScaleModel';
 }
 
@@ -392,3 +401,66 @@ export function colormapAsRGBAArray(mapModel: ColorMapModel, data: number | Type
 
   return data;
 }
+
+
+/**
+ * Evenly spaced stops from 0 to 1 (inclusive).
+ */
+export function unitStops(n: number): number[] {
+  return Array.from(new Array(n), (x, i) => i / (n - 1));
+}
+
+
+/**
+ * Get a function that maps values to their normalized position
+ * along the colors of a color map.
+ *
+ * Values outside the domain give positions outside [0, 1], unless
+ * the color map clamps, and invalid values give NaN. Returns null
+ * for color maps that are not continuous.
+ */
+export function colormapNormalizer(mapModel: ColorMapModel): ((value: number) => number) | null {
+  const obj = mapModel.obj as any;
+  if (mapModel instanceof SequentialScaleModel) {
+    return obj.copy().interpolator((t: number) => t).unknown(NaN);
+  }
+  if (mapModel instanceof ContinuousScaleModel) {
+    const n = Math.min(obj.domain().length, obj.range().length);
+    return obj.copy()
+      .range(unitStops(n))
+      .interpolate(interpolateNumber)
+      .unknown(NaN);
+  }
+  return null;
+}
+
+
+/**
+ * Sample a continuous color map into an RGBA lookup table.
+ *
+ * Entry `i` holds the color at the normalized position
+ * `(i + 0.5) / size` (see `colormapNormalizer`), which is
+ * the same layout as used by the kernel-side lookup tables.
+ * Returns null for color maps that are not continuous.
+ */
+export function colormapAsRGBALut(mapModel: ColorMapModel, size: number): Uint8ClampedArray | null {
+  const obj = mapModel.obj as any;
+  let interpolator: (t: number) => string;
+  if (mapModel instanceof SequentialScaleModel) {
+    interpolator = obj.interpolator();
+  } else if (mapModel instanceof ContinuousScaleModel) {
+    const n = Math.min(obj.domain().length, obj.range().length);
+    interpolator = piecewise(obj.interpolate(), obj.range().slice(0, n));
+  } else {
+    return null;
+  }
+  const data = new Uint8ClampedArray(size * 4);
+  for (let i = 0; i < size; ++i) {
+    const c = parseCssColor(interpolator((i + 0.5) / size));
+    data[i * 4 + 0] = c[0];
+    data[i * 4 + 1] = c[1];
+    data[i * 4 + 2] = c[2];
+    data[i * 4 + 3] = c[3];
+  }
+  return data;
+}
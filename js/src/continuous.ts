@@ -11,6 +11,10 @@ import {
   ScaleModel
 } from './scale';
 
+import {
+  tupleSerializers
+} from './utils';
+
 
 /**
  * Find the name of the d3-interpolate function
@@ -73,6 +77,8 @@ export abstract class ContinuousScaleModel extends ScaleModel {
 
   static serializers = {
     ...ScaleModel.serializers,
+    domain: tupleSerializers,
+    range: tupleSerializers,
   }
 }
 
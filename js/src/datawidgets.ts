@@ -20,13 +20,23 @@ import {
 } from 'jupyter-datawidgets/lib/base';
 
 import {
-  isColorMapModel
+  isColorMapModel, ColorMapModel, colormapAsRGBALut, colormapNormalizer,
+  unitStops
 } from './colormap';
 
 import {
-  LinearScaleModel
+  ContinuousScaleModel, LinearScaleModel, LogScaleModel, PowScaleModel
 } from './continuous';
 
+import {
+  composeScaleObjects, ComposedScaleModel, deferWhileBatching, ScaleModel,
+  SequentialScaleModel
+} from './scale';
+
+import {
+  canUseWorkers, IScaleDescription, IScaleJob, ScaleWorkerPool
+} from './scaleworker';
+
 import {
   MODULE_NAME, MODULE_VERSION
 } from './version';
@@ -74,6 +84,49 @@ export function arrayFrom(
 }
 
 
+/**
+ * The normalized integer output dtypes, with the dtypes they are
+ * stored as, and the maximum of their integer range.
+ */
+const normalizedDtypes: {[key: string]: [ndarray.DataType, number]} = {
+  uint8_norm: ['uint8_clamped', 255],
+  uint16_norm: ['uint16', 65535],
+};
+
+
+/**
+ * Get the function converting scaled values to an output dtype, or null
+ * if they can be assigned as is.
+ *
+ * For the normalized integer dtypes, numeric values in [0, 1] are mapped
+ * to the full range of the integer type, with values outside clamped,
+ * and NaN as 0. Color channels are rescaled from 0-255 to that range.
+ */
+export function outputConverter(outputDtype: string, color: boolean): ((value: number) => number) | null {
+  if (!normalizedDtypes.hasOwnProperty(outputDtype)) {
+    return null;
+  }
+  const max = normalizedDtypes[outputDtype][1];
+  if (color) {
+    const factor = Math.floor(max / 255);
+    return factor === 1 ? null : (c => c * factor);
+  }
+  return (v => v > 0 ? (v < 1 ? Math.round(v * max) : max) : 0);
+}
+
+
+/**
+ * Parse a color output by a color scale into RGBA values.
+ *
+ * Values the scale maps to `unknown` (e.g. NaN, as unknown is unset
+ * for continuous scales) are transparent black. The kernel-side
+ * evaluation and the scale workers use the same conventions.
+ */
+function scaledColor(color: string | null | undefined): [number, number, number, number] {
+  return color == null ? [0, 0, 0, 0] : parseCssColor(color);
+}
+
+
 /**
  * Whether two ndarrays differ in shape.
  */
@@ -86,6 +139,168 @@ function shapesDiffer(a: number[] | null, b: number[] | null) {
 }
 
 
+/**
+ * Create a compact, numeric description of a scale, that can be
+ * evaluated without the scale object (e.g. in a worker).
+ *
+ * Continuous color scales are described by their lookup table of
+ * size `lutSize`. Returns null for scales that cannot be described.
+ */
+export function describeScale(scale: ScaleModel, lutSize: number | null): IScaleDescription | null {
+  const obj = scale.obj as any;
+  if (typeof obj.domain !== 'function') {
+    return null;
+  }
+  const domain = obj.domain() as number[];
+  let range: number[];
+  let lut: Uint8ClampedArray | null = null;
+  // Sequential and diverging scales map a degenerate domain to the center:
+  let degenerate: number | null = null;
+  if (isColorMapModel(scale)) {
+    lut = lutSize ? colormapAsRGBALut(scale, lutSize) : null;
+    if (lut === null) {
+      return null;
+    }
+    if (scale instanceof SequentialScaleModel) {
+      range = unitStops(domain.length);
+      degenerate = 0.5;
+    } else {
+      range = unitStops(Math.min(domain.length, obj.range().length));
+    }
+  } else if (scale instanceof ContinuousScaleModel) {
+    range = obj.range();
+    const interpolator = scale.get('interpolator');
+    if (range.some(v => typeof v !== 'number') ||
+        (interpolator !== 'interpolate' && interpolator !== 'interpolateNumber')) {
+      return null;
+    }
+  } else {
+    return null;
+  }
+
+  let transform: IScaleDescription['transform'] = 'identity';
+  let exponent = 1;
+  let forward = (x: number) => x;
+  if (scale instanceof LogScaleModel) {
+    if (domain[0] < 0) {
+      transform = 'negLog';
+      forward = x => -Math.log(-x);
+    } else {
+      transform = 'log';
+      forward = Math.log;
+    }
+  } else if (scale instanceof PowScaleModel && scale.get('exponent') !== 1) {
+    transform = 'pow';
+    exponent = scale.get('exponent');
+    forward = x => x < 0 ? -Math.pow(-x, exponent) : Math.pow(x, exponent);
+  }
+
+  // As d3's polymap: truncate to the same length, and make ascending
+  const n = Math.min(domain.length, range.length);
+  let d = domain.slice(0, n).map(forward);
+  let r = range.slice(0, n);
+  if (d[n - 1] < d[0]) {
+    d = d.reverse();
+    r = r.reverse();
+  }
+  const slopes = new Float64Array(n - 1);
+  const offsets = new Float64Array(n - 1);
+  for (let i = 0; i < n - 1; ++i) {
+    if (d[i + 1] === d[i]) {
+      offsets[i] = degenerate === null ? 0.5 * (r[i] + r[i + 1]) : degenerate;
+    } else {
+      slopes[i] = (r[i + 1] - r[i]) / (d[i + 1] - d[i]);
+      offsets[i] = r[i] - d[i] * slopes[i];
+    }
+  }
+  const ends = [domain[0], domain[domain.length - 1]];
+  return {
+    transform,
+    exponent,
+    clamp: obj.clamp() ? [Math.min(...ends), Math.max(...ends)] : null,
+    breaks: Float64Array.from(d),
+    slopes,
+    offsets,
+    lut,
+  };
+}
+
+
+let workerPool: ScaleWorkerPool | null = null;
+
+/**
+ * Get the shared worker pool, or null if workers are not available.
+ */
+function getWorkerPool(): ScaleWorkerPool | null {
+  if (workerPool === null && canUseWorkers()) {
+    const cores = navigator.hardwareConcurrency || 2;
+    workerPool = new ScaleWorkerPool(Math.max(1, Math.min(4, cores - 1)));
+  }
+  return workerPool;
+}
+
+
+/**
+ * Get the indices into the data of an ndarray for a box region, in C order.
+ *
+ * The region is given as [start, stop) pairs for each axis.
+ */
+export function regionIndices(array: ndarray.NdArray, region: [number, number][]): Int32Array {
+  const ndim = array.shape.length;
+  const size = region.reduce((ac, [start, stop]) => ac * Math.max(0, stop - start), 1);
+  const indices = new Int32Array(size);
+  if (size === 0) {
+    return indices;
+  }
+  const index = region.map(([start]) => start);
+  for (let k = 0; k < size; ++k) {
+    let flat = array.offset;
+    for (let d = 0; d < ndim; ++d) {
+      flat += index[d] * array.stride[d];
+    }
+    indices[k] = flat;
+    // Increment the multi-index, last axis fastest:
+    for (let d = ndim - 1; d >= 0; --d) {
+      if (++index[d] < region[d][1]) {
+        break;
+      }
+      index[d] = region[d][0];
+    }
+  }
+  return indices;
+}
+
+
+/**
+ * Split a scale into the function applied before its color map, and
+ * the color map, for scales that map values to colors.
+ *
+ * For a composed scale ending in a color map, the function composes
+ * the preceding scales. For a color map, the function is null. For
+ * other scales, both are null.
+ */
+export function splitColorMap(scale: ScaleModel | null): [((value: any) => any) | null, ColorMapModel | null] {
+  if (isColorMapModel(scale)) {
+    return [null, scale];
+  }
+  if (scale instanceof ComposedScaleModel) {
+    const members = scale.flatMembers();
+    const last = members[members.length - 1];
+    if (isColorMapModel(last)) {
+      return [composeScaleObjects(members.slice(0, -1).map(m => m.obj)), last];
+    }
+  }
+  return [null, null];
+}
+
+
+/**
+ * Scale attributes that do not affect a color lookup table, since
+ * the table is sampled over the normalized domain.
+ */
+const normalizationAttributes = ['domain', 'clamp'];
+
+
 /**
  * Scaled array model.
  *
@@ -111,19 +326,30 @@ export class ScaledArrayModel extends DataModel implements IDataWriteBack {
       scale: null,
       scaledData: null,
       output_dtype: 'inherit',
+      lut_size: 4096,
+      use_workers: false,
     }} as any;
   }
 
   /**
    * (Re-)compute the scaledData data.
    *
+   * If `use_workers` is set, and the scale can be described numerically,
+   * the computation is done asynchronously in a worker pool, unless
+   * `allowWorkers` is false. Any computation still in progress is
+   * cancelled.
+   *
    * @returns {void}
    * @memberof ScaledArrayModel
    */
-  computeScaledData(options?: any): void {
+  computeScaledData(options?: any, allowWorkers = true): void {
     options = typeof options === 'object'
       ? {...options, setScaled: true}
       : {setScaled: true};
+    if (this.pendingJob !== null) {
+      this.pendingJob.cancel();
+      this.pendingJob = null;
+    }
     let array = getArray(this.get('data'));
     let scale = this.get('scale') as LinearScaleModel | null;
     // Handle null case immediately:
@@ -131,6 +357,144 @@ export class ScaledArrayModel extends DataModel implements IDataWriteBack {
       this.set('scaledData', null, options);
       return;
     }
+    // The workers cannot convert to normalized outputs:
+    if (allowWorkers && this.get('use_workers') && this.outputConverter() === null) {
+      const pool = getWorkerPool();
+      const description = pool && describeScale(scale, this.get('lut_size'));
+      if (pool && description) {
+        this.computeInWorkers(pool, description, array, options);
+        return;
+      }
+    }
+    let scaledData = this.prepareScaledData(array);
+    this.scaleValues(scale, array.data as TypedArray, scaledData.data as TypedArray);
+    this.set('scaledData', scaledData, options);
+  }
+
+  /**
+   * Scale the values of `data` into `target`.
+   *
+   * For color scales, four RGBA values are written per value.
+   */
+  protected scaleValues(scale: LinearScaleModel, data: TypedArray, target: TypedArray): void {
+    // Composed scales are evaluated in this same loop, without any
+    // intermediate arrays:
+    const [pre, colorMap] = splitColorMap(scale);
+    const convert = this.outputConverter();
+    if (colorMap) {
+      const lut = this.getColorLut(colorMap);
+      const normalize = lut && this.getColorNormalizer(colorMap);
+      if (lut && normalize) {
+        this.applyColorLut(colorMap, normalize, lut, data, target, pre);
+      } else {
+        for (let i = 0; i < data.length; ++i) {
+          const c = scaledColor(colorMap.obj(pre ? pre(data[i]) : data[i]));
+          target[i*4+0] = c[0];
+          target[i*4+1] = c[1];
+          target[i*4+2] = c[2];
+          target[i*4+3] = c[3];
+        }
+      }
+      if (convert !== null) {
+        for (let i = 0; i < 4 * data.length; ++i) {
+          target[i] = convert(target[i]);
+        }
+      }
+    } else if (convert !== null) {
+      for (let i = 0; i < data.length; ++i) {
+        target[i] = convert(scale.obj(data[i]));
+      }
+    } else {
+      for (let i = 0; i < data.length; ++i) {
+        target[i] = scale.obj(data[i]);
+      }
+    }
+  }
+
+  /**
+   * Get the function converting scaled values to the output dtype, if any.
+   */
+  protected outputConverter(): ((value: number) => number) | null {
+    return outputConverter(
+      this.get('output_dtype'),
+      splitColorMap(this.get('scale'))[1] !== null
+    );
+  }
+
+  /**
+   * Update a region of the data, and rescale only that region.
+   *
+   * The region is given as [start, stop) pairs for each axis, and the
+   * values are in C order. The resulting `scaledData` change event has
+   * the region as `dirtyRegion` in its options. A full recomputation is
+   * done if the scaled data is not up to date, e.g. if a computation
+   * is in progress in the workers.
+   */
+  updateRegion(region: [number, number][], values: TypedArray, options?: any): void {
+    const array = getArray(this.get('data'));
+    if (array === null) {
+      return;
+    }
+    const sourceIndices = regionIndices(array, region);
+    const source = array.data as TypedArray;
+    for (let k = 0; k < sourceIndices.length; ++k) {
+      source[sourceIndices[k]] = values[k];
+    }
+
+    const scale = this.get('scale') as LinearScaleModel | null;
+    if (scale === null || this.pendingJob !== null ||
+        this.get('scaledData') === null || this.arrayMismatch()) {
+      this.computeScaledData(options);
+      return;
+    }
+    const scaledData = this.prepareScaledData(array);
+    const target = scaledData.data as TypedArray;
+    const components = splitColorMap(scale)[1] ? 4 : 1;
+    const scaled = new (target.constructor as any)(values.length * components);
+    this.scaleValues(scale, values, scaled);
+    // The scaled data is laid out like the source data (see computeScaledData):
+    for (let k = 0; k < sourceIndices.length; ++k) {
+      const i = sourceIndices[k] * components;
+      for (let c = 0; c < components; ++c) {
+        target[i + c] = scaled[k * components + c];
+      }
+    }
+    this.set('scaledData', scaledData, {
+      ...options,
+      setScaled: true,
+      dirtyRegion: region,
+    });
+  }
+
+  /**
+   * Handle custom messages from the kernel.
+   */
+  protected onCustomMessage(content: any, buffers?: (ArrayBuffer | DataView)[]): void {
+    if (content.event === 'update_slice') {
+      const array = getArray(this.get('data'));
+      if (array === null || !buffers || buffers.length < 1) {
+        return;
+      }
+      const buffer = buffers[0];
+      const view = ArrayBuffer.isView(buffer)
+        ? buffer
+        : new DataView(buffer as ArrayBuffer);
+      const ctor = (typesToArray as any)[array.dtype];
+      const values = new ctor(
+        view.buffer,
+        view.byteOffset,
+        view.byteLength / ctor.BYTES_PER_ELEMENT
+      );
+      this.updateRegion(content.region, values);
+    }
+  }
+
+  /**
+   * Get an ndarray to write the scaled data to.
+   *
+   * The current array is reused if it has the right shape and type.
+   */
+  protected prepareScaledData(array: ndarray.NdArray): ndarray.NdArray {
     let resized = this.arrayMismatch();
     let scaledData = this.get('scaledData') as ndarray.NdArray;
     if (resized) {
@@ -148,25 +512,161 @@ export class ScaledArrayModel extends DataModel implements IDataWriteBack {
       // Tag on a version# to differntiate it:
       (scaledData as any)._version = version;
     }
-    let data = array.data as TypedArray;
-    let target = scaledData!.data as TypedArray;
+    return scaledData;
+  }
 
-    // Set values:
-    if (isColorMapModel(scale)) {
-      for (let i = 0; i < data.length; ++i) {
-        const c = parseCssColor(scale!.obj(data[i]))
-        target[i*4+0] = c[0];
-        target[i*4+1] = c[1];
-        target[i*4+2] = c[2];
-        target[i*4+3] = c[3];
+  /**
+   * Compute the scaled data in the worker pool.
+   */
+  protected computeInWorkers(
+    pool: ScaleWorkerPool,
+    description: IScaleDescription,
+    array: ndarray.NdArray,
+    options: any
+  ): void {
+    const arrayType = (typesToArray as any)[this.scaledDtype()!].name;
+    const job = pool.run(description, array.data as TypedArray, arrayType);
+    this.pendingJob = job;
+    job.promise.then(result => {
+      if (result === null || this.pendingJob !== job) {
+        // Cancelled, or superseded
+        return;
       }
-    } else {
-      for (let i = 0; i < data.length; ++i) {
-        target[i] = scale.obj(data[i]);
+      this.pendingJob = null;
+      const scaledData = this.prepareScaledData(array);
+      const target = scaledData.data as TypedArray;
+      target.set(result.data);
+      // Values outside of the lookup table are evaluated by the scale,
+      // as in `applyColorLut`:
+      const [pre, colorMap] = splitColorMap(this.get('scale'));
+      const source = array.data as TypedArray;
+      if (colorMap) {
+        for (let k = 0; k < result.fallback.length; ++k) {
+          const i = result.fallback[k];
+          const x = pre === null ? source[i] : pre(source[i]);
+          const c = scaledColor(colorMap.obj(x));
+          target.set(c, i * 4);
+        }
       }
+      this.set('scaledData', scaledData, options);
+    }, error => {
+      if (this.pendingJob === job) {
+        this.pendingJob = null;
+      }
+      console.error('Failed to compute scaled data in worker:', error);
+    });
+  }
+
+  /**
+   * Get the color lookup table for a color scale, or null if disabled.
+   *
+   * The table is cached until the scale or `lut_size` changes. Changes
+   * to the domain of the scale are applied when normalizing the values,
+   * and do not invalidate the table.
+   */
+  protected getColorLut(scale: ColorMapModel): Uint8ClampedArray | null {
+    const size = this.get('lut_size') as number | null;
+    if (!size) {
+      return null;
+    }
+    if (this.inGroup()) {
+      // Rebuild our own table if we leave the group:
+      this.colorLut = undefined;
+      return this.group!.getColorLut(scale, size);
     }
+    if (this.colorLut === undefined) {
+      this.colorLut = colormapAsRGBALut(scale, size);
+    }
+    return this.colorLut;
+  }
 
-    this.set('scaledData', scaledData, options);
+  /**
+   * Get the function normalizing values for the color lookup table.
+   *
+   * The function is shared by the members of a group.
+   */
+  protected getColorNormalizer(scale: ColorMapModel): ((value: number) => number) | null {
+    if (this.inGroup()) {
+      return this.group!.getColorNormalizer(scale);
+    }
+    return colormapNormalizer(scale);
+  }
+
+  /**
+   * Whether this is in a group that handles changes of its scale.
+   */
+  inGroup(): boolean {
+    return this.group !== null && this.group.get('scale') === this.get('scale');
+  }
+
+  /**
+   * Discard the scaled data without computing it.
+   *
+   * It is recomputed on the next access through `getNDArray`. No change
+   * event is triggered.
+   */
+  invalidateScaledData(): void {
+    if (this.pendingJob !== null) {
+      this.pendingJob.cancel();
+      this.pendingJob = null;
+    }
+    this.set('scaledData', null, {setScaled: true, silent: true});
+  }
+
+  /**
+   * Fill the RGBA target from the color lookup table.
+   *
+   * Values that fall outside of the table (outside the domain of a
+   * non-clamped scale, or invalid) are evaluated by the scale. If
+   * given, `pre` is applied to the values first.
+   */
+  protected applyColorLut(
+    scale: ColorMapModel,
+    normalize: (value: number) => number,
+    lut: Uint8ClampedArray,
+    data: TypedArray,
+    target: TypedArray,
+    pre: ((value: any) => any) | null = null
+  ): void {
+    const n = lut.length / 4;
+    for (let i = 0; i < data.length; ++i) {
+      const x = pre === null ? data[i] : pre(data[i]);
+      const t = normalize(x);
+      const j = i * 4;
+      if (t >= 0 && t <= 1) {
+        const k = 4 * Math.min(n - 1, Math.floor(t * n));
+        target[j+0] = lut[k+0];
+        target[j+1] = lut[k+1];
+        target[j+2] = lut[k+2];
+        target[j+3] = lut[k+3];
+      } else {
+        const c = scaledColor(scale.obj(x));
+        target[j+0] = c[0];
+        target[j+1] = c[1];
+        target[j+2] = c[2];
+        target[j+3] = c[3];
+      }
+    }
+  }
+
+  /**
+   * Callback for changes within the scale model.
+   *
+   * Recomputation is deferred while a batch of scale changes is
+   * being applied.
+   */
+  protected onScaleChange(model: WidgetModel, options?: any): void {
+    if (this.inGroup()) {
+      // The group recomputes all its members at once:
+      return;
+    }
+    const changed = Object.keys(model.changedAttributes() || {});
+    if (changed.some(key => normalizationAttributes.indexOf(key) === -1)) {
+      this.colorLut = undefined;
+    }
+    if (!deferWhileBatching(this, () => this.onChange(model, options))) {
+      this.onChange(model, options);
+    }
   }
 
   /**
@@ -193,13 +693,20 @@ export class ScaledArrayModel extends DataModel implements IDataWriteBack {
    * @memberof ScaledArrayModel
    */
   setupListeners(): void {
+    // The color lookup table needs to be invalidated before recomputing:
+    this.on('change:scale change:lut_size', () => {
+      this.colorLut = undefined;
+    }, this);
+
+    this.on('msg:custom', this.onCustomMessage, this);
+
     // Listen to direct changes on our model:
-    this.on('change:scale', this.onChange, this);
+    this.on('change:scale change:lut_size change:use_workers change:output_dtype', this.onChange, this);
 
     // Listen to changes within array and scale models:
     listenToUnion(this, 'data', this.onChange.bind(this), true);
 
-    this.listenTo(this.get('scale'), 'change', this.onChange);
+    this.listenTo(this.get('scale'), 'change', this.onScaleChange);
     // make sure to (un)hook listeners when child points to new object
     this.on('change:scale', (model: this, value: LinearScaleModel, options: any) => {
       const prevModel = this.previous('scale') as LinearScaleModel;
@@ -208,7 +715,7 @@ export class ScaledArrayModel extends DataModel implements IDataWriteBack {
         this.stopListening(prevModel);
       }
       if (currModel) {
-        this.listenTo(currModel, 'change', this.onChange.bind(this));
+        this.listenTo(currModel, 'change', this.onScaleChange.bind(this));
       }
     }, this);
   }
@@ -216,7 +723,8 @@ export class ScaledArrayModel extends DataModel implements IDataWriteBack {
   getNDArray(key='scaledData'): ndarray.NdArray | null {
     if (key === 'scaledData') {
       if (this.get('scaledData') === null) {
-        this.computeScaledData();
+        // Synchronous access, so compute in place:
+        this.computeScaledData(undefined, false);
       }
       return this.get('scaledData');
     } else {
@@ -299,11 +807,16 @@ export class ScaledArrayModel extends DataModel implements IDataWriteBack {
 
   /**
    * Get what the dtype of the scaled data *should* be
+   *
+   * Normalized integer outputs are stored in typed arrays of their
+   * integer type.
    */
   protected scaledDtype(): ndarray.DataType | null {
-    let output_dtype = this.get('output_dtype') as ndarray.DataType | 'inherit';
+    let output_dtype = this.get('output_dtype') as string;
     if (output_dtype !== 'inherit') {
-      return output_dtype;
+      return normalizedDtypes.hasOwnProperty(output_dtype)
+        ? normalizedDtypes[output_dtype][0]
+        : output_dtype as ndarray.DataType;
     }
     let array = getArray(this.get('data'));
     if (array === null) {
@@ -319,12 +832,27 @@ export class ScaledArrayModel extends DataModel implements IDataWriteBack {
     const scale = this.get('scale');
     const array = getArray(this.get('data'));
     // Special case colors, as we allow them to transform the shape
-    if (isColorMapModel(scale)) {
+    if (splitColorMap(scale)[1]) {
       return array && array.shape.concat(4);
     }
     return array && array.shape;
   }
 
+  /**
+   * The computation in progress in the worker pool, if any.
+   */
+  protected pendingJob: IScaleJob | null = null;
+
+  /**
+   * The cached color lookup table, undefined if invalidated.
+   */
+  protected colorLut: Uint8ClampedArray | null | undefined = undefined;
+
+  /**
+   * The group this is a member of, if any.
+   */
+  group: ScaledArrayGroupModel | null = null;
+
   /**
    * A promise that resolves once the model has finished its initialization.
    *
@@ -344,3 +872,201 @@ export class ScaledArrayModel extends DataModel implements IDataWriteBack {
   static model_module = MODULE_NAME;
   static model_module_version = MODULE_VERSION;
 }
+
+
+/**
+ * Model of a group of scaled arrays that share a scale.
+ *
+ * Changes of the scale are handled once for the whole group, instead of
+ * by each member: the color lookup tables and normalization are built
+ * once, and the members are recomputed together in a single scheduled
+ * batch. A single "computed" event is then triggered on the group, with
+ * the recomputed members.
+ *
+ * If `displayed_only` is set, only the members that are displayed are
+ * recomputed. Members are displayed unless reported otherwise with
+ * `setDisplayed`, e.g. by views that go off screen. Other members have
+ * their scaled data invalidated, and are recomputed once displayed again,
+ * or on access of their scaled data.
+ */
+export class ScaledArrayGroupModel extends WidgetModel {
+  defaults() {
+    const ctor = this.constructor as any;
+    return {...super.defaults(), ...{
+      _model_name: ctor.model_name,
+      _model_module: ctor.model_module,
+      _model_module_version: ctor.model_module_version,
+      _view_name: ctor.view_name,
+      _view_module: ctor.view_module,
+      _view_module_version: ctor.view_module_version,
+      scale: null,
+      arrays: [],
+      displayed_only: false,
+    }} as any;
+  }
+
+  initialize(attributes: ObjectHash, options: {model_id: string; comm?: any; widget_manager: any; }): void {
+    super.initialize(attributes, options);
+    const scale = (this.get('scale') as ScaleModel | null) || undefined;
+    const members = this.get('arrays') as ScaledArrayModel[];
+    this.initPromise = Promise.all([
+      scale && scale.initPromise,
+      ...members.map(m => m.initPromise),
+    ]).then(() => {
+      this.attachMembers(members);
+      this.setupListeners();
+    });
+  }
+
+  setupListeners(): void {
+    this.listenTo(this.get('scale'), 'change', this.onScaleChange);
+    this.on('change:scale', (model: this, value: ScaleModel | null) => {
+      const prevModel = this.previous('scale') as ScaleModel | null;
+      if (prevModel) {
+        this.stopListening(prevModel);
+      }
+      if (value) {
+        this.listenTo(value, 'change', this.onScaleChange);
+      }
+      this.invalidateCaches();
+    }, this);
+    this.on('change:arrays', (model: this, value: ScaledArrayModel[]) => {
+      for (let member of this.previous('arrays') as ScaledArrayModel[] || []) {
+        if (member.group === this) {
+          member.group = null;
+        }
+      }
+      this.attachMembers(value);
+    }, this);
+    this.on('change:displayed_only', () => this.schedule(), this);
+  }
+
+  /**
+   * Get the color lookup table of a size, shared by the members.
+   */
+  getColorLut(scale: ColorMapModel, size: number): Uint8ClampedArray | null {
+    this.checkCachedScale(scale);
+    let lut = this.colorLuts.get(size);
+    if (lut === undefined) {
+      lut = colormapAsRGBALut(scale, size);
+      this.colorLuts.set(size, lut);
+    }
+    return lut;
+  }
+
+  /**
+   * Get the function normalizing values for the lookup tables.
+   */
+  getColorNormalizer(scale: ColorMapModel): ((value: number) => number) | null {
+    this.checkCachedScale(scale);
+    if (this.normalizer === undefined) {
+      this.normalizer = colormapNormalizer(scale);
+    }
+    return this.normalizer;
+  }
+
+  /**
+   * Report whether a member is displayed.
+   *
+   * Members that are displayed again are recomputed if needed.
+   */
+  setDisplayed(member: ScaledArrayModel, displayed: boolean): void {
+    if (displayed) {
+      this.hidden.delete(member);
+      if (member.get('scaledData') === null) {
+        member.computeScaledData();
+      }
+    } else {
+      this.hidden.add(member);
+    }
+  }
+
+  /**
+   * Schedule the recomputation of the members.
+   *
+   * Any number of calls before the batch runs give a single batch.
+   */
+  schedule(): Promise<void> {
+    if (this.scheduled === null) {
+      this.scheduled = Promise.resolve().then(() => {
+        this.scheduled = null;
+        this.recompute();
+      });
+    }
+    return this.scheduled;
+  }
+
+  /**
+   * Recompute the members now.
+   */
+  recompute(): void {
+    const displayedOnly = this.get('displayed_only') as boolean;
+    const computed: ScaledArrayModel[] = [];
+    for (let member of this.get('arrays') as ScaledArrayModel[]) {
+      if (!member.inGroup()) {
+        continue;
+      }
+      if (displayedOnly && this.hidden.has(member)) {
+        member.invalidateScaledData();
+      } else {
+        member.computeScaledData();
+        computed.push(member);
+      }
+    }
+    this.trigger('computed', this, computed);
+  }
+
+  protected attachMembers(members: ScaledArrayModel[]): void {
+    for (let member of members) {
+      member.group = this;
+    }
+  }
+
+  protected onScaleChange(model: WidgetModel, options?: any): void {
+    const changed = Object.keys(model.changedAttributes() || {});
+    if (changed.some(key => normalizationAttributes.indexOf(key) === -1)) {
+      this.colorLuts.clear();
+    }
+    this.normalizer = undefined;
+    if (!deferWhileBatching(this, () => this.schedule())) {
+      this.schedule();
+    }
+  }
+
+  protected checkCachedScale(scale: ColorMapModel): void {
+    // Composed scales can replace their color map:
+    if (scale !== this.cachedScale) {
+      this.invalidateCaches();
+      this.cachedScale = scale;
+    }
+  }
+
+  protected invalidateCaches(): void {
+    this.colorLuts.clear();
+    this.normalizer = undefined;
+    this.cachedScale = null;
+  }
+
+  /**
+   * A promise that resolves once the model has finished its initialization.
+   */
+  initPromise: Promise<void>;
+
+  protected cachedScale: ColorMapModel | null = null;
+  protected colorLuts = new Map<number, Uint8ClampedArray | null>();
+  protected normalizer: ((value: number) => number) | null | undefined = undefined;
+  protected hidden = new Set<ScaledArrayModel>();
+  protected scheduled: Promise<void> | null = null;
+
+  static serializers: ISerializers = {
+      scale: { deserialize: unpack_models },
+      arrays: { deserialize: unpack_models },
+    };
+
+  static model_name = 'ScaledArrayGroupModel';
+  static model_module = MODULE_NAME;
+  static model_module_version = MODULE_VERSION;
+  static view_name = null;
+  static view_module = null;
+  static view_module_version = MODULE_VERSION;
+}
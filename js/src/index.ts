@@ -5,6 +5,7 @@ export * from './scale';
 export * from './continuous';
 export * from './colormap';
 export * from './datawidgets';
+export * from './scaleworker';
 export * from './selectors';
 export * from './value';
 
@@ -2,18 +2,22 @@
 // Distributed under the terms of the Modified BSD License.
 
 import {
-  WidgetModel, IWidgetManager
+  WidgetModel, IWidgetManager, unpack_models
 } from '@jupyter-widgets/base';
 
 import {
   ScaleSequential, ScaleQuantize, scaleQuantize, ScaleQuantile, scaleQuantile,
-  ScaleOrdinal, scaleOrdinal, scaleImplicit
+  ScaleThreshold, scaleThreshold, ScaleOrdinal, scaleOrdinal, scaleImplicit
 } from 'd3-scale';
 
 import {
   listenToUnion,
 } from 'jupyter-dataserializers';
 
+import {
+  tupleSerializers
+} from './utils';
+
 import {
   MODULE_NAME, MODULE_VERSION
 } from './version';
@@ -35,6 +39,74 @@ interface IInitializeOptions {
 }
 
 
+/**
+ * The batches of scale changes being applied for a widget manager.
+ */
+interface IBatchState {
+  /**
+   * The scale models that began the open batches, once per batch.
+   */
+  open: ScaleModel[];
+
+  /**
+   * The deferred updates, keyed by model.
+   */
+  updates: Map<WidgetModel, () => void>;
+}
+
+const batchStates = new WeakMap<IWidgetManager, IBatchState>();
+
+
+/**
+ * Defer an update of a model while a batch of scale changes is being
+ * applied, for the widget manager of the model.
+ *
+ * Only the last update for each model is run when the batch ends.
+ * Returns false if no batch is active, in which case the caller should
+ * update immediately.
+ */
+export function deferWhileBatching(model: WidgetModel, update: () => void): boolean {
+  const state = batchStates.get(model.widget_manager);
+  if (state === undefined || state.open.length === 0) {
+    return false;
+  }
+  state.updates.set(model, update);
+  return true;
+}
+
+
+function beginBatch(model: ScaleModel): void {
+  let state = batchStates.get(model.widget_manager);
+  if (state === undefined) {
+    state = {open: [], updates: new Map()};
+    batchStates.set(model.widget_manager, state);
+  }
+  state.open.push(model);
+}
+
+
+/**
+ * End a batch begun by a model, if any.
+ *
+ * The deferred updates are run when the last open batch ends.
+ */
+function endBatch(model: ScaleModel): void {
+  const state = batchStates.get(model.widget_manager);
+  const index = state ? state.open.indexOf(model) : -1;
+  if (index === -1) {
+    return;
+  }
+  state!.open.splice(index, 1);
+  if (state!.open.length === 0) {
+    const updates = Array.from(state!.updates.values());
+    state!.updates.clear();
+    for (let update of updates) {
+      update();
+    }
+  }
+}
+
+
 /**
  * Base model for scales
  */
@@ -178,6 +250,14 @@ abstract class ScaleModel extends WidgetModel {
     };
     this.on('change', this.onChange, this);
     this.on('msg:custom', this.onCustomMessage, this);
+    // A batch that is never ended (e.g. if the kernel goes away) should
+    // not defer updates forever:
+    this.on('destroy', () => {
+      while (batchStates.has(this.widget_manager) &&
+             batchStates.get(this.widget_manager)!.open.indexOf(this) !== -1) {
+        endBatch(this);
+      }
+    }, this);
   }
 
   onChange(model: WidgetModel, options: any) {
@@ -192,6 +272,17 @@ abstract class ScaleModel extends WidgetModel {
   }
 
   onCustomMessage(content: any, buffers: any) {
+    if (content.event === 'batch_begin') {
+      beginBatch(this);
+    } else if (content.event === 'batch_end') {
+      // Wait for the batched state updates of all the scales to be applied:
+      const ids: string[] = content.scales || [];
+      const applied = Promise.all([this.state_change].concat(ids.map(
+        id => this.widget_manager.get_model(id).then(model => model.state_change)
+      )));
+      const end = () => endBatch(this);
+      applied.then(end, end);
+    }
   }
 
   static serializers: ISerializerMap = WidgetModel.serializers;
@@ -273,6 +364,7 @@ export class QuantizeScaleModel extends ScaleModel {
 
   static serializers = {
     ...ScaleModel.serializers,
+    range: tupleSerializers,
   }
 
   static model_name = 'QuantizeScaleModel';
@@ -306,6 +398,8 @@ export class QuantileScaleModel extends ScaleModel {
 
   static serializers = {
     ...ScaleModel.serializers,
+    domain: tupleSerializers,
+    range: tupleSerializers,
   }
 
   static model_name = 'QuantileScaleModel';
@@ -332,13 +426,15 @@ export class TresholdScaleModel extends ScaleModel {
   }
 
   constructObject() {
-    return scaleQuantile<any>();
+    return scaleThreshold<any, any>();
   }
 
-  obj: ScaleQuantile<any>;
+  obj: ScaleThreshold<any, any>;
 
   static serializers = {
     ...ScaleModel.serializers,
+    domain: tupleSerializers,
+    range: tupleSerializers,
   }
 
   static model_name = 'TresholdScaleModel';
@@ -390,6 +486,8 @@ export class OrdinalScaleModel extends ScaleModel {
 
   static serializers = {
     ...ScaleModel.serializers,
+    domain: tupleSerializers,
+    range: tupleSerializers,
     unknown: {
       deserialize: (value?: any, manager?: IWidgetManager) => {
         return value === '__implicit'
@@ -410,3 +508,96 @@ export class OrdinalScaleModel extends ScaleModel {
 
   static model_name = 'OrdinalScaleModel';
 }
+
+
+/**
+ * Compose scale objects into a single function.
+ *
+ * The function maps a value through each of the objects in turn.
+ */
+export function composeScaleObjects(objs: any[]): (value: any) => any {
+  return (value: any) => {
+    for (let i = 0; i < objs.length; ++i) {
+      value = objs[i](value);
+    }
+    return value;
+  };
+}
+
+
+/**
+ * A widget model of a composition of scales.
+ *
+ * The scale object maps values through each of the member scales in
+ * turn. Changes of the member scales are forwarded as change events
+ * of this model, with the changed member as the event model.
+ */
+export class ComposedScaleModel extends ScaleModel {
+  defaults() {
+    return {...super.defaults(),
+      scales: [],
+    };
+  }
+
+  constructObject() {
+    const members = this.get('scales') as ScaleModel[];
+    return Promise.all(members.map(m => m.initPromise)).then(() => {
+      this.updateMembers();
+      // Look up the members on every call, so that the object is stable:
+      return (value: any) => this.composed(value);
+    });
+  }
+
+  /**
+   * Get the member scales, with nested compositions flattened.
+   */
+  flatMembers(): ScaleModel[] {
+    const members: ScaleModel[] = [];
+    for (let member of this.get('scales') as ScaleModel[]) {
+      if (member instanceof ComposedScaleModel) {
+        members.push(...member.flatMembers());
+      } else {
+        members.push(member);
+      }
+    }
+    return members;
+  }
+
+  setupListeners() {
+    super.setupListeners();
+    this.listenToMembers();
+    this.on('change:scales', () => {
+      for (let member of this.previous('scales') as ScaleModel[] || []) {
+        this.stopListening(member);
+      }
+      this.listenToMembers();
+      this.updateMembers();
+    }, this);
+  }
+
+  protected listenToMembers(): void {
+    for (let member of this.get('scales') as ScaleModel[]) {
+      this.listenTo(member, 'change', (model: WidgetModel, options: any) => {
+        if (member instanceof ComposedScaleModel) {
+          // Nested compositions may have replaced their members:
+          this.updateMembers();
+        }
+        this.trigger('change', model, options);
+      });
+      this.listenTo(member, 'childchange', this.onChildChanged.bind(this));
+    }
+  }
+
+  protected updateMembers(): void {
+    this.composed = composeScaleObjects(this.flatMembers().map(m => m.obj));
+  }
+
+  protected composed: (value: any) => any = (value: any) => value;
+
+  static serializers = {
+    ...ScaleModel.serializers,
+    scales: { deserialize: unpack_models },
+  }
+
+  static model_name = 'ComposedScaleModel';
+}
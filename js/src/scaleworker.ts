@@ -0,0 +1,418 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  TypedArray
+} from 'jupyter-dataserializers';
+
+
+/**
+ * A compact, numeric description of a scale.
+ *
+ * Values are clamped to `clamp` (if set), transformed, and then mapped
+ * by the piecewise affine function given by `breaks`, `slopes` and
+ * `offsets`. If `lut` is set, the result is a position in [0, 1] along
+ * an RGBA lookup table, and four components are output per value.
+ */
+export interface IScaleDescription {
+  transform: 'identity' | 'log' | 'negLog' | 'pow';
+  exponent: number;
+  clamp: [number, number] | null;
+  breaks: Float64Array;
+  slopes: Float64Array;
+  offsets: Float64Array;
+  lut: Uint8ClampedArray | null;
+}
+
+
+/**
+ * A message to a scale worker.
+ */
+export interface IScaleTask {
+  id: number;
+  description: IScaleDescription;
+  data: TypedArray;
+  arrayType: string;
+}
+
+
+/**
+ * A message from a scale worker.
+ */
+export interface IScaleTaskResult {
+  id: number;
+  result?: TypedArray;
+  fallback?: Int32Array;
+  error?: string;
+}
+
+
+/**
+ * Apply a scale description to an array.
+ *
+ * Invalid values give NaN. For lookup tables, values that fall outside
+ * of the table (outside the domain of a non-clamped scale, or invalid)
+ * are left as transparent black, and their indices are added to
+ * `fallback`, so that they can be evaluated exactly by the scale, as
+ * on the main thread.
+ *
+ * This function is serialized into the worker source, and so it
+ * can not reference anything outside of its own body.
+ */
+export function applyScaleDescription(
+  desc: IScaleDescription,
+  data: TypedArray,
+  target: TypedArray,
+  fallback: number[] = []
+): TypedArray {
+  const breaks = desc.breaks;
+  const slopes = desc.slopes;
+  const offsets = desc.offsets;
+  const m = slopes.length;
+  const lo = desc.clamp ? desc.clamp[0] : -Infinity;
+  const hi = desc.clamp ? desc.clamp[1] : Infinity;
+  const transform = desc.transform;
+  const exponent = desc.exponent;
+  const lut = desc.lut;
+  const lutSize = lut ? lut.length / 4 : 0;
+  for (let i = 0; i < data.length; ++i) {
+    let x = data[i];
+    if (x < lo) {
+      x = lo;
+    } else if (x > hi) {
+      x = hi;
+    }
+    if (transform === 'log') {
+      x = Math.log(x);
+    } else if (transform === 'negLog') {
+      x = -Math.log(-x);
+    } else if (transform === 'pow') {
+      x = x < 0 ? -Math.pow(-x, exponent) : Math.pow(x, exponent);
+    }
+    // Find the segment, as d3's `bisect(domain, x, 1, m) - 1`:
+    let j = 0;
+    let k = m - 1;
+    while (j < k) {
+      const mid = (j + k + 1) >>> 1;
+      if (breaks[mid] <= x) {
+        j = mid;
+      } else {
+        k = mid - 1;
+      }
+    }
+    const t = x * slopes[j] + offsets[j];
+    if (lut === null) {
+      target[i] = t;
+      continue;
+    }
+    const o = i * 4;
+    if (!(t >= 0 && t <= 1)) {
+      target[o] = target[o + 1] = target[o + 2] = target[o + 3] = 0;
+      fallback.push(i);
+      continue;
+    }
+    const l = 4 * Math.min(lutSize - 1, Math.floor(t * lutSize));
+    target[o] = lut[l];
+    target[o + 1] = lut[l + 1];
+    target[o + 2] = lut[l + 2];
+    target[o + 3] = lut[l + 3];
+  }
+  return target;
+}
+
+
+/**
+ * The main function of a scale worker.
+ *
+ * Like `applyScaleDescription`, this is serialized into the worker
+ * source. It runs in both Web Workers and Node worker threads.
+ */
+function scaleWorkerMain(apply: typeof applyScaleDescription): void {
+  function handle(task: IScaleTask): [IScaleTaskResult, ArrayBuffer[]] {
+    try {
+      const components = task.description.lut ? 4 : 1;
+      const ctor = (globalThis as any)[task.arrayType];
+      const result = new ctor(task.data.length * components);
+      const indices: number[] = [];
+      apply(task.description, task.data, result, indices);
+      const fallback = Int32Array.from(indices);
+      return [{id: task.id, result, fallback}, [result.buffer, fallback.buffer]];
+    } catch (e) {
+      return [{id: task.id, error: String(e)}, []];
+    }
+  }
+  const scope = globalThis as any;
+  if (typeof scope.require === 'function') {
+    // Node worker thread (created with `eval: true`):
+    const port = scope.require('worker_threads').parentPort;
+    port.on('message', (task: IScaleTask) => {
+      const [msg, transfer] = handle(task);
+      port.postMessage(msg, transfer);
+    });
+  } else {
+    scope.onmessage = (event: MessageEvent) => {
+      const [msg, transfer] = handle(event.data);
+      scope.postMessage(msg, transfer);
+    };
+  }
+}
+
+
+/**
+ * Get the source code of a scale worker.
+ */
+export function scaleWorkerSource(): string {
+  return `(${scaleWorkerMain.toString()})(${applyScaleDescription.toString()});`;
+}
+
+
+/**
+ * The minimal interface of a worker, as used by `ScaleWorkerPool`.
+ */
+export interface IScaleWorker {
+  postMessage(message: IScaleTask, transfer: ArrayBuffer[]): void;
+  onResult(callback: (result: IScaleTaskResult) => void): void;
+  terminate(): void;
+}
+
+
+/**
+ * Create a scale worker from a Web Worker.
+ */
+export function createBrowserScaleWorker(): IScaleWorker {
+  const url = URL.createObjectURL(
+    new Blob([scaleWorkerSource()], {type: 'application/javascript'})
+  );
+  const worker = new Worker(url);
+  URL.revokeObjectURL(url);
+  return {
+    postMessage: (message, transfer) => worker.postMessage(message, transfer),
+    onResult: (callback) => {
+      worker.onmessage = (event) => callback(event.data);
+    },
+    terminate: () => worker.terminate(),
+  };
+}
+
+
+/**
+ * Whether Web Workers are available.
+ */
+export function canUseWorkers(): boolean {
+  return typeof Worker !== 'undefined' && typeof Blob !== 'undefined';
+}
+
+
+/**
+ * The result of a job submitted to a `ScaleWorkerPool`.
+ */
+export interface IScaleJobResult {
+  /**
+   * The scaled data.
+   */
+  data: TypedArray;
+
+  /**
+   * The indices of the values that still need to be evaluated by the
+   * scale (see `applyScaleDescription`), in ascending order.
+   */
+  fallback: Int32Array;
+}
+
+
+/**
+ * A job submitted to a `ScaleWorkerPool`.
+ */
+export interface IScaleJob {
+  /**
+   * Resolves to the scaled data, or null if the job was cancelled.
+   */
+  promise: Promise<IScaleJobResult | null>;
+
+  /**
+   * Cancel the job.
+   *
+   * Chunks that have not yet been sent to a worker are dropped,
+   * and the results of chunks in flight are discarded.
+   */
+  cancel(): void;
+}
+
+
+interface IPendingJob {
+  result: TypedArray;
+  fallback: Int32Array[];
+  remaining: number;
+  cancelled: boolean;
+  resolve: (result: IScaleJobResult | null) => void;
+  reject: (reason: Error) => void;
+}
+
+
+interface IPendingTask {
+  task: IScaleTask;
+  job: IPendingJob;
+  index: number;
+  start: number;
+  offset: number;
+}
+
+
+/**
+ * Get the result of a finished job, with the fallback indices of its
+ * chunks concatenated.
+ */
+function jobResult(job: IPendingJob): IScaleJobResult {
+  const chunks = job.fallback.filter(chunk => chunk !== undefined);
+  const fallback = new Int32Array(chunks.reduce((ac, chunk) => ac + chunk.length, 0));
+  let offset = 0;
+  for (let chunk of chunks) {
+    fallback.set(chunk, offset);
+    offset += chunk.length;
+  }
+  return {data: job.result, fallback};
+}
+
+
+/**
+ * A pool of workers for scaling arrays.
+ *
+ * Large arrays are split into chunks, that are distributed over the
+ * workers. The chunks are copied into transferable buffers, and the
+ * results are transferred back.
+ */
+export class ScaleWorkerPool {
+  constructor(
+    size: number,
+    createWorker: () => IScaleWorker = createBrowserScaleWorker,
+    minChunkSize = 1 << 16
+  ) {
+    this.minChunkSize = minChunkSize;
+    for (let i = 0; i < size; ++i) {
+      const worker = createWorker();
+      worker.onResult(this.onResult.bind(this, worker));
+      this.workers.push(worker);
+      this.idle.push(worker);
+    }
+  }
+
+  /**
+   * Scale an array by a scale description.
+   *
+   * @param arrayType The name of the typed array type of the result.
+   */
+  run(description: IScaleDescription, data: TypedArray, arrayType: string): IScaleJob {
+    const components = description.lut ? 4 : 1;
+    const ctor = (globalThis as any)[arrayType];
+    const job: IPendingJob = {
+      result: new ctor(data.length * components),
+      fallback: [],
+      remaining: 0,
+      cancelled: false,
+      resolve: () => {},
+      reject: () => {},
+    };
+    const promise = new Promise<IScaleJobResult | null>((resolve, reject) => {
+      job.resolve = resolve;
+      job.reject = reject;
+    });
+    const chunkSize = Math.max(
+      this.minChunkSize,
+      Math.ceil(data.length / this.workers.length)
+    );
+    for (let start = 0; start < data.length; start += chunkSize) {
+      const chunk = data.slice(start, start + chunkSize);
+      job.remaining += 1;
+      this.queue.push({
+        task: {id: this.nextId++, description, data: chunk, arrayType},
+        job,
+        index: job.remaining - 1,
+        start,
+        offset: start * components,
+      });
+    }
+    if (job.remaining === 0) {
+      job.resolve(jobResult(job));
+    }
+    this.dispatch();
+    return {
+      promise,
+      cancel: () => {
+        if (job.remaining === 0 || job.cancelled) {
+          return;
+        }
+        job.cancelled = true;
+        this.queue = this.queue.filter(pending => pending.job !== job);
+        job.resolve(null);
+      },
+    };
+  }
+
+  /**
+   * Terminate all workers.
+   *
+   * Any unfinished jobs are cancelled.
+   */
+  terminate(): void {
+    for (let worker of this.workers) {
+      worker.terminate();
+    }
+    const jobs = new Set<IPendingJob>(this.queue.map(pending => pending.job));
+    this.inFlight.forEach(pending => jobs.add(pending.job));
+    jobs.forEach(job => {
+      job.cancelled = true;
+      job.resolve(null);
+    });
+    this.workers = [];
+    this.idle = [];
+    this.queue = [];
+    this.inFlight.clear();
+  }
+
+  /**
+   * The number of workers in the pool.
+   */
+  get size(): number {
+    return this.workers.length;
+  }
+
+  protected dispatch(): void {
+    while (this.idle.length > 0 && this.queue.length > 0) {
+      const worker = this.idle.pop()!;
+      const pending = this.queue.shift()!;
+      this.inFlight.set(pending.task.id, pending);
+      worker.postMessage(pending.task, [pending.task.data.buffer as ArrayBuffer]);
+    }
+  }
+
+  protected onResult(worker: IScaleWorker, msg: IScaleTaskResult): void {
+    const pending = this.inFlight.get(msg.id);
+    this.inFlight.delete(msg.id);
+    this.idle.push(worker);
+    if (pending && !pending.job.cancelled) {
+      const job = pending.job;
+      if (msg.error !== undefined) {
+        job.cancelled = true;
+        this.queue = this.queue.filter(other => other.job !== job);
+        job.reject(new Error(msg.error));
+      } else {
+        job.result.set(msg.result!, pending.offset);
+        // Keep the indices of the chunks in order, relative to the data:
+        const chunk = msg.fallback || new Int32Array(0);
+        job.fallback[pending.index] = chunk.map(i => i + pending.start);
+        job.remaining -= 1;
+        if (job.remaining === 0) {
+          job.resolve(jobResult(job));
+        }
+      }
+    }
+    this.dispatch();
+  }
+
+  protected minChunkSize: number;
+  protected nextId = 0;
+  protected workers: IScaleWorker[] = [];
+  protected idle: IScaleWorker[] = [];
+  protected queue: IPendingTask[] = [];
+  protected inFlight = new Map<number, IPendingTask>();
+}
@@ -5,6 +5,10 @@ import {
   WidgetModel
 } from '@jupyter-widgets/base';
 
+import {
+  TypedArray, typesToArray
+} from 'jupyter-dataserializers';
+
 
 export function arrayEquals(a: unknown[], b: unknown[]): boolean {
   if (a.length !== b.length) return false;
@@ -61,3 +65,89 @@ export function parseCssColor(color: string): [number, number, number, number] {
 export function undefSerializer(obj: any, widget?: WidgetModel): undefined {
   return undefined;
 }
+
+
+/**
+ * A tuple synced as a binary buffer.
+ */
+export interface IBinaryTuple {
+  dtype: keyof typeof typesToArray;
+  shape: number[];
+  format?: 'rgba';
+  buffer: DataView;
+}
+
+
+function isBinaryTuple(value: any): value is IBinaryTuple {
+  return value !== null && typeof value === 'object' && value.buffer instanceof DataView;
+}
+
+
+/**
+ * Get a typed array view on a binary tuple.
+ *
+ * The buffer is only copied if it is not aligned for the dtype.
+ */
+function binaryTupleView(value: IBinaryTuple): TypedArray {
+  const ctor = typesToArray[value.dtype] as any;
+  const view = value.buffer;
+  if (view.byteOffset % ctor.BYTES_PER_ELEMENT !== 0) {
+    return new ctor(view.buffer.slice(view.byteOffset, view.byteOffset + view.byteLength));
+  }
+  return new ctor(view.buffer, view.byteOffset, view.byteLength / ctor.BYTES_PER_ELEMENT);
+}
+
+
+/**
+ * Serializers for tuples that are synced as binary buffers when large.
+ *
+ * Numeric binary tuples are deserialized to typed arrays without
+ * copying, while JSON values are passed through as-is.
+ */
+export const tupleSerializers = {
+  deserialize: (value?: any, manager?: any): any => {
+    return isBinaryTuple(value) ? binaryTupleView(value) : value;
+  },
+  serialize: (value?: any, widget?: WidgetModel): any => {
+    if (!ArrayBuffer.isView(value)) {
+      return value;
+    }
+    const array = value as TypedArray;
+    const dtype = Object.keys(typesToArray).find(
+      key => (typesToArray as any)[key] === array.constructor
+    );
+    if (dtype === undefined) {
+      return Array.from(array);
+    }
+    return {
+      dtype,
+      shape: [array.length],
+      buffer: new DataView(array.buffer, array.byteOffset, array.byteLength),
+    };
+  },
+};
+
+
+/**
+ * Serializers for color tuples, that are packed as RGBA when large.
+ *
+ * Packed colors are deserialized to 'rgba(r, g, b, a)' strings.
+ */
+export const colorTupleSerializers = {
+  deserialize: (value?: any, manager?: any): any => {
+    if (!isBinaryTuple(value) || value.format !== 'rgba') {
+      return tupleSerializers.deserialize(value, manager);
+    }
+    const rgba = binaryTupleView(value);
+    const colors: string[] = [];
+    for (let i = 0; i < rgba.length; i += 4) {
+      colors.push(`rgba(${
+        Math.round(255 * rgba[i])}, ${
+        Math.round(255 * rgba[i + 1])}, ${
+        Math.round(255 * rgba[i + 2])}, ${
+        rgba[i + 3]})`);
+    }
+    return colors;
+  },
+  serialize: tupleSerializers.serialize,
+};
@@ -14,7 +14,7 @@ import {
 } from 'jupyter-dataserializers';
 
 import {
-  ScaleModel
+  deferWhileBatching, ScaleModel
 } from './scale';
 
 import {
@@ -55,15 +55,11 @@ export class ScaledValueModel extends WidgetModel {
   }
 
   /**
-   * (Re-)compute the output.
+   * Evaluate the output of this model from its current input.
    *
-   * @returns {void}
-   * @memberof ScaledArrayModel
+   * If the input is another ScaledValueModel, its output is used.
    */
-  computeScaledValue(options?: any): void {
-    options = typeof options === 'object'
-      ? {...options, setOutputOf: this}
-      : {setOutput: true};
+  evaluate(): unknown {
     let scale = this.get('scale') as ScaleModel | null;
     let input = this.get('input') as unknown;
 
@@ -72,12 +68,56 @@ export class ScaledValueModel extends WidgetModel {
       input = input.get('output') as unknown;
     }
 
-    // Handle null case immediately:
     if (input === null || scale === null) {
-      this.set('output', null, options);
-      return;
+      return null;
+    }
+    return scale.obj(input);
+  }
+
+  /**
+   * Get this model and the models downstream of it, in evaluation order.
+   *
+   * The downstream models are those with this as their input, directly
+   * or through other scaled values.
+   */
+  evaluationOrder(): ScaledValueModel[] {
+    // Every model has a single input, so breadth-first is topological:
+    const order: ScaledValueModel[] = [this];
+    const seen = new Set<ScaledValueModel>(order);
+    for (let i = 0; i < order.length; ++i) {
+      order[i].downstream.forEach(model => {
+        if (!seen.has(model)) {
+          seen.add(model);
+          order.push(model);
+        }
+      });
+    }
+    return order;
+  }
+
+  /**
+   * (Re-)compute the output.
+   *
+   * The outputs of all downstream models are recomputed in the same
+   * pass, in evaluation order. Change events are only triggered once
+   * all outputs are updated, and downstream models ignore the events
+   * of their inputs that were part of the pass.
+   */
+  computeScaledValue(options?: any): void {
+    options = typeof options === 'object'
+      ? {...options, setOutputOf: this, fused: true}
+      : {setOutput: true, fused: true};
+    const changed: ScaledValueModel[] = [];
+    for (let model of this.evaluationOrder()) {
+      model.set('output', model.evaluate(), {...options, silent: true});
+      if (model.hasChanged('output')) {
+        changed.push(model);
+      }
+    }
+    for (let model of changed) {
+      model.trigger('change:output', model, model.get('output'), options);
+      model.trigger('change', model, options);
     }
-    this.set('output', scale.obj(input), options);
   }
 
   /**
@@ -105,7 +145,7 @@ export class ScaledValueModel extends WidgetModel {
    */
   setupListeners(): void {
     // Listen to changes on scale model:
-    this.listenTo(this.get('scale'), 'change', this.onChange);
+    this.listenTo(this.get('scale'), 'change', this.onScaleChange);
     // make sure to (un)hook listeners when child points to new object
     this.on('change:scale', (model: this, value: ScaleModel, options: any) => {
       const prevModel = this.previous('scale') as ScaleModel;
@@ -114,13 +154,31 @@ export class ScaledValueModel extends WidgetModel {
         this.stopListening(prevModel);
       }
       if (currModel) {
-        this.listenTo(currModel, 'change', this.onChange.bind(this));
+        this.listenTo(currModel, 'change', this.onScaleChange.bind(this));
       }
       this.onChange(this);
     }, this);
 
     // Listen to changes on input union:
     listenToUnion(this, 'input', this.onChange.bind(this), true);
+
+    // Register with the upstream model, which evaluates this in its passes:
+    this.onInputChange();
+    this.on('change:input', this.onInputChange, this);
+  }
+
+  /**
+   * Callback for when the input is set, to track the downstream models.
+   */
+  protected onInputChange(): void {
+    const prev = this.previous('input') as unknown;
+    if (prev instanceof ScaledValueModel) {
+      prev.downstream.delete(this);
+    }
+    const input = this.get('input') as unknown;
+    if (input instanceof ScaledValueModel) {
+      input.downstream.add(this);
+    }
   }
 
   /**
@@ -130,11 +188,24 @@ export class ScaledValueModel extends WidgetModel {
    * @memberof ScaledArrayModel
    */
   protected onChange(model: WidgetModel, options?: any): void {
-    if (!options || options.setOutputOf !== this) {
+    // The outputs of fused passes are already up to date:
+    if (!options || (options.setOutputOf !== this && !options.fused)) {
       this.computeScaledValue(options);
     }
   }
 
+  /**
+   * Callback for changes within the scale model.
+   *
+   * Recomputation is deferred while a batch of scale changes is
+   * being applied.
+   */
+  protected onScaleChange(model: WidgetModel, options?: any): void {
+    if (!deferWhileBatching(this, () => this.onChange(model, options))) {
+      this.onChange(model, options);
+    }
+  }
+
   /**
    * A promise that resolves once the model has finished its initialization.
    *
@@ -143,6 +214,11 @@ export class ScaledValueModel extends WidgetModel {
    */
   initPromise: Promise<void>;
 
+  /**
+   * The models that have this model as their input.
+   */
+  downstream = new Set<ScaledValueModel>();
+
   static serializers: ISerializers = {
       input: { deserialize: unpack_models },
       scale: { deserialize: unpack_models },
@@ -0,0 +1,111 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+// Tests of the scale worker under Node worker threads. These run
+// against the compiled library, see the `test:node` script.
+
+const expect = require('expect.js');
+const { Worker } = require('worker_threads');
+
+const {
+  ScaleWorkerPool, scaleWorkerSource
+} = require('../../lib/scaleworker');
+
+
+function createNodeScaleWorker() {
+  const worker = new Worker(scaleWorkerSource(), { eval: true });
+  return {
+    postMessage: (message, transfer) => worker.postMessage(message, transfer),
+    onResult: (callback) => worker.on('message', callback),
+    terminate: () => worker.terminate(),
+  };
+}
+
+// A linear scale from [0, 10] to [-10, -5]:
+const linear = {
+  transform: 'identity',
+  exponent: 1,
+  clamp: null,
+  breaks: Float64Array.from([0, 10]),
+  slopes: Float64Array.from([0.5]),
+  offsets: Float64Array.from([-10]),
+  lut: null,
+};
+
+
+describe('ScaleWorkerPool', function () {
+
+  let pool;
+
+  beforeEach(function () {
+    pool = new ScaleWorkerPool(2, createNodeScaleWorker, 2);
+  });
+
+  afterEach(function () {
+    pool.terminate();
+  });
+
+  it('should scale an array in chunks', async function () {
+    const data = new Float32Array([1, 2, 3, 4, 5, 10, NaN]);
+    const { data: result, fallback } = await pool.run(linear, data, 'Float32Array').promise;
+    expect(result).to.be.a(Float32Array);
+    expect(Array.from(result.slice(0, 6))).to.eql([-9.5, -9, -8.5, -8, -7.5, -5]);
+    expect(isNaN(result[6])).to.be(true);
+    // Only color lookups leave values to the main thread:
+    expect(Array.from(fallback)).to.eql([]);
+    // Input is copied before being transferred:
+    expect(data.length).to.be(7);
+  });
+
+  it('should map through a lookup table', async function () {
+    const lut = new Uint8ClampedArray([
+      255, 0, 0, 255,
+      0, 0, 255, 255,
+    ]);
+    const description = { ...linear, slopes: Float64Array.from([0.1]), offsets: Float64Array.from([0]), lut };
+    const data = new Float64Array([1, 6, 20, NaN]);
+    const result = await pool.run(description, data, 'Uint8ClampedArray').promise;
+    // Values outside of the table are left transparent, for the main
+    // thread to evaluate by the scale:
+    expect(Array.from(result.data)).to.eql([
+      255, 0, 0, 255,
+      0, 0, 255, 255,
+      0, 0, 0, 0,
+      0, 0, 0, 0,
+    ]);
+    // The indices are into the whole array, across chunks:
+    expect(result.fallback).to.be.a(Int32Array);
+    expect(Array.from(result.fallback)).to.eql([2, 3]);
+  });
+
+  it('should apply clamping and transforms', async function () {
+    const description = {
+      ...linear,
+      transform: 'log',
+      clamp: [1, 100],
+      breaks: Float64Array.from([0, Math.log(100)]),
+      slopes: Float64Array.from([1 / Math.log(100)]),
+      offsets: Float64Array.from([0]),
+    };
+    const data = new Float64Array([0.5, 10, 1000]);
+    const { data: result } = await pool.run(description, data, 'Float64Array').promise;
+    expect(Array.from(result).map(v => Math.round(v * 1e6) / 1e6)).to.eql([0, 0.5, 1]);
+  });
+
+  it('should resolve cancelled jobs to null', async function () {
+    const data = new Float32Array(100);
+    const first = pool.run(linear, data, 'Float32Array');
+    const second = pool.run(linear, data, 'Float32Array');
+    first.cancel();
+    expect(await first.promise).to.be(null);
+    const result = await second.promise;
+    expect(result.data.length).to.be(100);
+    expect(result.data[0]).to.be(-10);
+  });
+
+  it('should fail for invalid array types', function () {
+    const data = new Float32Array(4);
+    expect(() => pool.run(linear, data, 'NotAnArray')).to.throwError();
+  });
+
+});
@@ -10,7 +10,7 @@ import {
 import {
   ColorBarModel, ColorBarView,
   ColorMapEditorModel, ColorMapEditorView,
-  LinearColorScaleModel
+  LinearColorScaleModel, withKernelTicks
 } from '../../src/'
 
 
@@ -85,6 +85,32 @@ describe('ColorBar', () => {
 
   });
 
+  describe('withKernelTicks', () => {
+
+    it('should use the ticks of the scale by default', () => {
+      const map = createTestModel(LinearColorScaleModel);
+      const model = createTestModel(ColorBarModel, {colormap: map});
+      const scale = withKernelTicks(map.obj, model);
+      expect(scale.ticks(5)).to.eql(map.obj.ticks(5));
+      expect(scale(0.5)).to.be(map.obj(0.5));
+    });
+
+    it('should use the ticks of the model if set', () => {
+      const map = createTestModel(LinearColorScaleModel);
+      const model = createTestModel(ColorBarModel, {
+        colormap: map,
+        tick_values: [0, 0.5, 1],
+        tick_labels: ['zero', 'half', 'one'],
+      });
+      const scale = withKernelTicks(map.obj, model);
+      expect(scale.ticks(10)).to.eql([0, 0.5, 1]);
+      const format = scale.tickFormat(10);
+      expect([0, 0.5, 1].map(format)).to.eql(['zero', 'half', 'one']);
+      expect(scale.copy().ticks()).to.eql([0, 0.5, 1]);
+    });
+
+  });
+
   describe('ColorMapEditorModel', () => {
 
     it('should be createable', () => {
@@ -16,7 +16,7 @@ import {
 } from 'jupyter-dataserializers';
 
 import {
-  LinearScaleModel
+  LinearScaleModel, LogScaleModel
 } from '../../src/continuous';
 
 import {
@@ -24,13 +24,26 @@ import {
 } from '../../src/colormap';
 
 import {
-  arrayFrom, ScaledArrayModel
+  arrayFrom, describeScale, outputConverter, regionIndices, ScaledArrayModel,
+  ScaledArrayGroupModel
 } from '../../src/datawidgets';
 
+import {
+  applyScaleDescription
+} from '../../src/scaleworker';
+
+import {
+  ComposedScaleModel, QuantizeScaleModel
+} from '../../src/scale';
+
 import {
   DummyManager, createTestModel
 } from './helpers.spec';
 
+import {
+  parseCssColor
+} from '../../src/utils';
+
 import ndarray = require('ndarray');
 
 
@@ -190,6 +203,7 @@ describe('ScaledArrayModel', () => {
     await scale.initPromise;
     model.set({
       scale,
+      lut_size: null,
     });
 
     // RGBA values from red to blue:
@@ -206,6 +220,216 @@ describe('ScaledArrayModel', () => {
 
   });
 
+  it('should map to rgba with a lookup table for color scale', async () => {
+    let model = await createWidgetModel();
+
+    let scale = createTestModel(LinearColorScaleModel, {
+      domain: [0, 10],
+      range: ['red', 'blue'],
+    }, model.widget_manager as DummyManager);
+    await scale.initPromise;
+    model.set({
+      scale,
+      lut_size: 4,
+    });
+
+    // Colors at 1/8, 3/8, 5/8 and 7/8 between red and blue:
+    expect(model.get('scaledData')!.data).to.eql(
+      new Float32Array([
+        223, 0, 32, 255,
+        223, 0, 32, 255,
+        159, 0, 96, 255,
+        159, 0, 96, 255,
+        96, 0, 159, 255,
+        32, 0, 223, 255,
+      ])
+    );
+
+  });
+
+  it('should evaluate color scale outside of the lookup table', async () => {
+    let model = await createWidgetModel();
+
+    let scale = createTestModel(LinearColorScaleModel, {
+      domain: [0, 5],
+      range: ['red', 'blue'],
+    }, model.widget_manager as DummyManager);
+    await scale.initPromise;
+    model.set({
+      scale,
+      lut_size: 4,
+    });
+
+    // Last value is outside domain, and gets clamped by the color format:
+    const data = model.get('scaledData')!.data;
+    expect(Array.from(data.slice(20))).to.eql([0, 0, 255, 255]);
+
+  });
+
+  it('should update lookup table when scale range changes', async () => {
+    let model = await createWidgetModel();
+
+    let scale = createTestModel(LinearColorScaleModel, {
+      domain: [0, 10],
+      range: ['red', 'blue'],
+    }, model.widget_manager as DummyManager);
+    await scale.initPromise;
+    model.set({
+      scale,
+      lut_size: 4,
+    });
+    scale.set('range', ['blue', 'red']);
+
+    const data = model.get('scaledData')!.data;
+    expect(Array.from(data.slice(0, 4))).to.eql([32, 0, 223, 255]);
+
+  });
+
+  it('should map through a composed scale in one pass', async () => {
+    let model = await createWidgetModel();
+    const manager = model.widget_manager as DummyManager;
+
+    const normalize = createTestModel(LinearScaleModel, {
+      domain: [0, 10],
+      range: [0, 1],
+    }, manager);
+    const colors = createTestModel(LinearColorScaleModel, {
+      domain: [0, 1],
+      range: ['red', 'blue'],
+    }, manager);
+    const scale = createTestModel(ComposedScaleModel, {
+      scales: [normalize, colors],
+    }, manager);
+    await scale.initPromise;
+    expect(scale.obj(5)).to.be('rgb(128, 0, 128)');
+    model.set({
+      scale,
+      lut_size: null,
+    });
+
+    // The same as mapping through the color scale directly:
+    const data = model.get('scaledData')!.data;
+    expect(Array.from(data.slice(0, 4))).to.eql([230, 0, 26, 255]);
+    expect(Array.from(data.slice(16, 20))).to.eql([128, 0, 128, 255]);
+
+    // Recomputed when a member changes:
+    normalize.set('range', [1, 0]);
+    const updated = model.get('scaledData')!.data;
+    expect(Array.from(updated.slice(0, 4))).to.eql([26, 0, 230, 255]);
+  });
+
+  it('should evaluate composed values outside of the lookup table', async () => {
+    let model = await createWidgetModel();
+    const manager = model.widget_manager as DummyManager;
+
+    const normalize = createTestModel(LinearScaleModel, {
+      domain: [0, 10],
+      range: [0, 1],
+    }, manager);
+    const colors = createTestModel(LinearColorScaleModel, {
+      domain: [0, 0.8],
+      range: ['rgb(0, 0, 0)', 'rgb(100, 100, 100)'],
+    }, manager);
+    const scale = createTestModel(ComposedScaleModel, {
+      scales: [normalize, colors],
+    }, manager);
+    await scale.initPromise;
+    model.set({
+      scale,
+      lut_size: 4,
+    });
+
+    // The last value maps to 1, outside the color domain, which is
+    // extrapolated by the color scale:
+    const data = model.get('scaledData')!.data;
+    expect(Array.from(data.slice(20))).to.eql([125, 125, 125, 255]);
+  });
+
+  it('should recompute once for a batch of scale changes', async () => {
+    let model = await createWidgetModel();
+    const scale = model.get('scale') as LinearScaleModel;
+    let count = 0;
+    model.on('change:scaledData', () => {
+      count += 1;
+    });
+
+    scale.onCustomMessage({event: 'batch_begin'}, []);
+    scale.set('domain', [0, 5]);
+    scale.set('range', [0, 5]);
+    expect(count).to.be(0);
+    scale.onCustomMessage({event: 'batch_end'}, []);
+    await scale.state_change;
+    await Promise.resolve();
+
+    expect(count).to.be(1);
+    expect(model.get('scaledData')!.data).to.eql(new Float32Array([
+      1, 2, 3, 4, 5, 10
+    ]));
+  });
+
+  it('should only defer updates for the batching manager', async () => {
+    let model = await createWidgetModel();
+    let other = await createWidgetModel();
+    const scale = model.get('scale') as LinearScaleModel;
+    const otherScale = other.get('scale') as LinearScaleModel;
+
+    scale.onCustomMessage({event: 'batch_begin'}, []);
+    otherScale.set('range', [0, 5]);
+    expect(other.get('scaledData')!.data).to.eql(new Float32Array([
+      0.5, 1, 1.5, 2, 2.5, 5
+    ]));
+    scale.onCustomMessage({event: 'batch_end'}, []);
+  });
+
+  it('should end batches when the scale is closed', async () => {
+    let model = await createWidgetModel();
+    const scale = model.get('scale') as LinearScaleModel;
+    let count = 0;
+    model.on('change:scaledData', () => {
+      count += 1;
+    });
+
+    scale.onCustomMessage({event: 'batch_begin'}, []);
+    scale.set('range', [0, 5]);
+    expect(count).to.be(0);
+    // The kernel never sends batch_end:
+    await scale.close();
+    expect(count).to.be(1);
+  });
+
+  describe('updateRegion', () => {
+
+    it('should update and rescale only the region', async () => {
+      let model = await createWidgetModel();
+      const scaled = model.get('scaledData') as ndarray.NdArray;
+      let dirtyRegion: any = null;
+      model.on('change:scaledData', (model: WidgetModel, value: ndarray.NdArray | null, options: any) => {
+        dirtyRegion = options.dirtyRegion;
+      });
+
+      model.updateRegion([[1, 2], [0, 2]], new Float32Array([0, 2]));
+
+      expect(Array.from(model.get('data').data)).to.eql([1, 2, 3, 0, 2, 10]);
+      expect(model.get('scaledData')!.data).to.be(scaled.data);
+      expect(model.get('scaledData')!.data).to.eql(new Float32Array([
+        -9.5, -9, -8.5, -10, -9, -5
+      ]));
+      expect(dirtyRegion).to.eql([[1, 2], [0, 2]]);
+    });
+
+    it('should handle update_slice messages', async () => {
+      let model = await createWidgetModel();
+      const buffer = new DataView(new Float32Array([4, 6]).buffer);
+      (model as any).onCustomMessage(
+        {event: 'update_slice', region: [[0, 1], [1, 3]]}, [buffer]
+      );
+      expect(model.get('scaledData')!.data).to.eql(new Float32Array([
+        -9.5, -8, -7, -8, -7.5, -5
+      ]));
+    });
+
+  });
+
   describe('arrayMismatch', () => {
 
     it('should be false when both are null', async () => {
@@ -246,6 +470,59 @@ describe('ScaledArrayModel', () => {
       expect(model.scaledDtype()).to.be(null);
     });
 
+    it('should inherit the data dtype for color scales', async () => {
+      let model = createTestModel(TestModel, {
+        data: ndarray(new Float64Array([0, 5, 10])),
+        scale: null,
+      });
+      await model.initPromise;
+      let scale = createTestModel(LinearColorScaleModel, {
+        domain: [0, 10],
+        range: ['red', 'blue'],
+      }, model.widget_manager as DummyManager);
+      await scale.initPromise;
+      model.set('scale', scale);
+
+      expect(model.scaledDtype()).to.be('float64');
+      expect(model.get('scaledData')!.data).to.be.a(Float64Array);
+      // Compact RGBA bytes are opt-in:
+      model.set('output_dtype', 'uint8_clamped');
+      expect(model.scaledDtype()).to.be('uint8_clamped');
+      expect(model.get('scaledData')!.data).to.be.a(Uint8ClampedArray);
+    });
+
+    it('should store normalized outputs in their integer type', async () => {
+      let model = await createWidgetModel();
+      (model.get('scale') as LinearScaleModel).set('range', [0, 1]);
+      model.set('output_dtype', 'uint16_norm');
+      const scaled = model.get('scaledData')!;
+
+      expect(scaled.dtype).to.be('uint16');
+      // Domain [0, 10] to [0, 1], for the data [1, 2, 3, 4, 5, 10]:
+      expect(scaled.data).to.eql(new Uint16Array([
+        6554, 13107, 19661, 26214, 32768, 65535
+      ]));
+    });
+
+  });
+
+  describe('outputConverter', () => {
+
+    it('should be null for dtypes that are assigned as is', () => {
+      expect(outputConverter('float32', false)).to.be(null);
+      expect(outputConverter('uint8_norm', true)).to.be(null);
+    });
+
+    it('should clamp and scale normalized numeric outputs', () => {
+      const convert = outputConverter('uint8_norm', false)!;
+      expect([0, 0.5, 1, 2, -1, NaN].map(convert)).to.eql([0, 128, 255, 255, 0, 0]);
+    });
+
+    it('should rescale color channels', () => {
+      const convert = outputConverter('uint16_norm', true)!;
+      expect([0, 1, 255].map(convert)).to.eql([0, 257, 65535]);
+    });
+
   });
 
   describe('getNDArray', async () => {
@@ -449,3 +726,187 @@ describe('arrayFrom', () => {
   });
 
 });
+
+
+describe('regionIndices', () => {
+
+  it('should give the indices of a region in C order', () => {
+    const array = ndarray(new Float32Array(12), [3, 4]);
+    expect(Array.from(regionIndices(array, [[1, 3], [2, 4]]))).to.eql([6, 7, 10, 11]);
+  });
+
+  it('should respect strides and offset', () => {
+    const array = ndarray(new Float32Array(12), [3, 4]).transpose(1, 0).lo(1, 0);
+    expect(Array.from(regionIndices(array, [[0, 2], [0, 2]]))).to.eql([1, 5, 2, 6]);
+  });
+
+  it('should handle empty regions', () => {
+    const array = ndarray(new Float32Array(12), [3, 4]);
+    expect(regionIndices(array, [[1, 1], [0, 4]]).length).to.be(0);
+  });
+
+});
+
+
+function parseCssColorOrTransparent(color: string | undefined): number[] {
+  return color === undefined ? [0, 0, 0, 0] : parseCssColor(color);
+}
+
+
+describe('describeScale', () => {
+
+  it('should describe a piecewise linear scale', async () => {
+    const scale = createTestModel(LinearScaleModel, {
+      domain: [0, 10, 20],
+      range: [-10, -5, 5],
+      clamp: true,
+    });
+    await scale.initPromise;
+    const data = new Float64Array([-5, 1, 10, 15, 25]);
+    const description = describeScale(scale, null)!;
+    const result = applyScaleDescription(description, data, new Float64Array(5));
+    expect(Array.from(result)).to.eql(Array.from(data).map(scale.obj));
+  });
+
+  it('should describe a reversed log scale', async () => {
+    const scale = createTestModel(LogScaleModel, {
+      domain: [100, 1],
+      range: [0, 1],
+    });
+    await scale.initPromise;
+    const data = new Float64Array([1, 10, 100]);
+    const description = describeScale(scale, null)!;
+    const result = applyScaleDescription(description, data, new Float64Array(3));
+    const expected = Array.from(data).map(scale.obj);
+    for (let i = 0; i < 3; ++i) {
+      expect(result[i]).to.be.within(expected[i] - 1e-12, expected[i] + 1e-12);
+    }
+  });
+
+  it('should describe a color scale with a lookup table', async () => {
+    const scale = createTestModel(LinearColorScaleModel, {
+      domain: [0, 10],
+      range: ['red', 'blue'],
+    });
+    await scale.initPromise;
+    expect(describeScale(scale, null)).to.be(null);
+    const description = describeScale(scale, 4)!;
+    expect(description.lut!.length).to.be(16);
+    const result = applyScaleDescription(
+      description, new Float32Array([1, 9]), new Uint8ClampedArray(8));
+    expect(Array.from(result)).to.eql([223, 0, 32, 255, 32, 0, 223, 255]);
+  });
+
+  it('should leave values outside of the lookup table to the scale', async () => {
+    const scale = createTestModel(LinearColorScaleModel, {
+      domain: [0, 10],
+      range: ['red', 'blue'],
+    });
+    await scale.initPromise;
+    const description = describeScale(scale, 4)!;
+    const fallback: number[] = [];
+    const result = applyScaleDescription(
+      description, new Float32Array([1, -5, NaN, 15]), new Uint8ClampedArray(16), fallback);
+    expect(fallback).to.eql([1, 2, 3]);
+    expect(Array.from(result.slice(4))).to.eql(new Array(12).fill(0));
+  });
+
+  it('should render the same with and without workers', async () => {
+    const manager = new DummyManager();
+    const scale = createTestModel(LinearColorScaleModel, {
+      domain: [0, 10],
+      range: ['red', 'blue'],
+    }, manager);
+    await scale.initPromise;
+    const data = new Float32Array([1, -5, NaN, 15]);
+    const model = createTestModel(ScaledArrayModel, {
+      scale,
+      data: ndarray(data),
+      lut_size: 4,
+    }, manager);
+    await model.initPromise;
+    const expected = Array.from(model.get('scaledData')!.data);
+
+    const target = new Uint8ClampedArray(16);
+    const fallback: number[] = [];
+    applyScaleDescription(describeScale(scale, 4)!, data, target, fallback);
+    for (let i of fallback) {
+      target.set(parseCssColorOrTransparent(scale.obj(data[i]) as any), i * 4);
+    }
+    expect(Array.from(target)).to.eql(expected);
+    // Extrapolated, and unknown as transparent:
+    expect(expected.slice(8, 12)).to.eql([0, 0, 0, 0]);
+  });
+
+  it('should not describe discrete scales', async () => {
+    const scale = createTestModel(QuantizeScaleModel, {});
+    await scale.initPromise;
+    expect(describeScale(scale, 4)).to.be(null);
+  });
+
+});
+
+
+describe('ScaledArrayGroupModel', () => {
+
+  async function createGroup(): Promise<[ScaledArrayGroupModel, ScaledArrayModel[], LinearColorScaleModel]> {
+    const manager = new DummyManager();
+    const scale = createTestModel(LinearColorScaleModel, {
+      domain: [0, 10],
+      range: ['red', 'blue'],
+    }, manager);
+    await scale.initPromise;
+    const members = [0, 1, 2].map(() => createTestModel(ScaledArrayModel, {
+      scale,
+      data: ndarray(new Float32Array([0, 5, 10])),
+    }, manager));
+    await Promise.all(members.map(m => m.initPromise));
+    const group = createTestModel(ScaledArrayGroupModel, {
+      scale,
+      arrays: members,
+    }, manager);
+    await group.initPromise;
+    return [group, members, scale];
+  }
+
+  it('should recompute all members in one batch', async () => {
+    const [group, members, scale] = await createGroup();
+    const batches: ScaledArrayModel[][] = [];
+    group.on('computed', (model: ScaledArrayGroupModel, computed: ScaledArrayModel[]) => {
+      batches.push(computed);
+    });
+
+    scale.set('domain', [0, 5]);
+    scale.set('clamp', true);
+    expect(batches.length).to.be(0);
+    await group.schedule();
+
+    expect(batches.length).to.be(1);
+    expect(batches[0].length).to.be(3);
+    for (let member of members) {
+      const data = member.get('scaledData')!.data;
+      expect(Array.from(data.slice(4, 8))).to.eql([0, 0, 255, 255]);
+    }
+  });
+
+  it('should only recompute displayed members if requested', async () => {
+    const [group, members, scale] = await createGroup();
+    group.set('displayed_only', true);
+    group.setDisplayed(members[0], false);
+    await group.schedule();
+    const batches: ScaledArrayModel[][] = [];
+    group.on('computed', (model: ScaledArrayGroupModel, computed: ScaledArrayModel[]) => {
+      batches.push(computed);
+    });
+
+    scale.set('domain', [0, 5]);
+    await group.schedule();
+    expect(batches[0].length).to.be(2);
+    expect(members[0].get('scaledData')).to.be(null);
+
+    group.setDisplayed(members[0], true);
+    const data = members[0].get('scaledData')!.data;
+    expect(Array.from(data.slice(4, 8))).to.eql([0, 0, 255, 255]);
+  });
+
+});
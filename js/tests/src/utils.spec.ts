@@ -4,7 +4,7 @@
 import expect = require('expect.js');
 
 import {
-  parseCssColor
+  colorTupleSerializers, parseCssColor, tupleSerializers
 } from '../../src/utils';
 
 
@@ -45,3 +45,50 @@ describe('parseCssColor', () => {
     });
 
 });
+
+
+describe('tupleSerializers', () => {
+
+    it('should pass JSON values through', () => {
+        expect(tupleSerializers.deserialize([0, 'a'])).to.eql([0, 'a']);
+        expect(tupleSerializers.serialize([0, 'a'])).to.eql([0, 'a']);
+    });
+
+    it('should deserialize binary tuples without copying', () => {
+        const data = new Float64Array([1, 2, 3]);
+        const value = {dtype: 'float64', shape: [3], buffer: new DataView(data.buffer)};
+        const result = tupleSerializers.deserialize(value);
+        expect(result).to.be.a(Float64Array);
+        expect(result.buffer).to.be(data.buffer);
+        expect(Array.from(result)).to.eql([1, 2, 3]);
+    });
+
+    it('should round-trip typed arrays', () => {
+        const data = new Int32Array([4, 5, 6]);
+        const serialized = tupleSerializers.serialize(data);
+        expect(serialized.dtype).to.be('int32');
+        expect(serialized.shape).to.eql([3]);
+        expect(tupleSerializers.deserialize(serialized)).to.eql(data);
+    });
+
+});
+
+
+describe('colorTupleSerializers', () => {
+
+    it('should unpack RGBA colors to strings', () => {
+        const data = new Float32Array([1, 0, 0, 1, 0, 0, 1, 0.5]);
+        const value = {
+            dtype: 'float32', shape: [2, 4], format: 'rgba', buffer: new DataView(data.buffer)
+        };
+        expect(colorTupleSerializers.deserialize(value)).to.eql([
+            'rgba(255, 0, 0, 1)',
+            'rgba(0, 0, 255, 0.5)',
+        ]);
+    });
+
+    it('should pass color names through', () => {
+        expect(colorTupleSerializers.deserialize(['red', 'blue'])).to.eql(['red', 'blue']);
+    });
+
+});
@@ -150,4 +150,38 @@ describe('ScaledValueModel', () => {
     expect(modelB.get('output')).to.be('rgb(128, 0, 128)');
   });
 
+  it('should evaluate chains in a single pass', async () => {
+    const modelA = await createWidgetModel();
+    const manager = modelA.widget_manager as DummyManager;
+    const modelB = await createWidgetModel(manager);
+    const modelC = await createWidgetModel(manager);
+    modelB.set('input', modelA);
+    modelC.set('input', modelB);
+    const ids = (models: ScaledValueModel[]) => models.map(m => m.model_id);
+    expect(ids(modelB.evaluationOrder())).to.eql(ids([modelB, modelC]));
+    expect(ids(modelA.evaluationOrder())).to.eql(ids([modelA, modelB, modelC]));
+
+    const events: string[] = [];
+    let outputs: unknown[] = [];
+    for (let [name, model] of [['A', modelA], ['B', modelB], ['C', modelC]] as [string, ScaledValueModel][]) {
+      model.on('change:output', () => {
+        events.push(name);
+        // All outputs are up to date when the events fire:
+        outputs = [modelA.get('output'), modelB.get('output'), modelC.get('output')];
+      });
+    }
+    modelA.set('input', 10);
+    expect(events).to.eql(['A', 'B', 'C']);
+    expect(outputs).to.eql([-5, -12.5, -16.25]);
+  });
+
+  it('should stop evaluating models that change their input', async () => {
+    const modelA = await createWidgetModel();
+    const modelB = await createWidgetModel(modelA.widget_manager as DummyManager);
+    modelB.set('input', modelA);
+    modelB.set('input', 0);
+    expect(modelA.evaluationOrder().length).to.be(1);
+    expect(modelB.get('output')).to.be(-10);
+  });
+
 });
@@ -38,7 +38,7 @@ jstargets = [
     js_path / "lib" / "plugin.js"
 ]
 
-package_data_spec = {name: ["nbextension/static/*.*js*"]}
+package_data_spec = {name: ["nbextension/static/*.*js*", "data/*.npz"]}
 
 data_files_spec = [
     ("share/jupyter/nbextensions/jupyter-scales", nb_path, "*.js*"),
@@ -84,7 +84,7 @@ setup_args = dict(
     ],
     include_package_data=True,
     python_requires=">=3.7",
-    install_requires=["ipywidgets>=7.0.0"],
+    install_requires=["ipywidgets>=7.0.0", "numpy"],
     extras_require={
         "test": [
             "ipydatawidgets>=4.2",
@@ -95,6 +95,12 @@ setup_args = dict(
             "pytest_check_links",
         ],
         "examples": ["ipydatawidgets>=4.2"],
+        "benchmark": [
+            "ipydatawidgets>=4.2",
+            "nbval",
+            "pytest>=4.6",
+            "pytest-benchmark",
+        ],
         "docs": [
             "sphinx>=1.5",
             "recommonmark",